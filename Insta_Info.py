@@ -1,17 +1,101 @@
 import sys
 import io
+import os
 import re
 import json
-import requests
-from urllib.parse import quote_plus
-from json import dumps, decoder
+import math
+import random
+import importlib.util
+from urllib.parse import quote_plus, urlsplit, parse_qs
+from json import dumps
 from datetime import datetime
-from colorama import Fore, Style, init
-from collections import Counter
+from array import array
+from collections import Counter, deque
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from contextlib import contextmanager
+import copy
+import functools
+from types import SimpleNamespace
+import argparse
+import contextvars
+import threading
 import time
 
-init(autoreset=True)
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+COLOR_NAMES = (
+    "BLACK", "RED", "GREEN", "YELLOW", "BLUE", "MAGENTA", "CYAN", "WHITE", "RESET",
+    "LIGHTBLACK_EX", "LIGHTRED_EX", "LIGHTGREEN_EX", "LIGHTYELLOW_EX", "LIGHTBLUE_EX",
+    "LIGHTMAGENTA_EX", "LIGHTCYAN_EX", "LIGHTWHITE_EX", "DIM", "NORMAL", "BRIGHT", "RESET_ALL"
+)
+# Stand-in for colorama's Fore/Style with every code rendered as an empty string
+NO_COLOR = SimpleNamespace(**dict.fromkeys(COLOR_NAMES, ''))
+
+try:
+    from colorama import Fore, Style, init
+except ImportError:
+    # Reported by missing_dependencies(); until then everything prints without color
+    Fore = Style = NO_COLOR
+    init = None
+
+class ThreadLocalStream(io.TextIOBase):
+    """Text stream that sends each thread's writes to its own target, or to the real stream"""
+    
+    def __init__(self, stream):
+        self.stream = stream
+        self._local = threading.local()
+    
+    @property
+    def target(self):
+        return getattr(self._local, 'target', None)
+    
+    def redirect(self, target):
+        """Route the current thread's writes to target (None restores the real stream)"""
+        self._local.target = target
+    
+    @property
+    def encoding(self):
+        return self.stream.encoding
+    
+    def fileno(self):
+        return self.stream.fileno()
+    
+    def isatty(self):
+        return self.stream.isatty()
+    
+    def writable(self):
+        return True
+    
+    def write(self, text):
+        return (self.target or self.stream).write(text)
+    
+    def flush(self):
+        (self.target or self.stream).flush()
+
+_output_lock = threading.Lock()
+
+def install_thread_streams():
+    """Swap stdout/stderr for thread-aware streams (done once, on first need)"""
+    with _output_lock:
+        if not isinstance(sys.stdout, ThreadLocalStream):
+            sys.stdout = ThreadLocalStream(io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8'))
+        if not isinstance(sys.stderr, ThreadLocalStream):
+            sys.stderr = ThreadLocalStream(sys.stderr)
+
+def setup_console():
+    """Prepare the terminal for colored, thread-aware output"""
+    if init is not None:
+        init(autoreset=True)
+    install_thread_streams()
+
+@contextmanager
+def suppress_stderr():
+    """Silence stderr (instaloader's retry chatter) for the current thread only"""
+    install_thread_streams()
+    previous = sys.stderr.target
+    sys.stderr.redirect(io.StringIO())
+    try:
+        yield
+    finally:
+        sys.stderr.redirect(previous)
 
 def print_text_by_text(text, delay=0.03):
     """Print text character by character"""
@@ -20,93 +104,1295 @@ def print_text_by_text(text, delay=0.03):
         time.sleep(delay)
     print()
 
+COUNTERS = {
+    "http_requests": "HTTP requests sent",
+    "http_errors": "HTTP requests that failed or were answered with an error status",
+    "http_throttled": "HTTP responses with status 429",
+    "http_bytes": "Response bytes received",
+    "retries": "Requests repeated after a failure",
+    "cache_hits": "Response cache hits",
+    "cache_misses": "Response cache misses",
+    "coalesced": "Calls that joined an identical call already in flight instead of making their own",
+    "replayed": "HTTP exchanges served from a cassette instead of the network",
+    "media_downloaded": "Media files downloaded",
+    "media_skipped": "Media files not downloaded because they were already stored"
+}
+
+class Trace:
+    """Spans and counters of one investigation, shared by every thread working on it"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans = []
+        self.counters = Counter()
+        self._lock = threading.Lock()
+
+    def add_span(self, name, start, duration):
+        with self._lock:
+            self.spans.append((name, start - self.started, duration))
+
+    def increment(self, name, amount=1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def as_dict(self):
+        """The timings block of the investigation data: per-stage totals, counters and every span"""
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: span[1])
+            counters = dict(self.counters)
+        stages = {}
+        for name, _, duration in spans:
+            stage = stages.setdefault(name, {"count": 0, "seconds": 0.0})
+            stage["count"] += 1
+            stage["seconds"] += duration
+        for stage in stages.values():
+            stage["seconds"] = round(stage["seconds"], 4)
+        return {
+            "total": round(time.perf_counter() - self.started, 4),
+            "stages": stages,
+            "counters": counters,
+            "spans": [{"name": name, "start": round(start, 4), "duration": round(duration, 4)}
+                      for name, start, duration in spans]
+        }
+
+class Metrics:
+    """Process-wide span totals and counters, dumped in the Prometheus text format"""
+
+    def __init__(self):
+        self.span_seconds = Counter()
+        self.span_count = Counter()
+        self.counters = Counter()
+        self._lock = threading.Lock()
+
+    def observe(self, name, duration):
+        with self._lock:
+            self.span_seconds[name] += duration
+            self.span_count[name] += 1
+
+    def increment(self, name, amount=1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def prometheus(self, prefix="insta_info"):
+        with self._lock:
+            span_seconds, span_count, counters = dict(self.span_seconds), dict(self.span_count), dict(self.counters)
+        lines = [f"# HELP {prefix}_span_seconds Time spent in each instrumented stage",
+                 f"# TYPE {prefix}_span_seconds summary"]
+        for name in sorted(span_count):
+            lines.append(f'{prefix}_span_seconds_sum{{span="{name}"}} {span_seconds[name]:.6f}')
+            lines.append(f'{prefix}_span_seconds_count{{span="{name}"}} {span_count[name]}')
+        for name in sorted(COUNTERS.keys() | counters.keys()):
+            lines.append(f"# HELP {prefix}_{name}_total {COUNTERS.get(name, name)}")
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            lines.append(f"{prefix}_{name}_total {counters.get(name, 0)}")
+        return "\n".join(lines) + "\n"
+
+_trace = contextvars.ContextVar("trace", default=None)
+_metrics = Metrics()
+
+@contextmanager
+def tracing(trace=None):
+    """Make trace current for this context; defaults to the active trace, or a new one"""
+    trace = trace or _trace.get() or Trace()
+    token = _trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _trace.reset(token)
+
+def traced(func):
+    """Run func inside a trace and attach the trace's timings to the dict it returns"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with tracing() as trace:
+            result = func(*args, **kwargs)
+        result["timings"] = trace.as_dict()
+        return result
+    return wrapper
+
+def record_span(name, start, duration):
+    trace = _trace.get()
+    if trace is not None:
+        trace.add_span(name, start, duration)
+    _metrics.observe(name, duration)
+
+@contextmanager
+def span(name):
+    """Time the enclosed block as a span of the current trace"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_span(name, start, time.perf_counter() - start)
+
+def increment(name, amount=1):
+    """Bump a counter of the current trace and of the process totals"""
+    trace = _trace.get()
+    if trace is not None:
+        trace.increment(name, amount)
+    _metrics.increment(name, amount)
+
+def submit_traced(executor, func, *args):
+    """Submit func so it runs in the current trace (executor threads do not inherit it)"""
+    return executor.submit(contextvars.copy_context().run, func, *args)
+
+def render_prometheus():
+    """Process-wide metrics in the Prometheus text exposition format"""
+    return _metrics.prometheus()
+
+def write_metrics(path):
+    """Write the Prometheus dump atomically, so a textfile collector never reads half a file"""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(render_prometheus())
+    os.replace(temp_path, path)
+
+class SingleFlight:
+    """Collapse concurrent calls with the same key into one; every caller gets its result or exception"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+    
+    def do(self, key, func, *args, **kwargs):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = Future()
+        if not leader:
+            increment("coalesced")
+            return call.result()
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            call.set_exception(e)
+            raise
+        else:
+            call.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+def coalesced(key):
+    """Share one in-flight call of the decorated function between concurrent callers with the same key(*args)
+
+    Callers receive the same object, so they must not modify it.
+    """
+    def decorator(func):
+        flight = SingleFlight()
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            # Every recorded cassette needs its own exchanges, so nothing is shared while recording
+            if _cassette_mode == "record":
+                return func(*args, **kwargs)
+            return flight.do(key(*args, **kwargs), func, *args, **kwargs)
+        wrapper.flight = flight
+        return wrapper
+    return decorator
+
+POST_URL_PATTERN = re.compile(r'(?:instagram\.com/(?:reel|p)/([A-Za-z0-9_-]+))')
+PROFILE_URL_PATTERN = re.compile(r'(?:https?://)?(?:www\.)?instagram\.com/([a-zA-Z0-9._]+)')
+
 def clean_instagram_url(input_str):
     """Extract username from Instagram URL or return cleaned username"""
     input_str = input_str.strip()
     
-    shortcode_match = re.search(r'(?:instagram\.com/(?:reel|p)/([A-Za-z0-9_-]+))', input_str)
+    shortcode_match = POST_URL_PATTERN.search(input_str)
     if shortcode_match:
         return ('post', shortcode_match.group(1))
     
-    profile_match = re.search(r'(?:https?://)?(?:www\.)?instagram\.com/([a-zA-Z0-9._]+)', input_str)
+    profile_match = PROFILE_URL_PATTERN.search(input_str)
     if profile_match:
         return ('profile', profile_match.group(1).replace('@', ''))
     
     return ('profile', input_str.replace('@', '').strip())
 
-def investigate_post(shortcode):
-    """Investigate a specific post or reel"""
-    try:
-        import subprocess
+DATA_DIR = os.environ.get('INSTA_INFO_HOME') or os.path.join(os.path.expanduser('~'), '.insta_info')
+CACHE_TTLS = {
+    "profile": 6 * 3600,
+    "posts": 6 * 3600,
+    "post": 24 * 3600,
+    "lookup": 24 * 3600
+}
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+class ResponseCache:
+    """SQLite-backed response cache with per-kind TTLs and LRU eviction past a size cap"""
+    
+    def __init__(self, path, ttls=CACHE_TTLS, max_bytes=CACHE_MAX_BYTES):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.ttls = ttls
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        import sqlite3
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""CREATE TABLE IF NOT EXISTS entries (
+            kind TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,
+            stored_at REAL NOT NULL, accessed_at REAL NOT NULL,
+            PRIMARY KEY (kind, key))""")
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_lru ON entries (accessed_at)")
+        # Running size of all values, counted once here and kept up to date by every write and delete
+        self._total = self._db.execute("SELECT COALESCE(SUM(LENGTH(value)), 0) FROM entries").fetchone()[0]
+    
+    def get(self, kind, key):
+        """Return the cached value, or None if it is missing or older than its TTL"""
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT value, stored_at FROM entries WHERE kind = ? AND key = ?",
+                                   (kind, str(key))).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > self.ttls.get(kind, 0):
+                self._db.execute("DELETE FROM entries WHERE kind = ? AND key = ?", (kind, str(key)))
+                self._total -= len(row[0])
+                return None
+            self._db.execute("UPDATE entries SET accessed_at = ? WHERE kind = ? AND key = ?", (now, kind, str(key)))
+        return json.loads(row[0])
+    
+    def set(self, kind, key, value):
+        """Store a JSON-serializable value, evicting least recently used entries past the size cap"""
+        now = time.time()
+        payload = json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str)
+        with self._lock:
+            replaced = self._db.execute("SELECT LENGTH(value) FROM entries WHERE kind = ? AND key = ?",
+                                        (kind, str(key))).fetchone()
+            self._db.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                             (kind, str(key), payload, now, now))
+            self._total += len(payload) - (replaced[0] if replaced else 0)
+            while self._total > self.max_bytes:
+                # Oldest entries first, a batch at a time, so only what is evicted is read
+                rows = self._db.execute("SELECT kind, key, LENGTH(value) FROM entries ORDER BY accessed_at LIMIT 64").fetchall()
+                if not rows:
+                    self._total = 0
+                    break
+                for row_kind, row_key, size in rows:
+                    if self._total <= self.max_bytes:
+                        break
+                    self._db.execute("DELETE FROM entries WHERE kind = ? AND key = ?", (row_kind, row_key))
+                    self._total -= size
+    
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+_cache = None
+_cache_enabled = True
+_cache_refresh = False
+_cache_lock = threading.Lock()
+
+def configure_cache(enabled=True, refresh=False, path=None, ttls=None):
+    """Enable/disable the response cache; refresh skips reads but still stores fresh responses
+
+    ttls overrides the time-to-live (seconds) of some kinds, e.g. {"profile": 0}.
+    """
+    global _cache, _cache_enabled, _cache_refresh
+    with _cache_lock:
+        _cache_enabled = enabled
+        _cache_refresh = refresh
+        if ttls:
+            CACHE_TTLS.update(ttls)
+        if path is not None and _cache is not None:
+            _cache.close()
+            _cache = None
+        if path is not None:
+            _cache = ResponseCache(path)
+
+def get_cache():
+    """Return the shared response cache, or None when caching is disabled"""
+    global _cache
+    if not _cache_enabled:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                import sqlite3
+                try:
+                    _cache = ResponseCache(os.path.join(DATA_DIR, 'cache.db'))
+                except (OSError, sqlite3.Error):
+                    return None
+    return _cache
+
+def cache_get(kind, key):
+    """Look up a cached response unless caching is off or a refresh was requested"""
+    cache = get_cache()
+    if cache is None or _cache_refresh:
+        return None
+    value = cache.get(kind, key)
+    increment("cache_misses" if value is None else "cache_hits")
+    return value
+
+def cache_set(kind, key, value):
+    cache = get_cache()
+    if cache is not None:
+        cache.set(kind, key, value)
+
+def cache_profile(profile):
+    """Store a profile node so the next run can rebuild the profile without network access"""
+    node = profile._node.copy()
+    # Drop the embedded first page of posts; posts are cached separately
+    node['edge_owner_to_timeline_media'] = {"count": profile.mediacount}
+    cache_set("profile", profile.username.lower(), {"node": node, "full": profile._has_full_metadata})
+
+class SnapshotStore:
+    """SQLite store of the last investigation of each account, keyed by user id"""
+    
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        import sqlite3
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""CREATE TABLE IF NOT EXISTS snapshots (
+            user_id TEXT PRIMARY KEY, username TEXT NOT NULL, newest_shortcode TEXT,
+            data TEXT NOT NULL, posts TEXT NOT NULL, updated_at REAL NOT NULL, window TEXT)""")
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(snapshots)")}
+        if "window" not in columns:
+            # Snapshots stored before the window was recorded are never trusted to cover a request
+            self._db.execute("ALTER TABLE snapshots ADD COLUMN window TEXT")
+    
+    def load(self, user_id):
+        """Return the stored snapshot of an account, or None"""
+        with self._lock:
+            row = self._db.execute("SELECT username, newest_shortcode, data, posts, updated_at, window FROM snapshots WHERE user_id = ?",
+                                   (str(user_id),)).fetchone()
+        if row is None:
+            return None
+        return {
+            "username": row[0],
+            "newest_shortcode": row[1],
+            "data": json.loads(row[2]),
+            "posts": [PostRecord.from_dict(post) for post in json.loads(row[3])],
+            "updated_at": row[4],
+            "window": json.loads(row[5]) if row[5] else None
+        }
+    
+    def save(self, user_id, investigation_data, records, window):
+        """Replace the snapshot of an account with the latest investigation, its post window and the records in it"""
+        newest = next((record.shortcode for record in records if not record.is_pinned), None)
+        data = json.dumps(investigation_data, separators=(",", ":"), ensure_ascii=False, default=str)
+        posts = json.dumps([record.to_dict() for record in records], separators=(",", ":"), ensure_ascii=False)
+        with self._lock:
+            self._db.execute("""INSERT OR REPLACE INTO snapshots (user_id, username, newest_shortcode, data, posts, updated_at, window)
+                                VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                             (str(user_id), investigation_data["username"], newest, data, posts, time.time(), json.dumps(window)))
+    
+    def accounts(self):
+        """Yield (user_id, username, full_name) of every stored account"""
+        with self._lock:
+            rows = self._db.execute("SELECT user_id, username, data FROM snapshots").fetchall()
+        for user_id, username, data in rows:
+            yield user_id, username, (json.loads(data).get("profile") or {}).get("full_name")
+    
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+_snapshots = None
+_snapshots_enabled = True
+_snapshots_lock = threading.Lock()
+
+def configure_snapshots(enabled=True, path=None):
+    """Enable/disable the snapshot store used for incremental re-investigation"""
+    global _snapshots, _snapshots_enabled
+    with _snapshots_lock:
+        _snapshots_enabled = enabled
+        if path is not None:
+            if _snapshots is not None:
+                _snapshots.close()
+            _snapshots = SnapshotStore(path)
+
+def get_snapshot_store():
+    """Return the shared snapshot store, or None when snapshots are disabled"""
+    global _snapshots
+    if not _snapshots_enabled:
+        return None
+    if _snapshots is None:
+        with _snapshots_lock:
+            if _snapshots is None:
+                import sqlite3
+                try:
+                    _snapshots = SnapshotStore(os.path.join(DATA_DIR, 'snapshots.db'))
+                except (OSError, sqlite3.Error):
+                    return None
+    return _snapshots
+
+def load_snapshot(user_id):
+    store = get_snapshot_store()
+    return store.load(user_id) if store is not None else None
+
+def save_snapshot(user_id, investigation_data, records, window):
+    store = get_snapshot_store()
+    if store is not None:
+        store.save(user_id, investigation_data, records, window)
+
+def post_window(max_posts=None, since=None):
+    """Describe the slice of the feed a run asks for, as iter_posts reads it, and whether its records carry media URLs"""
+    if max_posts is None and since is None:
+        max_posts = DEFAULT_POST_WINDOW
+    return {"max_posts": max_posts, "since": since.isoformat() if since else None, "media": _media_enabled}
+
+def close_window(window, records, mediacount):
+    """Mark a window complete when its records hold the whole feed"""
+    # Every post the profile counts and no date cut-off: nothing older exists. Fewer records than
+    # asked for is not enough, a page that failed half way ends the window early too
+    return dict(window, complete=window["since"] is None and len(records) >= mediacount)
+
+def window_covers(stored, requested):
+    """Whether a stored window holds every post of the requested one, so paging may stop at the stored posts"""
+    if not stored:
+        return False
+    # Records stored without media URLs give the media stage nothing to download
+    if requested.get("media") and not stored.get("media"):
+        return False
+    if stored.get("complete"):
+        return True
+    count_covered = stored["max_posts"] is None or (
+        requested["max_posts"] is not None and requested["max_posts"] <= stored["max_posts"])
+    since_covered = stored["since"] is None or (
+        requested["since"] is not None and requested["since"] >= stored["since"])
+    return count_covered and since_covered
+
+def merge_window(records, known, stored):
+    """Put the stored posts beyond a narrower run back behind its records, so the snapshot keeps the wider window"""
+    shortcodes = {record.shortcode for record in records}
+    # A complete window holds the whole feed, so nothing is trimmed from it
+    limit = None if stored.get("complete") else stored["max_posts"]
+    merged = list(records)
+    for record in known:
+        if limit is not None and len(merged) >= limit:
+            break
+        if record.shortcode not in shortcodes:
+            merged.append(record)
+    return merged
+
+def diff_snapshot(previous, current, new_posts):
+    """Describe what changed between a stored investigation and the current one"""
+    changes = {"since": previous.get("timestamp")}
+    old_stats = previous.get("statistics", {})
+    new_stats = current.get("statistics", {})
+    for key in ("followers", "following"):
+        if key in old_stats and key in new_stats and old_stats[key] != new_stats[key]:
+            changes[key] = {"old": old_stats[key], "new": new_stats[key], "change": new_stats[key] - old_stats[key]}
+    
+    if previous.get("biography") != current.get("biography"):
+        changes["biography"] = {"old": previous.get("biography"), "new": current.get("biography")}
+    
+    old_urls = previous.get("external_urls", [])
+    new_urls = current.get("external_urls", [])
+    added = [url for url in new_urls if url not in old_urls]
+    removed = [url for url in old_urls if url not in new_urls]
+    if added or removed:
+        changes["external_urls"] = {"added": added, "removed": removed}
+    
+    if new_posts:
+        changes["new_posts"] = new_posts
+    return changes
+
+LOOKALIKE_NGRAM = 3
+LOOKALIKE_LIMIT = 10
+LOOKALIKE_MIN_SIMILARITY = 0.35
+LOOKALIKE_FEATURE_WEIGHT = 0.2
+LOOKALIKE_FIELDS = ("username", "full_name")
+# Digits folded to the letters they pass for (1, i and l all become l); separators are dropped altogether
+LOOKALIKE_FOLD = str.maketrans("0134578i", "oleastbl", "._- ")
+
+def lookalike_skeleton(text):
+    """Fold a username or name to the letters a reader sees: no accents, case, separators or digit look-alikes"""
+    import unicodedata
+    text = unicodedata.normalize('NFKD', text or '').casefold().translate(LOOKALIKE_FOLD)
+    return ''.join(char for char in text if char.isalnum())
+
+def lookalike_grams(text, n=LOOKALIKE_NGRAM):
+    """Character n-grams of the skeleton, padded so short names and word edges still count"""
+    skeleton = lookalike_skeleton(text)
+    if not skeleton:
+        return set()
+    padded = f"^{skeleton}$"
+    return {padded[i:i + n] for i in range(max(1, len(padded) - n + 1))}
+
+def feature_agreement(features, other):
+    """Share of analyze_username_pattern features two usernames have in common"""
+    same = [features[key] == other.get(key) for key in ("has_numbers", "has_underscores", "has_dots", "all_lowercase", "year_pattern")]
+    same.append(abs(features["length"] - other.get("length", 0)) <= 2)
+    return sum(same) / len(same)
+
+class LookalikeIndex:
+    """Persistent inverted index of the n-grams of every investigated username and full name"""
+    
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        import sqlite3
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""CREATE TABLE IF NOT EXISTS accounts (
+            id INTEGER PRIMARY KEY, user_id TEXT UNIQUE, username TEXT UNIQUE NOT NULL, full_name TEXT,
+            features TEXT NOT NULL, username_grams INTEGER NOT NULL, full_name_grams INTEGER NOT NULL,
+            updated_at REAL NOT NULL)""")
+        # Keyed by gram first, so a query reads only the posting lists of its own grams
+        self._db.execute("""CREATE TABLE IF NOT EXISTS grams (
+            gram TEXT NOT NULL, field INTEGER NOT NULL, account INTEGER NOT NULL,
+            PRIMARY KEY (gram, field, account)) WITHOUT ROWID""")
+    
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM accounts").fetchone()[0]
+    
+    def add(self, user_id, username, full_name):
+        """Index an account, replacing what was stored under its user id or username; return False if nothing changed"""
+        username = username.lower()
+        user_id = str(user_id) if user_id is not None else None
+        grams = (lookalike_grams(username), lookalike_grams(full_name))
+        with self._lock:
+            rows = self._db.execute("SELECT id, user_id, username, full_name FROM accounts WHERE user_id = ? OR username = ?",
+                                    (user_id, username)).fetchall()
+            if len(rows) == 1 and rows[0][1:] == (user_id, username, full_name):
+                self._db.execute("UPDATE accounts SET updated_at = ? WHERE id = ?", (time.time(), rows[0][0]))
+                return False
+            self._db.execute("BEGIN")
+            try:
+                # A renamed account or a username taken over by someone else: drop the stale entry first
+                for account, _, old_username, old_full_name in rows:
+                    for field, text in enumerate((old_username, old_full_name)):
+                        self._db.executemany("DELETE FROM grams WHERE gram = ? AND field = ? AND account = ?",
+                                             [(gram, field, account) for gram in lookalike_grams(text)])
+                    self._db.execute("DELETE FROM accounts WHERE id = ?", (account,))
+                features = json.dumps(analyze_username_pattern(username), separators=(",", ":"))
+                account = self._db.execute("INSERT INTO accounts VALUES (NULL, ?, ?, ?, ?, ?, ?, ?)",
+                                           (user_id, username, full_name, features, len(grams[0]), len(grams[1]),
+                                            time.time())).lastrowid
+                for field, field_grams in enumerate(grams):
+                    self._db.executemany("INSERT INTO grams VALUES (?, ?, ?)", [(gram, field, account) for gram in field_grams])
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return True
+    
+    def similar(self, name, limit=LOOKALIKE_LIMIT, min_similarity=LOOKALIKE_MIN_SIMILARITY):
+        """Return the indexed accounts that look most like name, best first
+
+        The name is matched against usernames and full names, and an indexed account's own
+        full name against the other full names. Similarity is the Dice coefficient of the
+        n-gram sets; the rank blends it with how many username features the accounts share.
+        """
+        name = name.strip().lstrip('@')
+        with self._lock:
+            own = self._db.execute("SELECT id, full_name FROM accounts WHERE username = ?", (name.lower(),)).fetchone()
+            queries = [(lookalike_grams(name), field) for field in range(len(LOOKALIKE_FIELDS))]
+            if own and own[1]:
+                queries.append((lookalike_grams(own[1]), 1))
+            best = {}
+            for grams, field in queries:
+                if not grams:
+                    continue
+                # Dice >= t needs at least t * |query| / 2 shared grams, whatever the candidate's size
+                shared_min = max(1, math.ceil(min_similarity * len(grams) / 2))
+                column = f"{LOOKALIKE_FIELDS[field]}_grams"
+                rows = self._db.execute(
+                    f"""SELECT account, COUNT(*), MAX(accounts.{column}) FROM grams JOIN accounts ON accounts.id = account
+                        WHERE field = ? AND gram IN ({', '.join('?' * len(grams))})
+                        GROUP BY account HAVING COUNT(*) >= ?""",
+                    (field, *grams, shared_min))
+                for account, shared, size in rows:
+                    similarity = 2 * shared / (len(grams) + size)
+                    if similarity >= min_similarity and similarity > best.get(account, (0,))[0]:
+                        best[account] = (similarity, LOOKALIKE_FIELDS[field])
+            best.pop(own[0] if own else None, None)
+            if not best:
+                return []
+            details = {row[0]: row[1:] for row in self._db.execute(
+                f"SELECT id, username, full_name, features FROM accounts WHERE id IN ({', '.join('?' * len(best))})",
+                tuple(best))}
+        
+        features = analyze_username_pattern(name)
+        skeleton = lookalike_skeleton(name)
+        matches = []
+        for account, (similarity, field) in best.items():
+            username, full_name, stored = details[account]
+            stored = json.loads(stored)
+            agreement = feature_agreement(features, stored)
+            matches.append({
+                "username": username,
+                "full_name": full_name,
+                "similarity": round(similarity, 3),
+                "score": round((1 - LOOKALIKE_FEATURE_WEIGHT) * similarity + LOOKALIKE_FEATURE_WEIGHT * agreement, 3),
+                "matched": field,
+                "same_skeleton": lookalike_skeleton(username) == skeleton,
+                "differences": [key for key, value in features.items() if stored.get(key) != value]
+            })
+        matches.sort(key=lambda match: (-match["score"], not match["same_skeleton"], match["username"]))
+        return matches[:limit]
+    
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+_lookalikes = None
+_lookalikes_enabled = True
+_lookalikes_lock = threading.Lock()
+
+def configure_lookalikes(enabled=True, path=None):
+    """Enable/disable the lookalike index that every investigation is added to"""
+    global _lookalikes, _lookalikes_enabled
+    with _lookalikes_lock:
+        _lookalikes_enabled = enabled
+        if path is not None:
+            if _lookalikes is not None:
+                _lookalikes.close()
+            _lookalikes = LookalikeIndex(path)
+
+def get_lookalike_index():
+    """Return the shared lookalike index, or None when it is disabled
+
+    A new index is seeded with the accounts the snapshot store already holds.
+    """
+    global _lookalikes
+    if not _lookalikes_enabled:
+        return None
+    if _lookalikes is None:
+        with _lookalikes_lock:
+            if _lookalikes is None:
+                import sqlite3
+                try:
+                    index = LookalikeIndex(os.path.join(DATA_DIR, 'lookalikes.db'))
+                    store = get_snapshot_store()
+                    if store is not None and not len(index):
+                        for user_id, username, full_name in store.accounts():
+                            index.add(user_id, username, full_name)
+                    _lookalikes = index
+                except (OSError, sqlite3.Error):
+                    return None
+    return _lookalikes
+
+def find_lookalikes(name, limit=LOOKALIKE_LIMIT):
+    index = get_lookalike_index()
+    return index.similar(name, limit) if index is not None else []
+
+def index_account(user_id, username, full_name):
+    index = get_lookalike_index()
+    if index is not None:
+        index.add(user_id, username, full_name)
+
+MEDIA_WORKERS = 4
+MEDIA_CHUNK_SIZE = 64 * 1024
+MEDIA_TIMEOUT = 30
+
+def media_key(url):
+    """Identify a media URL by its path: CDN query strings carry signatures that change between fetches"""
+    parts = urlsplit(url)
+    return parts.netloc.split('.', 1)[-1] + parts.path
+
+class MediaStore:
+    """Content-addressed media files (objects/<sha256[:2]>/<sha256><ext>) with an index of the URLs already stored"""
+    
+    def __init__(self, path):
+        self.objects = os.path.join(path, 'objects')
+        os.makedirs(self.objects, exist_ok=True)
+        self._lock = threading.Lock()
+        import sqlite3
+        self._db = sqlite3.connect(os.path.join(path, 'media.db'), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""CREATE TABLE IF NOT EXISTS urls (
+            key TEXT PRIMARY KEY, sha256 TEXT NOT NULL, file TEXT NOT NULL,
+            size INTEGER NOT NULL, stored_at REAL NOT NULL)""")
+    
+    def lookup(self, url):
+        """Return the stored file of a URL, or None if it was never downloaded or its file is gone"""
+        with self._lock:
+            row = self._db.execute("SELECT sha256, file, size FROM urls WHERE key = ?", (media_key(url),)).fetchone()
+        if row is None or not os.path.exists(os.path.join(self.objects, row[1])):
+            return None
+        return {"sha256": row[0], "path": os.path.join(self.objects, row[1]), "bytes": row[2]}
+    
+    def fetch(self, url, session):
+        """Store the file behind url unless it is already stored, streaming it to disk while hashing it"""
+        stored = self.lookup(url)
+        if stored is not None:
+            increment("media_skipped")
+            return dict(stored, status="skipped")
+        
+        import hashlib
+        import tempfile
+        digest = hashlib.sha256()
+        size = 0
+        fd, partial = tempfile.mkstemp(dir=self.objects, suffix='.part')
         try:
-            import instaloader
-        except ImportError:
-            print(f"\r{Fore.YELLOW}[i] Installing instaloader...{Style.RESET_ALL}")
-            subprocess.check_call([sys.executable, "-m", "pip", "install", "instaloader"], 
-                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-            import instaloader
-        
-        old_stderr = sys.stderr
-        sys.stderr = io.StringIO()
-        L = instaloader.Instaloader()
-        post = instaloader.Post.from_shortcode(L.context, shortcode)
-        sys.stderr = old_stderr
-        
-        print(f"\n{Fore.GREEN}{Style.BRIGHT}╔{'═' * 73}╗")
-        print(f"║{' ' * 26}{Fore.YELLOW}✓ POST FOUND{Fore.GREEN}{' ' * 35}║")
-        print(f"╚{'═' * 73}╝{Style.RESET_ALL}")
-        
-        print(f"\n{Fore.YELLOW}┌{'─' * 73}┐")
-        print(f"│ {Fore.CYAN}{Style.BRIGHT}📸 POST DETAILS{Style.RESET_ALL}{Fore.YELLOW}{' '*57}│")
-        print(f"└{'─' * 73}┘{Style.RESET_ALL}")
-        print(f"{Fore.WHITE}  ➤ Owner       : {Fore.CYAN}{Style.BRIGHT}@{post.owner_username}{Style.RESET_ALL}")
-        print(f"{Fore.WHITE}  ➤ Type        : {Fore.YELLOW}{post.typename}{Style.RESET_ALL}")
-        print(f"{Fore.WHITE}  ➤ Date        : {Fore.CYAN}{post.date_local.strftime('%Y-%m-%d %H:%M:%S')}{Style.RESET_ALL}")
-        print(f"{Fore.WHITE}  ➤ Likes       : {Fore.GREEN}{Style.BRIGHT}{post.likes:,}{Style.RESET_ALL}")
-        print(f"{Fore.WHITE}  ➤ Comments    : {Fore.YELLOW}{Style.BRIGHT}{post.comments:,}{Style.RESET_ALL}")
+            with os.fdopen(fd, 'wb') as f, session.get(url, stream=True, timeout=MEDIA_TIMEOUT) as response:
+                response.raise_for_status()
+                for chunk in response.iter_content(MEDIA_CHUNK_SIZE):
+                    digest.update(chunk)
+                    f.write(chunk)
+                    size += len(chunk)
+            sha256 = digest.hexdigest()
+            extension = os.path.splitext(urlsplit(url).path)[1][:8].lower()
+            name = os.path.join(sha256[:2], sha256 + extension)
+            path = os.path.join(self.objects, name)
+            status = "duplicate" if os.path.exists(path) else "downloaded"
+            if status == "downloaded":
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(partial, path)
+        finally:
+            if os.path.exists(partial):
+                os.remove(partial)
         
-        if hasattr(post, 'video_view_count') and post.video_view_count:
-            print(f"{Fore.WHITE}  ➤ Views       : {Fore.MAGENTA}{Style.BRIGHT}{post.video_view_count:,}{Style.RESET_ALL}")
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO urls VALUES (?, ?, ?, ?, ?)",
+                             (media_key(url), sha256, name, size, time.time()))
+        increment("media_downloaded")
+        return {"sha256": sha256, "path": path, "bytes": size, "status": status}
+    
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+_media = None
+_media_enabled = False
+_media_lock = threading.Lock()
+
+def configure_media(enabled=True, path=None):
+    """Enable/disable the media stage, which needs the posts' media URLs kept on their records"""
+    global _media, _media_enabled
+    with _media_lock:
+        _media_enabled = enabled
+        if path is not None:
+            if _media is not None:
+                _media.close()
+            _media = MediaStore(path)
+
+def get_media_store():
+    """Return the shared media store, or None when the media stage is disabled"""
+    global _media
+    if not _media_enabled:
+        return None
+    if _media is None:
+        with _media_lock:
+            if _media is None:
+                _media = MediaStore(os.path.join(DATA_DIR, 'media'))
+    return _media
+
+def download_media(profile_pic_url, records, workers=MEDIA_WORKERS):
+    """Fetch the profile picture and every post's image and video concurrently into the media store"""
+    store = get_media_store()
+    session = get_http_session()
+    jobs = [("profile_pic", None, profile_pic_url)] if profile_pic_url else []
+    for record in records:
+        if record.display_url:
+            jobs.append(("image", record.shortcode, record.display_url))
+        if record.video_url:
+            jobs.append(("video", record.shortcode, record.video_url))
+    
+    def fetch(url):
+        try:
+            return store.fetch(url, session)
+        except Exception as e:
+            return {"status": "failed", "error": str(e)}
+    
+    media = {"posts": {}, "downloaded": 0, "skipped": 0, "failed": 0, "bytes": 0, "directory": store.objects}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = [(kind, shortcode, submit_traced(pool, fetch, url)) for kind, shortcode, url in jobs]
+        for kind, shortcode, future in futures:
+            result = future.result()
+            # A duplicate was downloaded, only its file was not stored again
+            media["downloaded" if result["status"] == "duplicate" else result["status"]] += 1
+            media["bytes"] += result.get("bytes", 0) if result["status"] != "skipped" else 0
+            if shortcode is None:
+                media[kind] = result
+            else:
+                media["posts"].setdefault(shortcode, {})[kind] = result
+    return media
+
+CASSETTE_VERSION = 1
+# Only what parsing the body needs; the rest of the headers would just bloat the cassette
+CASSETTE_HEADERS = ("Content-Type", "Retry-After", "Location")
+
+class Cassette:
+    """The HTTP exchanges of one investigation, keyed by method, URL and request body"""
+    
+    def __init__(self, exchanges=None):
+        self.exchanges = exchanges or {}
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def key(method, url, body):
+        if isinstance(body, bytes):
+            body = body.decode('utf-8', 'replace')
+        return f"{method} {url} {body or ''}"
+    
+    def record(self, request, response):
+        """Keep the exchange; a success replaces an earlier failure of the same request, so replays never retry"""
+        body = request.body.decode('utf-8', 'replace') if isinstance(request.body, bytes) else request.body
+        try:
+            content, encoding = response.content.decode('utf-8'), "utf-8"
+        except UnicodeDecodeError:
+            import base64
+            content, encoding = base64.b64encode(response.content).decode('ascii'), "base64"
+        exchange = {
+            "method": request.method,
+            "url": request.url,
+            "body": body,
+            "status": response.status_code,
+            "headers": {name: response.headers[name] for name in CASSETTE_HEADERS if name in response.headers},
+            "content": content,
+            "encoding": encoding
+        }
+        key = self.key(request.method, request.url, body)
+        with self._lock:
+            previous = self.exchanges.get(key)
+            if previous is None or previous["status"] >= 400:
+                self.exchanges[key] = exchange
+    
+    def find(self, request):
+        with self._lock:
+            return self.exchanges.get(self.key(request.method, request.url, request.body))
+    
+    def save(self, path, target):
+        import gzip
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._lock:
+            document = {"version": CASSETTE_VERSION, "target": target, "recorded": datetime.now().isoformat(),
+                        "exchanges": list(self.exchanges.values())}
+        temp_path = f"{path}.tmp"
+        with gzip.open(temp_path, 'wt', encoding='utf-8') as f:
+            json.dump(document, f, separators=(",", ":"), ensure_ascii=False)
+        os.replace(temp_path, path)
+    
+    @classmethod
+    def load(cls, path):
+        import gzip
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            document = json.load(f)
+        return cls({cls.key(exchange["method"], exchange["url"], exchange["body"]): exchange
+                    for exchange in document["exchanges"]})
+
+_cassette = contextvars.ContextVar("cassette", default=None)
+_cassette_mode = None
+_cassette_dir = None
+_cassette_library = None
+_cassette_lock = threading.Lock()
+
+def configure_cassettes(mode=None, directory=None):
+    """Record every HTTP exchange of each investigation into directory, or replay them from it ("record"/"replay")"""
+    global _cassette_mode, _cassette_dir, _cassette_library
+    with _cassette_lock:
+        _cassette_mode = mode
+        _cassette_dir = directory
+        _cassette_library = None
+    if mode is not None:
+        install_cassette_hook()
+
+def cassette_path(target):
+    """Cassette file of a target: one per profile (case-insensitive) or post shortcode"""
+    kind, value = clean_instagram_url(target)
+    name = f"{kind}-{value.lower() if kind == 'profile' else value}"
+    return os.path.join(_cassette_dir, re.sub(r'[^A-Za-z0-9._-]', '_', name) + '.json.gz')
+
+@contextmanager
+def cassette_scope(target):
+    """Record the HTTP exchanges made within the block (and its traced threads) into target's cassette, or replay them
+
+    Within an enclosing scope the exchanges stay in the enclosing cassette.
+    """
+    if _cassette_mode is None or _cassette.get() is not None:
+        yield
+        return
+    path = cassette_path(target)
+    if _cassette_mode == "replay" and os.path.exists(path):
+        cassette = Cassette.load(path)
+    else:
+        cassette = Cassette()
+    token = _cassette.set(cassette)
+    try:
+        yield
+    finally:
+        _cassette.reset(token)
+        if _cassette_mode == "record":
+            cassette.save(path, target)
+
+def taped(target):
+    """Run the decorated function inside the cassette scope of target(*args)"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with cassette_scope(target(*args, **kwargs)):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def library_exchange(request):
+    """Find an exchange in any cassette of the directory, for requests a session makes only once per process"""
+    global _cassette_library
+    with _cassette_lock:
+        if _cassette_library is None:
+            _cassette_library = Cassette()
+            names = os.listdir(_cassette_dir) if os.path.isdir(_cassette_dir) else []
+            for name in sorted(names):
+                if name.endswith('.json.gz'):
+                    _cassette_library.exchanges.update(Cassette.load(os.path.join(_cassette_dir, name)).exchanges)
+    return _cassette_library.find(request)
+
+def replay_response(request, exchange):
+    """Rebuild a requests Response from a recorded exchange"""
+    requests = import_dependency("requests")
+    response = requests.Response()
+    response.status_code = exchange["status"]
+    response.headers = requests.structures.CaseInsensitiveDict(exchange["headers"])
+    if exchange["encoding"] == "base64":
+        import base64
+        response._content = base64.b64decode(exchange["content"])
+    else:
+        response._content = exchange["content"].encode('utf-8')
+    response.encoding = "utf-8"
+    response.url = request.url
+    response.request = request
+    response.reason = "Replayed"
+    return response
+
+_cassette_hook_installed = False
+
+def install_cassette_hook():
+    """Put cassette recording/replay in front of every HTTP call, outside the request counters"""
+    global _cassette_hook_installed
+    with _cassette_lock:
+        if _cassette_hook_installed:
+            return
+        install_http_hook()
+        requests = import_dependency("requests")
+        adapter_class = requests.adapters.HTTPAdapter
+        send = adapter_class.send
         
-        if post.location:
-            loc = post.location.name if hasattr(post.location, 'name') else str(post.location)
-            print(f"{Fore.WHITE}  ➤ Location    : {Fore.MAGENTA}{loc}{Style.RESET_ALL}")
+        @functools.wraps(send)
+        def cassette_send(adapter, request, **kwargs):
+            cassette = _cassette.get()
+            if _cassette_mode == "replay":
+                exchange = cassette.find(request) if cassette is not None else None
+                if exchange is None:
+                    exchange = library_exchange(request)
+                if exchange is None:
+                    raise requests.ConnectionError(f"not in cassette: {request.method} {request.url}")
+                increment("replayed")
+                return replay_response(request, exchange)
+            response = send(adapter, request, **kwargs)
+            # Streamed media downloads are not recorded
+            if cassette is not None and _cassette_mode == "record" and not kwargs.get("stream"):
+                cassette.record(request, response)
+            return response
         
+        adapter_class.send = cassette_send
+        _cassette_hook_installed = True
+
+REQUIRED_MODULES = ("instaloader", "requests", "colorama")
+
+def import_dependency(name):
+    """Import a third-party module on first use, failing with install instructions if it is missing"""
+    try:
+        # import_module also waits for a module another thread is still initializing
+        if name in sys.modules:
+            return importlib.import_module(name)
+        with span(f"import.{name}"):
+            return importlib.import_module(name)
+    except ImportError as e:
+        raise ImportError(f"{name} is not installed (run: pip install -r requirements.txt)") from e
+
+def missing_dependencies():
+    """Names of required modules that are not installed, checked without importing them"""
+    return [name for name in REQUIRED_MODULES if importlib.util.find_spec(name) is None]
+
+def import_instaloader():
+    """Import instaloader on first use"""
+    return import_dependency("instaloader")
+
+_loader = None
+_loader_lock = threading.Lock()
+
+def get_loader():
+    """Return the process-wide Instaloader, creating its context on first use"""
+    global _loader
+    if _loader is None:
+        with _loader_lock:
+            if _loader is None:
+                instaloader = import_instaloader()
+                install_http_hook()
+                # Pacing is left to the shared token buckets instead of instaloader's random sleeps
+                with span("context_setup"):
+                    _loader = instaloader.Instaloader(quiet=True, sleep=False, rate_controller=SharedRateController)
+    return _loader
+
+def close_loader():
+    """Close the shared Instaloader session"""
+    global _loader
+    with _loader_lock:
+        if _loader is not None:
+            _loader.close()
+            _loader = None
+
+@coalesced(lambda username, owner=None: username.lower())
+def load_profile(username, owner=None):
+    """Load a profile through the shared context, completing owner (a post's owner profile) instead if given"""
+    instaloader = import_instaloader()
+    L = get_loader()
+    cached = cache_get("profile", username.lower())
+    if cached is not None:
+        profile = instaloader.Profile(L.context, cached["node"])
+        profile._has_full_metadata = cached["full"]
+        return profile
+    if owner is not None:
+        # The owner node embedded in a post is partial; one metadata query completes it
+        # without loading the profile page first
+        with span("profile_metadata"):
+            owner._obtain_metadata()
+        return owner
+    with span("from_username"):
+        return instaloader.Profile.from_username(L.context, username)
+
+def collect_post(shortcode):
+    """Fetch a post or reel and return its details, or None if it cannot be accessed"""
+    return fetch_post(shortcode)[0]
+
+@coalesced(lambda shortcode: shortcode)
+@taped(lambda shortcode: f"https://www.instagram.com/p/{shortcode}/")
+def fetch_post(shortcode):
+    """Fetch a post or reel and return (details, owner profile), or (None, None) if it cannot be accessed"""
+    try:
+        instaloader = import_instaloader()
+        
+        with suppress_stderr():
+            L = get_loader()
+            cached = cache_get("post", shortcode)
+            if cached is not None:
+                post = instaloader.Post(L.context, cached)
+            else:
+                post = instaloader.Post.from_shortcode(L.context, shortcode)
+                cache_set("post", shortcode, post._node)
+            owner = post.owner_profile
+        
+        post_data = {
+            "shortcode": shortcode,
+            "owner": post.owner_username,
+            "type": post.typename,
+            "date": post.date_local.strftime('%Y-%m-%d %H:%M:%S'),
+            "likes": post.likes,
+            "comments": post.comments
+        }
+        if hasattr(post, 'video_view_count') and post.video_view_count:
+            post_data["views"] = post.video_view_count
+        if post.location:
+            post_data["location"] = post.location.name if hasattr(post.location, 'name') else str(post.location)
         if post.caption:
-            print(f"\n{Fore.YELLOW}┌{'─' * 73}┐")
-            print(f"│ {Fore.CYAN}{Style.BRIGHT}📝 CAPTION{Style.RESET_ALL}{Fore.YELLOW}{' '*62}│")
-            print(f"└{'─' * 73}┘{Style.RESET_ALL}")
-            caption_lines = post.caption.split('\n')
-            for line in caption_lines[:10]:
-                print(f"{Fore.WHITE}  {line[:70]}{Style.RESET_ALL}")
-            
-            hashtags = re.findall(r'#(\w+)', post.caption)
-            mentions = re.findall(r'@([a-zA-Z0-9._]+)', post.caption)
-            
-            if hashtags:
-                print(f"\n{Fore.YELLOW}┌{'─' * 73}┐")
-                print(f"│ {Fore.CYAN}{Style.BRIGHT}#️⃣ HASHTAGS ({len(hashtags)}){Style.RESET_ALL}{Fore.YELLOW}{' ' * (57 - len(str(len(hashtags))))}│")
-                print(f"└{'─' * 73}┘{Style.RESET_ALL}")
-                for tag in hashtags[:10]:
-                    print(f"{Fore.WHITE}  ➤ {Fore.YELLOW}#{tag}{Style.RESET_ALL}")
-            
-            if mentions:
-                print(f"\n{Fore.YELLOW}┌{'─' * 73}┐")
-                print(f"│ {Fore.CYAN}{Style.BRIGHT}👥 MENTIONS ({len(mentions)}){Style.RESET_ALL}{Fore.YELLOW}{' ' * (58 - len(str(len(mentions))))}│")
-                print(f"└{'─' * 73}┘{Style.RESET_ALL}")
-                for mention in mentions[:10]:
-                    print(f"{Fore.WHITE}  ➤ {Fore.CYAN}@{mention}{Style.RESET_ALL}")
-        
-        print(f"\n{Fore.GREEN}{Style.BRIGHT}╭{'─' * 73}╮")
-        print(f"{Fore.GREEN}│{' ' * 25}{Fore.YELLOW}{Style.BRIGHT}✓ ANALYSIS COMPLETE{' ' * 28}{Fore.GREEN}│")
-        print(f"{Fore.GREEN}╰{'─' * 73}╯{Style.RESET_ALL}")
-        
-        return post.owner_username
-    except Exception as e:
-        sys.stderr = old_stderr
-        print(f"{Fore.RED}[!] Instagram is blocking post access. Trying to extract owner...{Style.RESET_ALL}")
+            tokens = scan_text(post.caption)
+            post_data["caption"] = post.caption
+            post_data["hashtags"] = tokens["hashtags"]
+            post_data["mentions"] = tokens["mentions"]
+        return post_data, owner
+    except Exception:
+        return None, None
+
+LOOKUP_URL = 'https://i.instagram.com/api/v1/users/lookup/'
+LOOKUP_HEADERS = {
+    "Accept-Language": "en-US",
+    "User-Agent": "Instagram 101.0.0.15.120",
+    "Content-Type": "application/x-www-form-urlencoded; charset=UTF-8",
+    "X-IG-App-ID": "124024574287414",
+    "Accept-Encoding": "gzip, deflate",
+    "Connection": "keep-alive"
+}
+HTTP_POOL_SIZE = 10
+
+_http_session = None
+_http_session_lock = threading.Lock()
+
+def configure_http_session(pool_size=HTTP_POOL_SIZE):
+    """Set the connection pool size of the shared session (takes effect on next use)"""
+    global HTTP_POOL_SIZE, _http_session
+    with _http_session_lock:
+        HTTP_POOL_SIZE = max(1, pool_size)
+        if _http_session is not None:
+            _http_session.close()
+            _http_session = None
+
+def get_http_session():
+    """Return the shared keep-alive session, creating it on first use"""
+    global _http_session
+    if _http_session is None:
+        with _http_session_lock:
+            if _http_session is None:
+                requests = import_dependency("requests")
+                install_http_hook()
+                session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                session.headers.update(LOOKUP_HEADERS)
+                _http_session = session
+    return _http_session
+
+_http_hook_installed = False
+_http_hook_lock = threading.Lock()
+
+def install_http_hook():
+    """Count requests, errors and bytes of every HTTP call, whichever session makes it
+
+    instaloader copies its session for each query, so the hook sits on the transport
+    adapter that all sessions share.
+    """
+    global _http_hook_installed
+    with _http_hook_lock:
+        if _http_hook_installed:
+            return
+        adapter_class = import_dependency("requests").adapters.HTTPAdapter
+        send = adapter_class.send
+        
+        @functools.wraps(send)
+        def counted_send(adapter, request, **kwargs):
+            increment("http_requests")
+            try:
+                response = send(adapter, request, **kwargs)
+            except Exception:
+                increment("http_errors")
+                raise
+            if response.status_code >= 400:
+                increment("http_errors")
+            if response.status_code == 429:
+                increment("http_throttled")
+            length = response.headers.get("Content-Length", "")
+            if length.isdigit():
+                increment("http_bytes", int(length))
+            elif not kwargs.get("stream"):
+                increment("http_bytes", len(response.content))
+            return response
+        
+        adapter_class.send = counted_send
+        _http_hook_installed = True
+
+RATE_LIMITS = {
+    # bucket: (requests per second, burst)
+    "lookup": (0.5, 5),
+    "graphql": (0.45, 10),
+    "iphone": (0.3, 5),
+    "web": (0.2, 5)
+}
+# Share of the configured rate won back by each healthy query after a 429
+RATE_RECOVERY_STEP = 0.05
+# How far past its configured rate a bucket may probe while no 429s come back: 1.0 never goes past it,
+# 1.5 lets every bucket creep up to one and a half times its limit
+RATE_HEADROOM = 1.0
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 60.0
+
+class TokenBucket:
+    """Thread-safe token bucket whose rate adapts to throttling (AIMD)"""
+    
+    def __init__(self, rate, burst):
+        self.base_rate = rate
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+    
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    def acquire(self):
+        """Block until a request may be sent"""
+        if _cassette_mode == "replay":
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self.blocked_until:
+                    wait = self.blocked_until - now
+                elif self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                else:
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+    
+    def throttled(self, retry_after=None):
+        """Halve the rate after a 429 and pause the bucket for Retry-After seconds if given"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = max(self.base_rate / 16, self.rate / 2)
+            self.tokens = min(self.tokens, 0.0)
+            if retry_after:
+                self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+    
+    def succeeded(self):
+        """Creep back towards the configured rate (times RATE_HEADROOM) after a success"""
+        with self._lock:
+            self.rate = min(self.base_rate * RATE_HEADROOM, self.rate + self.base_rate * RATE_RECOVERY_STEP)
+
+_rate_limiters = {}
+_rate_limiters_lock = threading.Lock()
+
+def get_rate_limiter(name):
+    """Return the process-wide token bucket for an endpoint family"""
+    with _rate_limiters_lock:
+        if name not in _rate_limiters:
+            rate, burst = RATE_LIMITS[name]
+            _rate_limiters[name] = TokenBucket(rate, burst)
+        return _rate_limiters[name]
+
+def backoff_delay(attempt, retry_after=None):
+    """Exponential backoff with full jitter, or the server's Retry-After when it sent one"""
+    if _cassette_mode == "replay":
+        # A replayed 429 is answered from the cassette too; there is no server to wait for
+        return 0.0
+    if retry_after:
+        return retry_after
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+def parse_retry_after(value):
+    """Parse a Retry-After header given in seconds (HTTP dates are ignored)"""
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
         return None
 
+class SharedRateController:
+    """Instaloader rate controller that sends every query through the shared token buckets"""
+    
+    def __init__(self, context):
+        self._context = context
+        self._failures = Counter()
+        self._last_429 = {}
+    
+    @staticmethod
+    def bucket_for(query_type):
+        if query_type == 'iphone':
+            return "iphone"
+        if query_type == 'other':
+            return "web"
+        return "graphql"
+    
+    def wait_before_query(self, query_type):
+        bucket = self.bucket_for(query_type)
+        limiter = get_rate_limiter(bucket)
+        limiter.acquire()
+        # Queries only count as healthy once the last 429 is well behind us
+        if time.monotonic() - self._last_429.get(bucket, float('-inf')) > BACKOFF_CAP:
+            self._failures[bucket] = 0
+            limiter.succeeded()
+    
+    def handle_429(self, query_type):
+        # instaloader does not pass the response along, so Retry-After is unavailable here
+        bucket = self.bucket_for(query_type)
+        increment("retries")
+        get_rate_limiter(bucket).throttled()
+        self._last_429[bucket] = time.monotonic()
+        time.sleep(backoff_delay(self._failures[bucket]))
+        self._failures[bucket] += 1
+
+LOOKUP_ATTEMPTS = 3
+
+@coalesced(lambda username: username.lower())
 def advanced_lookup(username):
     """Enhanced API lookup with retry mechanism"""
     data = "signed_body=SIGNATURE." + quote_plus(dumps(
@@ -114,122 +1400,656 @@ def advanced_lookup(username):
         separators=(",", ":")
     ))
     
-    for attempt in range(3):
+    cached = cache_get("lookup", username.lower())
+    if cached is not None:
+        return {"user": cached, "error": None}
+    
+    requests = import_dependency("requests")
+    limiter = get_rate_limiter("lookup")
+    error = "timeout"
+    for attempt in range(LOOKUP_ATTEMPTS):
+        retry_after = None
+        if attempt:
+            increment("retries")
+        limiter.acquire()
         try:
-            api = requests.post(
-                'https://i.instagram.com/api/v1/users/lookup/',
-                headers={
-                    "Accept-Language": "en-US",
-                    "User-Agent": "Instagram 101.0.0.15.120",
-                    "Content-Type": "application/x-www-form-urlencoded; charset=UTF-8",
-                    "X-IG-App-ID": "124024574287414",
-                    "Accept-Encoding": "gzip, deflate",
-                    "Host": "i.instagram.com",
-                    "Connection": "keep-alive",
-                    "Content-Length": str(len(data))
-                },
-                data=data,
-                timeout=10
-            )
-            return {"user": api.json(), "error": None}
-        except decoder.JSONDecodeError:
-            if attempt < 2:
-                time.sleep(2)
-                continue
-            return {"user": None, "error": "rate limit"}
-        except Exception as e:
-            return {"user": None, "error": str(e)}
-    return {"user": None, "error": "timeout"}
+            with span("lookup.attempt"):
+                api = get_http_session().post(LOOKUP_URL, data=data, timeout=10)
+        except requests.RequestException as e:
+            error = str(e)
+        else:
+            try:
+                user = api.json()
+            except ValueError:
+                user = None
+            message = str(user.get("message", "")) if isinstance(user, dict) else ""
+            if api.status_code == 429 or "wait a few minutes" in message.lower():
+                error = "rate limit"
+                retry_after = parse_retry_after(api.headers.get("Retry-After"))
+                limiter.throttled(retry_after)
+            elif user is None:
+                error = f"invalid response (HTTP {api.status_code})"
+                if api.status_code < 500:
+                    return {"user": None, "error": error}
+            else:
+                limiter.succeeded()
+                if user.get("status") != "fail":
+                    cache_set("lookup", username.lower(), user)
+                return {"user": user, "error": None}
+        
+        if attempt < LOOKUP_ATTEMPTS - 1:
+            time.sleep(backoff_delay(attempt, retry_after))
+    return {"user": None, "error": error}
+
+DIGIT_PATTERN = re.compile(r'\d')
+YEAR_PATTERN = re.compile(r'(19|20)\d{2}')
 
 def analyze_username_pattern(username):
     """Analyze username patterns for insights"""
     patterns = {
-        "has_numbers": bool(re.search(r'\d', username)),
+        "has_numbers": bool(DIGIT_PATTERN.search(username)),
         "has_underscores": '_' in username,
         "has_dots": '.' in username,
         "length": len(username),
         "all_lowercase": username.islower(),
-        "year_pattern": re.findall(r'(19|20)\d{2}', username)
+        "year_pattern": YEAR_PATTERN.findall(username)
     }
     return patterns
 
+SOCIAL_PLATFORMS = {
+    "Twitter/X": (("twitter.com", "x.com"), r'[a-zA-Z0-9_]+', ''),
+    "TikTok": (("tiktok.com",), r'[a-zA-Z0-9_.]+', '@?'),
+    "YouTube": (("youtube.com",), r'[a-zA-Z0-9_-]+', '(?:c/|channel/|@)?'),
+    "Facebook": (("facebook.com",), r'[a-zA-Z0-9.]+', ''),
+    "LinkedIn": (("linkedin.com",), r'[a-zA-Z0-9-]+', 'in/'),
+    "Snapchat": (("snapchat.com",), r'[a-zA-Z0-9_.]+', 'add/'),
+    "Telegram": (("t.me",), r'[a-zA-Z0-9_]+', ''),
+    "WhatsApp": (("wa.me",), r'\d+', ''),
+    "Discord": (("discord.gg",), r'[a-zA-Z0-9]+', ''),
+    "Threads": (("threads.net",), r'[a-zA-Z0-9_.]+', '@')
+}
+TEXT_TOKENS = {
+    "hashtag": r'#(?P<hashtag>\w+)',
+    "mention": r'@(?P<mention>[a-zA-Z0-9._]+)',
+    "url": r'h(?P<url>ttps?://[^\s\n]+)'
+}
+_scanner = None
+_scanner_lock = threading.Lock()
+
+def register_social_platform(name, domains, handle, prefix=''):
+    """Add or replace a platform recognised by extract_social_links"""
+    global _scanner
+    with _scanner_lock:
+        SOCIAL_PLATFORMS[name] = (tuple(domains), handle, prefix)
+        _scanner = None
+
+def build_scanner():
+    """Compile every token and platform pattern into one alternation"""
+    # Every branch starts with a literal ('#', '@', 'h' or the domain's last
+    # dot) so the regex engine can skip straight to candidate positions.
+    # Domains are confirmed with a lookbehind once the dot has matched.
+    branches = list(TEXT_TOKENS.values())
+    groups = {kind: (kind, None, 0) for kind in TEXT_TOKENS}
+    for i, (platform, (domains, handle, prefix)) in enumerate(SOCIAL_PLATFORMS.items()):
+        for j, domain in enumerate(domains):
+            host, tld = domain.rsplit('.', 1)
+            group = f"p{i}_{j}"
+            groups[group] = ("social", platform, len(host))
+            branches.append(
+                rf'\.(?i:{re.escape(tld)}/(?<={re.escape(domain)}/){prefix}(?P<{group}>{handle}))'
+            )
+    return re.compile('|'.join(branches)), groups
+
+def get_scanner():
+    """Return the compiled scanner, rebuilding it after registry changes"""
+    global _scanner
+    scanner = _scanner
+    if scanner is None:
+        with _scanner_lock:
+            if _scanner is None:
+                _scanner = build_scanner()
+            scanner = _scanner
+    return scanner
+
+SCAN_TRIGGER = re.compile(r'[#@.h]')
+
+def scan_text(text):
+    """Find social links, hashtags, mentions and URLs in a single pass"""
+    pattern, groups = get_scanner()
+    found = {"social": {}, "hashtag": [], "mention": [], "url": []}
+    last_end = {}
+
+    def record(match, pos):
+        group = match.lastgroup
+        kind, platform, offset = groups[group]
+        if kind == "url":
+            start, end, value = pos, match.end(), match.group()
+        else:
+            start, end, value = pos - offset, match.end(group), match.group(group)
+        key = platform or kind
+        # Each pattern used to be scanned on its own, so matches only
+        # exclude earlier matches of the same kind, never of another one.
+        if start < last_end.get(key, -1):
+            return
+        last_end[key] = end
+        if platform:
+            found["social"].setdefault(platform, []).append(value)
+        else:
+            found[kind].append(value)
+
+    for match in pattern.finditer(text):
+        start, end = match.span()
+        record(match, start)
+        for inner in SCAN_TRIGGER.finditer(text, start + 1, end):
+            overlap = pattern.match(text, inner.start())
+            if overlap:
+                record(overlap, inner.start())
+
+    return {
+        "social_links": {
+            platform: list(set(found["social"][platform]))
+            for platform in SOCIAL_PLATFORMS if platform in found["social"]
+        },
+        "hashtags": found["hashtag"],
+        "mentions": found["mention"],
+        "urls": found["url"]
+    }
+
 def extract_social_links(text):
     """Extract various social media links from text"""
-    social_patterns = {
-        "Twitter/X": r'(?:twitter\.com|x\.com)/([a-zA-Z0-9_]+)',
-        "TikTok": r'tiktok\.com/@?([a-zA-Z0-9_.]+)',
-        "YouTube": r'youtube\.com/(?:c/|channel/|@)?([a-zA-Z0-9_-]+)',
-        "Facebook": r'facebook\.com/([a-zA-Z0-9.]+)',
-        "LinkedIn": r'linkedin\.com/in/([a-zA-Z0-9-]+)',
-        "Snapchat": r'snapchat\.com/add/([a-zA-Z0-9_.]+)',
-        "Telegram": r't\.me/([a-zA-Z0-9_]+)',
-        "WhatsApp": r'wa\.me/(\d+)',
-        "Discord": r'discord\.gg/([a-zA-Z0-9]+)',
-        "Threads": r'threads\.net/@([a-zA-Z0-9_.]+)'
-    }
+    return scan_text(text)["social_links"]
+
+def posts_window(count):
+    """Declare how many of the newest posts an analyzer looks at"""
+    def decorator(func):
+        func.posts_needed = count
+        return func
+    return decorator
+
+@posts_window(50)
+def analyze_posting_patterns(posts):
+    """Analyze posting time patterns"""
+    if not posts:
+        return None
+    return PostAccumulator.from_posts(posts).posting_patterns()
+
+@posts_window(10)
+def calculate_engagement_rate(profile, posts):
+    """Calculate detailed engagement metrics"""
+    if not posts or profile.followers == 0:
+        return None
+    return PostAccumulator.from_posts(posts).engagement(profile.followers)
+
+@posts_window(20)
+def extract_locations(posts):
+    """Extract location data from posts"""
+    return PostAccumulator.from_posts(posts).locations
+
+@posts_window(50)
+def analyze_content_types(posts):
+    """Analyze types of content posted"""
+    if not posts:
+        return None
+    return PostAccumulator.from_posts(posts).content_types()
+
+RECENT_POSTS_COUNT = 10
+POST_ANALYZERS = [analyze_content_types, calculate_engagement_rate, analyze_posting_patterns, extract_locations]
+DEFAULT_POST_WINDOW = max([RECENT_POSTS_COUNT] + [analyzer.posts_needed for analyzer in POST_ANALYZERS])
+CAPTION_WINDOW = RECENT_POSTS_COUNT
+LOCATION_WINDOW = max(RECENT_POSTS_COUNT, extract_locations.posts_needed)
+
+def iter_posts(profile, max_posts=None, since=None, known=None):
+    """Lazily page through a profile's posts (newest first) as PostRecords, stopping once the window is full
+
+    Each post is reduced to its record as soon as it arrives, so no raw node outlives its page.
+    known holds the PostRecords stored by a previous run: paging stops at the first of them
+    and the rest of the window is filled from the store.
+    """
+    if max_posts is None and since is None:
+        max_posts = DEFAULT_POST_WINDOW
+    if max_posts is not None and max_posts <= 0:
+        return
     
-    found_links = {}
-    for platform, pattern in social_patterns.items():
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        if matches:
-            found_links[platform] = list(set(matches))
+    cache_key = f"records:{profile.userid}:{max_posts}:{since.isoformat() if since else ''}{':media' if _media_enabled else ''}"
+    cached = cache_get("posts", cache_key)
+    if cached is not None:
+        for data in cached:
+            yield PostRecord.from_dict(data)
+        return
     
-    return found_links
+    if known:
+        for index, post in enumerate(_page_new_posts(profile, max_posts, since, known)):
+            yield post if isinstance(post, PostRecord) else PostRecord.from_post(post, index)
+        return
+    
+    # Only a fully consumed window is cached; a partial one would look complete next time
+    records = []
+    for index, post in enumerate(_page_posts(profile, max_posts, since)):
+        record = PostRecord.from_post(post, index)
+        records.append(record)
+        yield record
+    cache_set("posts", cache_key, [record.to_dict() for record in records])
+
+def _feed(profile):
+    if 'edges' not in profile._node.get('edge_owner_to_timeline_media', {}):
+        # Profiles rebuilt from the cache carry no first page of posts; let get_posts fetch it
+        profile._has_full_metadata = False
+    # get_posts() itself fetches the first page along with the full profile, if it is missing
+    with span("get_posts.page"):
+        posts = profile.get_posts()
+    return _traced_pages(posts)
+
+def _traced_pages(posts):
+    """Iterate a NodeIterator, recording a span for every further page it fetches"""
+    page = getattr(posts, '_data', None)
+    while True:
+        start = time.perf_counter()
+        try:
+            post = next(posts)
+        except StopIteration:
+            return
+        if getattr(posts, '_data', None) is not page:
+            page = posts._data
+            record_span("get_posts.page", start, time.perf_counter() - start)
+        yield post
+
+def _before_window(post, since):
+    return since and post.date_local.replace(tzinfo=None) < since
+
+def _page_posts(profile, max_posts, since):
+    count = 0
+    for post in _feed(profile):
+        if _before_window(post, since):
+            # Pinned posts sit on top of the feed regardless of their age
+            if post.is_pinned:
+                continue
+            return
+        yield post
+        count += 1
+        if max_posts is not None and count >= max_posts:
+            return
+
+def _page_new_posts(profile, max_posts, since, known):
+    known_shortcodes = {record.shortcode for record in known}
+    seen = set()
+    count = 0
+    for post in _feed(profile):
+        if post.shortcode in known_shortcodes and not post.is_pinned:
+            break
+        if _before_window(post, since):
+            if post.is_pinned:
+                continue
+            return
+        yield post
+        seen.add(post.shortcode)
+        count += 1
+        if max_posts is not None and count >= max_posts:
+            return
+    else:
+        # The feed ran out without reaching a stored post, so the stored ones are gone
+        return
+    
+    for record in known:
+        if record.shortcode in seen or (_before_window(record, since) and not record.is_pinned):
+            continue
+        yield record
+        count += 1
+        if max_posts is not None and count >= max_posts:
+            return
+
+
+def post_location_name(post):
+    """Return the location name of a post, if any"""
+    if hasattr(post, 'location') and post.location:
+        return post.location.name if hasattr(post.location, 'name') else str(post.location)
+    return None
+
+def post_media_urls(post):
+    """(image URL, video URL or None) of a post, read from its node so no extra metadata request is made"""
+    node = post._node
+    return node.get("display_url") or node.get("display_src"), node.get("video_url") if node.get("is_video") else None
+
+_timezones = {}
+
+def share_timezone(date):
+    """Point an aware datetime at one shared tzinfo per offset instead of a fresh one per post"""
+    if date.tzinfo is None:
+        return date
+    return date.replace(tzinfo=_timezones.setdefault(date.tzinfo, date.tzinfo))
+
+class PostRecord:
+    """The fields of a post that the metrics and snapshots need, detached from instaloader"""
+    
+    __slots__ = ("shortcode", "date_local", "typename", "likes", "comments", "caption", "location", "is_pinned",
+                 "display_url", "video_url")
+    
+    def __init__(self, shortcode, date_local, typename, likes, comments, caption=None, location=None, is_pinned=False,
+                 display_url=None, video_url=None):
+        self.shortcode = shortcode
+        self.date_local = share_timezone(date_local)
+        # A handful of distinct values repeated across thousands of records
+        self.typename = sys.intern(typename) if typename else typename
+        self.likes = likes
+        self.comments = comments
+        self.caption = caption
+        self.location = sys.intern(location) if location else location
+        self.is_pinned = is_pinned
+        self.display_url = display_url
+        self.video_url = video_url
+    
+    @classmethod
+    def from_post(cls, post, index=0):
+        """Record the post at position index of the feed; caption and location are only kept where they are shown,
+        media URLs only for the media stage"""
+        display_url, video_url = post_media_urls(post) if _media_enabled else (None, None)
+        return cls(post.shortcode, post.date_local, post.typename, post.likes, post.comments,
+                   post.caption if index < CAPTION_WINDOW else None,
+                   post_location_name(post) if index < LOCATION_WINDOW else None, post.is_pinned,
+                   display_url, video_url)
+    
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["shortcode"], datetime.fromisoformat(data["date"]), data["type"], data["likes"],
+                   data["comments"], data.get("caption"), data.get("location"), data.get("pinned", False),
+                   data.get("display_url"), data.get("video_url"))
+    
+    def to_dict(self):
+        data = {
+            "shortcode": self.shortcode,
+            "date": self.date_local.isoformat(),
+            "type": self.typename,
+            "likes": self.likes,
+            "comments": self.comments
+        }
+        if self.caption:
+            data["caption"] = self.caption
+        if self.location:
+            data["location"] = self.location
+        if self.is_pinned:
+            data["pinned"] = True
+        if self.display_url:
+            data["display_url"] = self.display_url
+        if self.video_url:
+            data["video_url"] = self.video_url
+        return data
+
+class PostAccumulator:
+    """Single-pass accumulator for every post metric, fed one post at a time"""
+    
+    def __init__(self):
+        self.count = 0
+        self.type_counts = Counter()
+        self.hour_counts = Counter()
+        self.day_counts = Counter()
+        self.total_likes = 0
+        self.total_comments = 0
+        self.engagement_count = 0
+        self.locations = []
+        self.recent_posts = []
+        self.hashtags = Counter()
+        self.mentions = Counter()
+        self.latest_date = None
+        self.oldest_date = None
+        self.records = []
+        # Set when paging stopped on an error, so the window may be cut short
+        self.failed = False
+        # Columnar copies of every post for the vectorized history analytics, 8 bytes a value
+        self.timestamps = array('d')
+        self.utc_offsets = array('d')
+        self.engagements = array('d')
+    
+    @classmethod
+    def from_posts(cls, posts):
+        accumulator = cls()
+        for post in posts:
+            accumulator.add(post)
+        return accumulator
+    
+    def add(self, post):
+        """Update all metrics with the next (older) post of the feed (a Post or a PostRecord)"""
+        index = self.count
+        self.count += 1
+        if not isinstance(post, PostRecord):
+            post = PostRecord.from_post(post, index)
+        date = post.date_local
+        
+        if self.latest_date is None:
+            self.latest_date = date
+        if self.oldest_date is None or date < self.oldest_date:
+            self.oldest_date = date
+        
+        if index < analyze_content_types.posts_needed:
+            self.type_counts[post.typename] += 1
+        
+        if index < analyze_posting_patterns.posts_needed:
+            self.hour_counts[date.hour] += 1
+            self.day_counts[date.strftime('%A')] += 1
+        
+        if index < calculate_engagement_rate.posts_needed:
+            self.total_likes += post.likes
+            self.total_comments += post.comments
+            self.engagement_count += 1
+        
+        location = post.location if index < LOCATION_WINDOW else None
+        if index < extract_locations.posts_needed and location and location not in self.locations:
+            self.locations.append(location)
+        
+        self.records.append(post)
+        self.timestamps.append(date.timestamp())
+        offset = date.utcoffset()
+        self.utc_offsets.append(offset.total_seconds() if offset else 0.0)
+        self.engagements.append(post.likes + post.comments)
+        
+        if index < RECENT_POSTS_COUNT:
+            post_info = {
+                "date": date.strftime('%Y-%m-%d %H:%M'),
+                "likes": post.likes,
+                "comments": post.comments,
+                "type": post.typename
+            }
+            if location:
+                post_info["location"] = location
+            
+            if post.caption:
+                post_info["caption"] = post.caption
+                tokens = scan_text(post.caption)
+                hashtags = tokens["hashtags"]
+                mentions = tokens["mentions"]
+                self.hashtags.update(hashtags)
+                self.mentions.update(mentions)
+                if hashtags:
+                    post_info["hashtags"] = hashtags
+                if mentions:
+                    post_info["mentions"] = mentions
+            
+            self.recent_posts.append(post_info)
+    
+    def content_types(self):
+        return dict(self.type_counts) if self.type_counts else None
+    
+    def content_types_total(self):
+        return sum(self.type_counts.values())
+    
+    def engagement(self, followers):
+        if not self.engagement_count or followers == 0:
+            return None
+        total_engagement = self.total_likes + self.total_comments
+        avg_engagement = total_engagement / self.engagement_count
+        return {
+            "avg_likes": self.total_likes / self.engagement_count,
+            "avg_comments": self.total_comments / self.engagement_count,
+            "engagement_rate": (avg_engagement / followers) * 100 if followers > 0 else 0,
+            "total_engagement": total_engagement
+        }
+    
+    def posting_patterns(self):
+        if not self.count:
+            return None
+        return {
+            "most_active_hour": self.hour_counts.most_common(1)[0] if self.hour_counts else None,
+            "most_active_day": self.day_counts.most_common(1)[0] if self.day_counts else None,
+            "hour_distribution": dict(self.hour_counts.most_common(5)),
+            "day_distribution": dict(self.day_counts.most_common(3))
+        }
+    
+    def top_hashtags(self):
+        return self.hashtags.most_common(15)
+    
+    def top_mentions(self):
+        return self.mentions.most_common(10)
+    
+    def activity(self):
+        if not self.count:
+            return None
+        latest = self.latest_date.replace(tzinfo=None)
+        oldest = self.oldest_date.replace(tzinfo=None)
+        activity = {
+            "latest_post": latest.isoformat(),
+            "oldest_post": oldest.isoformat(),
+            "days_since_last_post": (datetime.now() - latest).days
+        }
+        total_days = (latest - oldest).days
+        if self.count > 1 and total_days > 0:
+            activity["avg_posts_per_month"] = self.count / (total_days / 30)
+            activity["avg_posts_per_week"] = self.count / (total_days / 7)
+        return activity
+
+@coalesced(lambda profile, max_posts=None, since=None, known=None: (profile.userid, max_posts, since))
+def collect_post_stats(profile, max_posts=None, since=None, known=None):
+    """Stream a profile's post window into a PostAccumulator"""
+    stats = PostAccumulator()
+    try:
+        with suppress_stderr(), span("post_stats"):
+            for post in iter_posts(profile, max_posts=max_posts, since=since, known=known):
+                stats.add(post)
+    except Exception:
+        stats.failed = True
+    return stats
+
+HISTORY_ROLLING_WINDOW = 10
+HISTORY_OUTLIER_SCORE = 3.5
+HISTORY_MAX_OUTLIERS = 10
+HISTORY_LONGEST_GAPS = 3
+HISTORY_RECENT_DAYS = 90
+WEEKDAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
 
-def analyze_posting_patterns(posts):
-    """Analyze posting time patterns"""
-    if not posts:
+def import_numpy():
+    """Import NumPy on first use, or return None when it is not installed"""
+    if importlib.util.find_spec("numpy") is None:
+        return None
+    return import_dependency("numpy")
+
+def history_analytics(stats, followers):
+    """Engagement, cadence, gaps, heatmap and outliers over every post of a PostAccumulator, on NumPy arrays
+
+    Returns None without NumPy or with fewer than two posts.
+    """
+    np = import_numpy()
+    n = stats.count
+    if np is None or n < 2:
         return None
+    records = stats.records
     
-    hours = [post.date_local.hour for post in posts]
-    days = [post.date_local.strftime('%A') for post in posts]
+    # The accumulator filled the columns as the posts streamed in; wrap them without copying
+    epoch = np.frombuffer(stats.timestamps, dtype=np.float64)
+    # Chronological order; pinned posts break the newest-first order of the feed
+    order = np.argsort(epoch, kind='stable')
+    epoch = epoch[order]
+    # Seconds on the poster's own clock, for the hour and weekday
+    wall = (epoch + np.frombuffer(stats.utc_offsets, dtype=np.float64)[order]).astype(np.int64)
+    engagement = np.frombuffer(stats.engagements, dtype=np.float64)[order]
+    scale = 100 / followers if followers else None
     
-    hour_dist = Counter(hours)
-    day_dist = Counter(days)
+    def date_of(position):
+        return records[order[position]].date_local.strftime('%Y-%m-%d')
     
-    return {
-        "most_active_hour": hour_dist.most_common(1)[0] if hour_dist else None,
-        "most_active_day": day_dist.most_common(1)[0] if day_dist else None,
-        "hour_distribution": dict(hour_dist.most_common(5)),
-        "day_distribution": dict(day_dist.most_common(3))
-    }
-
-def calculate_engagement_rate(profile, posts):
-    """Calculate detailed engagement metrics"""
-    if not posts or profile.followers == 0:
-        return None
+    def rate(value):
+        return round(float(value * scale if scale else value), 3)
     
-    total_likes = sum(post.likes for post in posts[:10])
-    total_comments = sum(post.comments for post in posts[:10])
-    total_engagement = total_likes + total_comments
+    history = {"posts": n, "metric": "engagement_rate" if scale else "avg_engagement"}
     
-    avg_engagement = total_engagement / min(len(posts), 10)
-    engagement_rate = (avg_engagement / profile.followers) * 100 if profile.followers > 0 else 0
+    with span("analyze.history.rolling"):
+        window = min(HISTORY_ROLLING_WINDOW, n)
+        sums = np.concatenate(([0.0], np.cumsum(engagement)))
+        rolling = (sums[window:] - sums[:-window]) / window
+        peak, low = int(np.argmax(rolling)), int(np.argmin(rolling))
+        history["rolling"] = {
+            "window": window,
+            "latest": rate(rolling[-1]),
+            "peak": rate(rolling[peak]),
+            "peak_date": date_of(peak + window - 1),
+            "low": rate(rolling[low]),
+            "low_date": date_of(low + window - 1),
+            "overall": rate(engagement.mean())
+        }
+        
+        months = wall.astype('datetime64[s]').astype('datetime64[M]')
+        month_keys, month_index, month_counts = np.unique(months, return_inverse=True, return_counts=True)
+        month_means = np.bincount(month_index, weights=engagement) / month_counts
+        history["monthly"] = [
+            {"month": str(month), "posts": int(count), history["metric"]: rate(mean)}
+            for month, count, mean in zip(month_keys, month_counts, month_means)
+        ]
     
-    return {
-        "avg_likes": total_likes / min(len(posts), 10),
-        "avg_comments": total_comments / min(len(posts), 10),
-        "engagement_rate": engagement_rate,
-        "total_engagement": total_engagement
-    }
-
-def extract_locations(posts):
-    """Extract location data from posts"""
-    locations = []
-    for post in posts[:20]:
-        if hasattr(post, 'location') and post.location:
-            loc_name = post.location.name if hasattr(post.location, 'name') else str(post.location)
-            if loc_name and loc_name not in locations:
-                locations.append(loc_name)
-    return locations
-
-def analyze_content_types(posts):
-    """Analyze types of content posted"""
-    if not posts:
-        return None
+    with span("analyze.history.heatmap"):
+        weekday = (wall // 86400 + 3) % 7  # 1970-01-01 was a Thursday
+        hour = wall % 86400 // 3600
+        heatmap = np.bincount(weekday * 24 + hour, minlength=7 * 24).reshape(7, 24)
+        busiest = int(np.argmax(heatmap))
+        history["heatmap"] = dict(zip(WEEKDAYS, heatmap.tolist()))
+        history["peak_slot"] = {"day": WEEKDAYS[busiest // 24], "hour": busiest % 24, "posts": int(heatmap.flat[busiest])}
+    
+    with span("analyze.history.cadence"):
+        span_days = float(epoch[-1] - epoch[0]) / 86400
+        week_index = ((epoch - epoch[0]) // (7 * 86400)).astype(np.int64)
+        weekly = np.bincount(week_index)
+        recent = int(np.count_nonzero(epoch >= epoch[-1] - HISTORY_RECENT_DAYS * 86400))
+        cadence = {
+            "span_days": round(span_days, 1),
+            "active_weeks": round(float(np.count_nonzero(weekly)) / len(weekly), 3),
+            "max_posts_in_week": int(weekly.max()),
+            "recent_posts_per_week": round(recent / (min(HISTORY_RECENT_DAYS, max(span_days, 1)) / 7), 2)
+        }
+        if span_days > 0:
+            cadence["posts_per_week"] = round(n / (span_days / 7), 2)
+            cadence["posts_per_month"] = round(n / (span_days / 30), 2)
+        history["cadence"] = cadence
+    
+    with span("analyze.history.gaps"):
+        gaps = np.diff(epoch) / 86400
+        longest = np.argsort(gaps)[::-1][:HISTORY_LONGEST_GAPS]
+        history["gaps"] = {
+            "median_days": round(float(np.median(gaps)), 2),
+            "mean_days": round(float(gaps.mean()), 2),
+            "p90_days": round(float(np.percentile(gaps, 90)), 2),
+            "longest": [
+                {"from": date_of(int(i)), "to": date_of(int(i) + 1), "days": round(float(gaps[i]), 1)}
+                for i in longest
+            ]
+        }
     
-    types = Counter([post.typename for post in posts[:50]])
-    return dict(types)
+    with span("analyze.history.outliers"):
+        # Robust z-score: median and MAD are not dragged along by the outliers themselves
+        median = np.median(engagement)
+        deviation = np.abs(engagement - median)
+        mad = np.median(deviation) or deviation.mean() * 1.2533
+        outliers = []
+        if mad:
+            scores = 0.6745 * (engagement - median) / mad
+            flagged = np.flatnonzero(np.abs(scores) > HISTORY_OUTLIER_SCORE)
+            flagged = flagged[np.argsort(-np.abs(scores[flagged]), kind='stable')][:HISTORY_MAX_OUTLIERS]
+            for position in flagged.tolist():
+                record = records[order[position]]
+                outliers.append({
+                    "shortcode": record.shortcode,
+                    "date": date_of(position),
+                    "likes": record.likes,
+                    "comments": record.comments,
+                    "score": round(float(scores[position]), 1),
+                    "kind": "high" if scores[position] > 0 else "low"
+                })
+        history["outliers"] = outliers
+    return history
 
 def export_to_json(data, username):
     """Export investigation results to JSON file"""
@@ -241,8 +2061,59 @@ def export_to_json(data, username):
     except Exception as e:
         return None
 
-def show_progress(percent, text="Processing", status=""):
-    """Display enhanced animated progress bar"""
+def json_encoder():
+    """Return a compact dict -> UTF-8 bytes encoder, using orjson when it is installed"""
+    try:
+        import orjson
+    except ImportError:
+        return lambda record: json.dumps(record, ensure_ascii=False, separators=(',', ':'), default=str).encode('utf-8')
+    # Same output as the json fallback: int keys become strings, datetimes go through str()
+    options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+    return lambda record: orjson.dumps(record, default=str, option=options)
+
+class NDJSONSink:
+    """Append one compact JSON record per investigation to a file ('-' for stdout), flushed as it goes"""
+    
+    def __init__(self, path, compress=False):
+        self.path = path
+        self.compress = compress
+        self._encode = json_encoder()
+        self._lock = threading.Lock()
+        if path == '-':
+            sys.stdout.flush()
+            self._raw = None
+            stream = sys.__stdout__.buffer
+        else:
+            self._raw = stream = open(path, 'ab')
+        if compress:
+            import gzip
+            # Each flush ends a deflate block, so readers can decompress what has been written so far
+            self._stream = gzip.GzipFile(fileobj=stream, mode='ab')
+        else:
+            self._stream = stream
+    
+    def write(self, record):
+        line = self._encode(record) + b'\n'
+        with self._lock:
+            self._stream.write(line)
+            self._stream.flush()
+    
+    def close(self):
+        with self._lock:
+            if self.compress:
+                # Writes the gzip trailer; the underlying stream stays open
+                self._stream.close()
+            if self._raw is not None:
+                self._raw.close()
+            else:
+                sys.__stdout__.buffer.flush()
+
+def palette(color=True):
+    """Return the (Fore, Style) pair a renderer should format with"""
+    return (Fore, Style) if color else (NO_COLOR, NO_COLOR)
+
+def format_progress(percent, text="Processing", status=""):
+    """Build one frame of the animated progress bar"""
     bar_len = 40
     filled = int(bar_len * percent / 100)
     
@@ -272,113 +2143,101 @@ def show_progress(percent, text="Processing", status=""):
     
     # Build progress line
     status_text = f" {Fore.CYAN}│{Fore.WHITE} {status}{Style.RESET_ALL}" if status else ""
-    print(f"\r{icon} {Fore.WHITE}{text:<18} {Fore.CYAN}[{bar_color}{bar}{Fore.CYAN}] {Fore.YELLOW}{percent_str}{status_text}", end='', flush=True)
+    return f"\r{icon} {Fore.WHITE}{text:<18} {Fore.CYAN}[{bar_color}{bar}{Fore.CYAN}] {Fore.YELLOW}{percent_str}{status_text}"
+
+def show_progress(percent, text="Processing", status=""):
+    """Display enhanced animated progress bar"""
+    print(format_progress(percent, text, status), end='', flush=True)
 
-def instagram_investigation(username, export_json=False):
+def post_metrics(post_data, investigation_data):
+    """Return a copy of post_data with the post's engagement relative to its owner's audience and usual posts"""
+    post_data = dict(post_data)
+    total = post_data["likes"] + post_data["comments"]
+    followers = investigation_data.get("statistics", {}).get("followers")
+    if followers:
+        post_data["engagement_rate"] = total / followers * 100
+    engagement = investigation_data.get("engagement")
+    if engagement and engagement["avg_likes"] + engagement["avg_comments"] > 0:
+        post_data["vs_average"] = total / (engagement["avg_likes"] + engagement["avg_comments"])
+    return post_data
+
+@taped(lambda username, *args, **kwargs: username)
+@traced
+def collect_investigation(username, max_posts=None, since=None, progress=None, owner=None):
+    """Investigate a username or URL and return the investigation_data dict, without any output
+
+    owner is an already fetched Profile of the account, such as a post's owner, to complete
+    instead of loading the profile from scratch.
+    """
     start_time = time.time()
-    print(f"\n{Fore.CYAN}{Style.BRIGHT}╔{'═' * 73}╗")
-    print(f"║{' ' * 18}{Fore.YELLOW}📷 INSTAGRAM OSINT INVESTIGATION{Fore.CYAN}{' ' * 22} ║")
-    print(f"╚{'═' * 73}╝{Style.RESET_ALL}\n")
+    progress = progress or (lambda percent, text, status: None)
     
     result = clean_instagram_url(username)
+    source_post = None
     if result[0] == 'post':
-        owner = investigate_post(result[1])
-        if owner:
-            print(f"\n{Fore.CYAN}[i] Investigating post owner: @{owner}{Style.RESET_ALL}")
-            username = owner
-        else:
-            return
+        source_post, owner = fetch_post(result[1])
+        if not source_post:
+            return {"username": None, "post": result[1], "error": "post not accessible"}
+        username = source_post["owner"]
     else:
         username = result[1]
     
     if not username:
-        print(f"{Fore.RED}[!] Could not extract username from URL{Style.RESET_ALL}")
-        return
+        return {"username": None, "error": "could not extract username"}
     
     investigation_data = {"username": username, "timestamp": datetime.now().isoformat()}
+    if source_post:
+        investigation_data["source_post"] = source_post
     
-    print(f"{Fore.YELLOW}┌{'─' * 73}┐")
-    print(f"│ {Fore.CYAN}{Style.BRIGHT}🎯 TARGET INFORMATION{Style.RESET_ALL}{Fore.YELLOW}{' ' * 51}│")
-    print(f"└{'─' * 73}┘{Style.RESET_ALL}")
-    print(f"{Fore.WHITE}  ➤ Username    : {Fore.YELLOW}{Style.BRIGHT}@{username}{Style.RESET_ALL}")
-    print(f"{Fore.WHITE}  ➤ Timestamp   : {Fore.CYAN}{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}{Style.RESET_ALL}")
-    
-    print()
-    show_progress(0, "Initializing", "Starting...")
+    progress(0, "Initializing", "Starting...")
     
+    # Independent network stages run side by side and are joined once the profile is parsed
+    stages = ThreadPoolExecutor(max_workers=2)
     try:
-        import subprocess
-        try:
-            import instaloader
-        except ImportError:
-            print(f"\r{Fore.YELLOW}[i] Installing instaloader...{Style.RESET_ALL}")
-            subprocess.check_call([sys.executable, "-m", "pip", "install", "instaloader"], 
-                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-            import instaloader
-        
-        show_progress(15, "Connecting", "Establishing connection...")
-        L = instaloader.Instaloader()
-        show_progress(30, "Loading", "Fetching profile...")
-        profile = instaloader.Profile.from_username(L.context, username)
-        show_progress(50, "Processing", "Parsing data...")
-        
-        print(f"\r{' ' * 150}\r", end='', flush=True)
-        print(f"\n{Fore.GREEN}{Style.BRIGHT}╔{'═' * 73}╗")
-        print(f"║{' ' * 24}{Fore.YELLOW}✓ PROFILE FOUND{Fore.GREEN}{' ' * 34}║")
-        print(f"╚{'═' * 73}╝{Style.RESET_ALL}")
-        
-        print(f"\n{Fore.YELLOW}┌{'─' * 73}┐")
-        print(f"│ {Fore.CYAN}{Style.BRIGHT}👤 BASIC INFORMATION{Style.RESET_ALL}{Fore.YELLOW}{' '*52}│")
-        print(f"└{'─' * 73}┘{Style.RESET_ALL}")
-        print(f"{Fore.WHITE}  ➤ Username    : {Fore.CYAN}{Style.BRIGHT}@{profile.username}{Style.RESET_ALL}")
-        print(f"{Fore.WHITE}  ➤ Full Name   : {Fore.YELLOW}{profile.full_name if profile.full_name else 'N/A'}{Style.RESET_ALL}")
-        print(f"{Fore.WHITE}  ➤ User ID     : {Fore.MAGENTA}{profile.userid}{Style.RESET_ALL}")
+        import_instaloader()
+        lookup_future = submit_traced(stages, advanced_lookup, username)
+        
+        progress(15, "Connecting", "Establishing connection...")
+        get_loader()
+        progress(30, "Loading", "Fetching profile...")
+        profile = load_profile(username, owner)
+        with span("snapshot.load"):
+            snapshot = load_snapshot(profile.userid)
+        # A refresh re-reads the whole window instead of trusting the stored posts, and paging may only
+        # stop at a stored post when the stored window reaches at least as far back as this one
+        window = post_window(max_posts, since)
+        known = None
+        if snapshot and not _cache_refresh and window_covers(snapshot["window"], window):
+            known = snapshot["posts"]
+        posts_future = None
+        if not profile.is_private and profile.mediacount > 0:
+            # get_posts() may complete the profile's metadata, swapping its node; on a copy of the profile
+            # it cannot change what the fields read below see, whichever thread gets there first
+            feed_profile = copy.copy(profile)
+            feed_profile._node = dict(profile._node)
+            posts_future = submit_traced(stages, collect_post_stats, feed_profile, max_posts, since, known)
+        progress(50, "Processing", "Parsing data...")
         
         investigation_data["profile"] = {
             "username": profile.username,
             "full_name": profile.full_name,
             "user_id": profile.userid,
             "is_private": profile.is_private,
-            "is_verified": profile.is_verified
+            "is_verified": profile.is_verified,
+            "is_business": profile.is_business_account
         }
         
         if profile.biography:
-            print(f"\n{Fore.YELLOW}┌{'─' * 73}┐")
-            print(f"│ {Fore.CYAN}{Style.BRIGHT}📄 BIOGRAPHY{Style.RESET_ALL}{Fore.YELLOW}{' '*60}│")
-            print(f"└{'─' * 73}┘{Style.RESET_ALL}")
-            bio_lines = profile.biography.split('\n')
-            for line in bio_lines:
-                print(f"{Fore.CYAN}  {line}{Style.RESET_ALL}")
             investigation_data["biography"] = profile.biography
         
-        print(f"\n{Fore.YELLOW}┌{'─' * 73}┐")
-        print(f"│ {Fore.CYAN}{Style.BRIGHT}📊 ACCOUNT STATISTICS{Style.RESET_ALL}{Fore.YELLOW}{' '*51}│")
-        print(f"└{'─' * 73}┘{Style.RESET_ALL}")
-        print(f"{Fore.WHITE}  ➤ Followers   : {Fore.GREEN}{Style.BRIGHT}{profile.followers:,}{Style.RESET_ALL}")
-        print(f"{Fore.WHITE}  ➤ Following   : {Fore.YELLOW}{Style.BRIGHT}{profile.followees:,}{Style.RESET_ALL}")
-        print(f"{Fore.WHITE}  ➤ Posts       : {Fore.CYAN}{Style.BRIGHT}{profile.mediacount:,}{Style.RESET_ALL}")
-        
-        if profile.followers > 0:
-            ratio = profile.followees / profile.followers
-            print(f"{Fore.WHITE}Follow Ratio: {Fore.CYAN}{ratio:.3f} {Fore.WHITE}(Following/Followers)")
-            
-            if ratio > 2:
-                print(f"{Fore.WHITE}  ➤ Analysis    : {Fore.YELLOW}⚠ High follow ratio - possible engagement farming{Style.RESET_ALL}")
-            elif ratio < 0.5 and profile.followers > 1000:
-                print(f"{Fore.WHITE}  ➤ Analysis    : {Fore.GREEN}✓ Low follow ratio - strong audience{Style.RESET_ALL}")
-        
-        investigation_data["statistics"] = {
+        statistics = {
             "followers": profile.followers,
             "following": profile.followees,
             "posts": profile.mediacount
         }
-        
-        print(f"\n{Fore.YELLOW}┌{'─' * 73}┐")
-        print(f"│ {Fore.CYAN}{Style.BRIGHT}🏷️  ACCOUNT TYPE & STATUS{Style.RESET_ALL}{Fore.YELLOW}{' '*48}│")
-        print(f"└{'─' * 73}┘{Style.RESET_ALL}")
-        print(f"{Fore.WHITE}  ➤ Private     : {Fore.RED if profile.is_private else Fore.GREEN}{Style.BRIGHT}{'Yes' if profile.is_private else 'No'}{Style.RESET_ALL}")
-        print(f"{Fore.WHITE}  ➤ Verified    : {Fore.GREEN if profile.is_verified else Fore.YELLOW}{Style.BRIGHT}{'Yes' if profile.is_verified else 'No'}{Style.RESET_ALL}")
-        print(f"{Fore.WHITE}  ➤ Business    : {Fore.CYAN if profile.is_business_account else Fore.YELLOW}{Style.BRIGHT}{'Yes' if profile.is_business_account else 'No'}{Style.RESET_ALL}")
+        if profile.followers > 0:
+            statistics["follow_ratio"] = profile.followees / profile.followers
+        investigation_data["statistics"] = statistics
         
         try:
             if hasattr(profile, '_node'):
@@ -386,35 +2245,28 @@ def instagram_investigation(username, export_json=False):
                 extended_data = {}
                 
                 if 'category_name' in node and node['category_name']:
-                    print(f"{Fore.WHITE}  ➤ Category    : {Fore.CYAN}{node['category_name']}{Style.RESET_ALL}")
                     extended_data["category"] = node['category_name']
                 
                 if 'business_email' in node and node['business_email']:
-                    print(f"{Fore.WHITE}  ➤ Biz Email   : {Fore.YELLOW}{node['business_email']}{Style.RESET_ALL}")
                     extended_data["business_email"] = node['business_email']
                 
                 if 'business_phone_number' in node and node['business_phone_number']:
-                    print(f"{Fore.WHITE}  ➤ Biz Phone   : {Fore.YELLOW}{node['business_phone_number']}{Style.RESET_ALL}")
                     extended_data["business_phone"] = node['business_phone_number']
                 
                 if 'public_email' in node and node['public_email']:
-                    print(f"{Fore.WHITE}  ➤ Public Email: {Fore.YELLOW}{node['public_email']}{Style.RESET_ALL}")
                     extended_data["public_email"] = node['public_email']
                 
                 if 'public_phone_number' in node and node['public_phone_number']:
-                    print(f"{Fore.WHITE}  ➤ Public Phone: {Fore.YELLOW}{node['public_phone_number']}{Style.RESET_ALL}")
                     extended_data["public_phone"] = node['public_phone_number']
                 
                 if 'edge_felix_video_timeline' in node and node['edge_felix_video_timeline']:
                     reels_count = node['edge_felix_video_timeline'].get('count', 0)
                     if reels_count > 0:
-                        print(f"{Fore.WHITE}  ➤ Reels       : {Fore.CYAN}{reels_count}{Style.RESET_ALL}")
                         extended_data["reels"] = reels_count
                 
                 if 'edge_highlight_reels' in node and node['edge_highlight_reels']:
                     highlights_count = node['edge_highlight_reels'].get('count', 0)
                     if highlights_count > 0:
-                        print(f"{Fore.WHITE}  ➤ Highlights  : {Fore.CYAN}{highlights_count}{Style.RESET_ALL}")
                         extended_data["highlights"] = highlights_count
                 
                 if extended_data:
@@ -422,43 +2274,25 @@ def instagram_investigation(username, export_json=False):
         except:
             pass
         
-        print(f"\n{Fore.YELLOW}┌{'─' * 73}┐")
-        print(f"│ {Fore.CYAN}{Style.BRIGHT}🔍 API LOOKUP{Style.RESET_ALL}{Fore.YELLOW}{' ' * 59}│")
-        print(f"└{'─' * 73}┘{Style.RESET_ALL}")
-        other_infos = advanced_lookup(profile.username)
+        other_infos = lookup_future.result()
         if other_infos["error"] is None and other_infos.get("user"):
             api_data = {}
             if "obfuscated_email" in other_infos["user"] and other_infos["user"]["obfuscated_email"]:
-                print(f"{Fore.WHITE}  ➤ Email       : {Fore.YELLOW}{other_infos['user']['obfuscated_email']}{Style.RESET_ALL}")
                 api_data["obfuscated_email"] = other_infos['user']['obfuscated_email']
             
             if "obfuscated_phone" in other_infos["user"] and str(other_infos["user"]["obfuscated_phone"]):
-                print(f"{Fore.WHITE}  ➤ Phone       : {Fore.YELLOW}{other_infos['user']['obfuscated_phone']}{Style.RESET_ALL}")
                 api_data["obfuscated_phone"] = str(other_infos['user']['obfuscated_phone'])
             
             if api_data:
                 investigation_data["api_data"] = api_data
         
-        if profile.biography:
-            mentions = re.findall(r'@([a-zA-Z0-9._]+)', profile.biography)
-            if mentions:
-                print(f"\n{Fore.YELLOW}┌{'─' * 73}┐")
-                print(f"│ {Fore.CYAN}{Style.BRIGHT}👥 TAGGED ACCOUNTS IN BIO ({len(mentions)}){Style.RESET_ALL}{Fore.YELLOW}{' ' * (45 - len(str(len(mentions))))}│")
-                print(f"└{'─' * 73}┘{Style.RESET_ALL}")
-                for mention in mentions:
-                    print(f"{Fore.WHITE}  ➤ @{Fore.YELLOW}{Style.BRIGHT}{mention}{Style.RESET_ALL}")
-                investigation_data["bio_mentions"] = mentions
+        bio_tokens = scan_text(profile.biography or '')
+        if profile.biography and bio_tokens["mentions"]:
+            investigation_data["bio_mentions"] = bio_tokens["mentions"]
         
         bio_text = f"{profile.biography} {profile.external_url or ''}"
         social_links = extract_social_links(bio_text)
-        
         if social_links:
-            print(f"\n{Fore.YELLOW}┌{'─' * 73}┐")
-            print(f"│ {Fore.CYAN}{Style.BRIGHT}🌐 CONNECTED SOCIAL MEDIA{Style.RESET_ALL}{Fore.YELLOW}{' '*48} │")
-            print(f"└{'─' * 73}┘{Style.RESET_ALL}")
-            for platform, usernames in social_links.items():
-                for user in usernames:
-                    print(f"{Fore.WHITE}  ➤ {platform:<12}: {Fore.CYAN}{Style.BRIGHT}{user}{Style.RESET_ALL}")
             investigation_data["social_links"] = social_links
         
         all_links = []
@@ -472,248 +2306,1297 @@ def instagram_investigation(username, export_json=False):
                 all_links.append(profile.external_url)
             
             if profile.biography:
-                url_pattern = r'https?://[^\s\n]+'
-                bio_urls = re.findall(url_pattern, profile.biography)
-                for url in bio_urls:
+                for url in bio_tokens["urls"]:
                     if url not in all_links:
                         all_links.append(url)
         
         if all_links:
-            print(f"\n{Fore.YELLOW}┌{'─' * 73}┐")
-            print(f"│ {Fore.CYAN}{Style.BRIGHT}🔗 EXTERNAL URLS ({len(all_links)}){Style.RESET_ALL}{Fore.YELLOW}{' ' * (53 - len(str(len(all_links))))}│")
-            print(f"└{'─' * 73}┘{Style.RESET_ALL}")
-            for i, link in enumerate(all_links, 1):
-                print(f"{Fore.WHITE}  ➤ {Fore.MAGENTA}{i}. {Fore.CYAN}{link}{Style.RESET_ALL}")
             investigation_data["external_urls"] = all_links
         
-        print(f"\n{Fore.YELLOW}┌{'─' * 73}┐")
-        print(f"│ {Fore.CYAN}{Style.BRIGHT}🖼️  MEDIA{Style.RESET_ALL}{Fore.YELLOW}{' '*64}│")
-        print(f"└{'─' * 73}┘{Style.RESET_ALL}")
-        print(f"{Fore.WHITE}  ➤ Profile Picture: {Fore.CYAN}{Style.BRIGHT}[\033]8;;{profile.profile_pic_url}\033\\{Fore.GREEN}Click Here{Fore.CYAN}\033]8;;\033\\]{Style.RESET_ALL}")
         investigation_data["profile_pic_url"] = profile.profile_pic_url
         
-        posts = []
-        if not profile.is_private and profile.mediacount > 0:
-            try:
-                print(f"\n{Fore.WHITE}[{Fore.CYAN}+{Fore.WHITE}] Fetching posts data...")
-                old_stderr = sys.stderr
-                sys.stderr = io.StringIO()
-                posts = list(profile.get_posts())
-                sys.stderr = old_stderr
-            except Exception:
-                pass
-        
-        if not profile.is_private and posts and len(posts) > 0:
-            content_types = analyze_content_types(posts)
-            if content_types:
-                print(f"\n{Fore.YELLOW}┌{'─' * 73}┐")
-                print(f"│ {Fore.CYAN}{Style.BRIGHT}📈 CONTENT TYPE DISTRIBUTION{Style.RESET_ALL}{Fore.YELLOW}{' '*44}│")
-                print(f"└{'─' * 73}┘{Style.RESET_ALL}")
-                for ctype, count in content_types.items():
-                    percentage = (count / len(posts[:50])) * 100
-                    bar = '█' * int(percentage / 2)
-                    print(f"{Fore.WHITE}  ➤ {ctype:<15}: {Fore.CYAN}{Style.BRIGHT}{count:>3} {Fore.GREEN}{bar} {Fore.WHITE}({percentage:.1f}%){Style.RESET_ALL}")
-                investigation_data["content_types"] = content_types
-            
-            engagement_data = calculate_engagement_rate(profile, posts)
-            if engagement_data:
-                print(f"\n{Fore.YELLOW}┌{'─' * 73}┐")
-                print(f"│ {Fore.CYAN}{Style.BRIGHT}💬 ENGAGEMENT METRICS{Style.RESET_ALL}{Fore.YELLOW}{' '*52}│")
-                print(f"└{'─' * 73}┘{Style.RESET_ALL}")
-                print(f"{Fore.WHITE}  ➤ Avg Likes       : {Fore.GREEN}{Style.BRIGHT}{engagement_data['avg_likes']:>8.0f}{Style.RESET_ALL}")
-                print(f"{Fore.WHITE}  ➤ Avg Comments    : {Fore.YELLOW}{Style.BRIGHT}{engagement_data['avg_comments']:>8.0f}{Style.RESET_ALL}")
-                print(f"{Fore.WHITE}  ➤ Engagement Rate : {Fore.CYAN}{Style.BRIGHT}{engagement_data['engagement_rate']:>7.2f}%{Style.RESET_ALL}")
+        stats = PostAccumulator()
+        if posts_future is not None:
+            stats = posts_future.result()
+            if feed_profile._has_full_metadata and not profile._has_full_metadata:
+                # Keep the completed node for the profile cache, now that every field is read
+                profile._node, profile._has_full_metadata = feed_profile._node, True
+            if stats.count > 0:
+                with span("analyze.content_types"):
+                    content_types = stats.content_types()
+                if content_types:
+                    investigation_data["content_types"] = content_types
                 
-                if engagement_data['engagement_rate'] > 5:
-                    print(f"{Fore.GREEN}     ✓ Excellent engagement rate{Style.RESET_ALL}")
-                elif engagement_data['engagement_rate'] > 2:
-                    print(f"{Fore.YELLOW}     • Good engagement rate{Style.RESET_ALL}")
-                else:
-                    print(f"{Fore.RED}     ⚠ Low engagement rate{Style.RESET_ALL}")
+                with span("analyze.engagement"):
+                    engagement_data = stats.engagement(profile.followers)
+                if engagement_data:
+                    investigation_data["engagement"] = engagement_data
                 
-                investigation_data["engagement"] = engagement_data
-            
-            posting_patterns = analyze_posting_patterns(posts)
-            if posting_patterns:
-                print(f"\n{Fore.YELLOW}┌{'─' * 73}┐")
-                print(f"│ {Fore.CYAN}{Style.BRIGHT}⏰ POSTING PATTERNS{Style.RESET_ALL}{Fore.YELLOW}{' '*55}│")
-                print(f"└{'─' * 73}┘{Style.RESET_ALL}")
-                if posting_patterns["most_active_hour"]:
-                    hour, count = posting_patterns["most_active_hour"]
-                    print(f"{Fore.WHITE}  ➤ Most Active Hour: {Fore.YELLOW}{Style.BRIGHT}{hour}:00 {Fore.WHITE}({count} posts){Style.RESET_ALL}")
-                if posting_patterns["most_active_day"]:
-                    day, count = posting_patterns["most_active_day"]
-                    print(f"{Fore.WHITE}  ➤ Most Active Day : {Fore.YELLOW}{Style.BRIGHT}{day} {Fore.WHITE}({count} posts){Style.RESET_ALL}")
+                with span("analyze.posting_patterns"):
+                    posting_patterns = stats.posting_patterns()
+                if posting_patterns:
+                    investigation_data["posting_patterns"] = posting_patterns
                 
-                print(f"\n{Fore.WHITE}  Top Active Hours:{Style.RESET_ALL}")
-                for hour, count in posting_patterns["hour_distribution"].items():
-                    bar = '█' * min(count * 2, 30)
-                    print(f"{Fore.WHITE}    {hour:02d}:00 {Fore.CYAN}{bar} {Fore.WHITE}{count}{Style.RESET_ALL}")
+                if stats.locations:
+                    investigation_data["locations"] = stats.locations
                 
-                investigation_data["posting_patterns"] = posting_patterns
+                investigation_data["recent_posts"] = stats.recent_posts
+                with span("analyze.top_tags"):
+                    if stats.hashtags:
+                        investigation_data["top_hashtags"] = dict(stats.top_hashtags())
+                    if stats.mentions:
+                        investigation_data["top_mentions"] = dict(stats.top_mentions())
+                with span("analyze.activity"):
+                    investigation_data["activity"] = stats.activity()
+                with span("analyze.history"):
+                    history = history_analytics(stats, profile.followers)
+                if history:
+                    investigation_data["history"] = history
+        
+        if source_post:
+            investigation_data["source_post"] = post_metrics(source_post, investigation_data)
+        
+        if _media_enabled:
+            progress(90, "Media", "Downloading media...")
+            with span("media"):
+                investigation_data["media"] = download_media(profile.profile_pic_url, stats.records)
+        
+        if snapshot:
+            previous_dates = [record.date_local for record in snapshot["posts"] if not record.is_pinned]
+            newest_known = max(previous_dates) if previous_dates else None
+            stored = {record.shortcode for record in snapshot["posts"]}
+            new_posts = [record.shortcode for record in stats.records
+                         if record.shortcode not in stored and (newest_known is None or record.date_local > newest_known)]
+            investigation_data["changes"] = diff_snapshot(snapshot["data"], investigation_data, new_posts)
+        # A window cut short by a paging error would be taken for the whole window next time
+        if not stats.failed:
+            with span("snapshot.save"):
+                if known is not None:
+                    # New records only carry media URLs when this run has the media stage on
+                    records = merge_window(stats.records, known, snapshot["window"])
+                    window = dict(snapshot["window"], media=bool(snapshot["window"].get("media")) and window["media"])
+                else:
+                    records, window = stats.records, close_window(window, stats.records, profile.mediacount)
+                save_snapshot(profile.userid, investigation_data, records, window)
+        with span("lookalikes"):
+            # Looked up before the account itself is indexed, so a first investigation finds its lookalikes too
+            lookalikes = find_lookalikes(profile.username)
+            index_account(profile.userid, profile.username, profile.full_name)
+        if lookalikes:
+            investigation_data["lookalikes"] = lookalikes
+        
+        cache_profile(profile)
+    except Exception as e:
+        investigation_data["error"] = str(e)
+    finally:
+        stages.shutdown(wait=False)
+    
+    investigation_data["elapsed"] = round(time.time() - start_time, 2)
+    return investigation_data
+
+def render_post(post_data, color=True):
+    """Render the details of an investigated post or reel"""
+    Fore, Style = palette(color)
+    out = io.StringIO()
+    emit = functools.partial(print, file=out)
+    
+    emit(f"\n{Fore.GREEN}{Style.BRIGHT}╔{'═' * 73}╗")
+    emit(f"║{' ' * 26}{Fore.YELLOW}✓ POST FOUND{Fore.GREEN}{' ' * 35}║")
+    emit(f"╚{'═' * 73}╝{Style.RESET_ALL}")
+    
+    emit(f"\n{Fore.YELLOW}┌{'─' * 73}┐")
+    emit(f"│ {Fore.CYAN}{Style.BRIGHT}📸 POST DETAILS{Style.RESET_ALL}{Fore.YELLOW}{' '*57}│")
+    emit(f"└{'─' * 73}┘{Style.RESET_ALL}")
+    emit(f"{Fore.WHITE}  ➤ Owner       : {Fore.CYAN}{Style.BRIGHT}@{post_data['owner']}{Style.RESET_ALL}")
+    emit(f"{Fore.WHITE}  ➤ Type        : {Fore.YELLOW}{post_data['type']}{Style.RESET_ALL}")
+    emit(f"{Fore.WHITE}  ➤ Date        : {Fore.CYAN}{post_data['date']}{Style.RESET_ALL}")
+    emit(f"{Fore.WHITE}  ➤ Likes       : {Fore.GREEN}{Style.BRIGHT}{post_data['likes']:,}{Style.RESET_ALL}")
+    emit(f"{Fore.WHITE}  ➤ Comments    : {Fore.YELLOW}{Style.BRIGHT}{post_data['comments']:,}{Style.RESET_ALL}")
+    
+    if "views" in post_data:
+        emit(f"{Fore.WHITE}  ➤ Views       : {Fore.MAGENTA}{Style.BRIGHT}{post_data['views']:,}{Style.RESET_ALL}")
+    
+    if "location" in post_data:
+        emit(f"{Fore.WHITE}  ➤ Location    : {Fore.MAGENTA}{post_data['location']}{Style.RESET_ALL}")
+    
+    if "caption" in post_data:
+        emit(f"\n{Fore.YELLOW}┌{'─' * 73}┐")
+        emit(f"│ {Fore.CYAN}{Style.BRIGHT}📝 CAPTION{Style.RESET_ALL}{Fore.YELLOW}{' '*62}│")
+        emit(f"└{'─' * 73}┘{Style.RESET_ALL}")
+        caption_lines = post_data["caption"].split('\n')
+        for line in caption_lines[:10]:
+            emit(f"{Fore.WHITE}  {line[:70]}{Style.RESET_ALL}")
+        
+        hashtags = post_data["hashtags"]
+        mentions = post_data["mentions"]
+        
+        if hashtags:
+            emit(f"\n{Fore.YELLOW}┌{'─' * 73}┐")
+            emit(f"│ {Fore.CYAN}{Style.BRIGHT}#️⃣ HASHTAGS ({len(hashtags)}){Style.RESET_ALL}{Fore.YELLOW}{' ' * (57 - len(str(len(hashtags))))}│")
+            emit(f"└{'─' * 73}┘{Style.RESET_ALL}")
+            for tag in hashtags[:10]:
+                emit(f"{Fore.WHITE}  ➤ {Fore.YELLOW}#{tag}{Style.RESET_ALL}")
+        
+        if mentions:
+            emit(f"\n{Fore.YELLOW}┌{'─' * 73}┐")
+            emit(f"│ {Fore.CYAN}{Style.BRIGHT}👥 MENTIONS ({len(mentions)}){Style.RESET_ALL}{Fore.YELLOW}{' ' * (58 - len(str(len(mentions))))}│")
+            emit(f"└{'─' * 73}┘{Style.RESET_ALL}")
+            for mention in mentions[:10]:
+                emit(f"{Fore.WHITE}  ➤ {Fore.CYAN}@{mention}{Style.RESET_ALL}")
+    
+    emit(f"\n{Fore.GREEN}{Style.BRIGHT}╭{'─' * 73}╮")
+    emit(f"{Fore.GREEN}│{' ' * 25}{Fore.YELLOW}{Style.BRIGHT}✓ ANALYSIS COMPLETE{' ' * 28}{Fore.GREEN}│")
+    emit(f"{Fore.GREEN}╰{'─' * 73}╯{Style.RESET_ALL}")
+    return out.getvalue()
+
+def render_error(username, error_msg, color=True):
+    """Render why an investigation failed"""
+    Fore, Style = palette(color)
+    out = io.StringIO()
+    emit = functools.partial(print, file=out)
+    
+    if "is not installed" in error_msg:
+        emit(f"\r{Fore.RED}[!] Missing dependency: {error_msg}{Style.RESET_ALL}")
+        return out.getvalue()
+    
+    emit(f"\r{Fore.RED}{Style.BRIGHT}\n{'╔' + '═' * 73 + '╗'}")
+    emit(f"║{' '*22}{Fore.YELLOW}INVESTIGATION RESULTS{Fore.RED}{' '*30}║")
+    emit(f"{'╚' + '═' * 73 + '╝'}{Style.RESET_ALL}")
+    
+    if "does not exist" in error_msg.lower() or "not exist" in error_msg.lower():
+        emit(f"\n{Fore.RED}{Style.BRIGHT}╭{'─' * 73}╮")
+        emit(f"{Fore.RED}│ {Fore.YELLOW}{Style.BRIGHT}✗ PROFILE NOT FOUND{' ' * 54}{Fore.RED}│")
+        emit(f"{Fore.RED}├{'─' * 73}┤{Style.RESET_ALL}")
+        emit(f"{Fore.RED}│ {Fore.YELLOW}➤ Username @{username} does not exist on Instagram{' ' * (45 - len(username))}{Fore.RED}│{Style.RESET_ALL}")
+        emit(f"{Fore.RED}╰{'─' * 73}╯{Style.RESET_ALL}")
+    elif "connection" in error_msg.lower() or "timeout" in error_msg.lower():
+        emit(f"\n{Fore.RED}╭{'─' * 73}╮")
+        emit(f"{Fore.RED}│ {Fore.YELLOW}[!] Connection error. Instagram may be blocking requests.{' ' * 15}{Fore.RED}│")
+        emit(f"{Fore.RED}│ {Fore.YELLOW}[i] Try again later or check your internet connection{' ' * 19}{Fore.RED}│")
+        emit(f"{Fore.RED}╰{'─' * 73}╯{Style.RESET_ALL}")
+    elif "login" in error_msg.lower() or "challenge" in error_msg.lower():
+        emit(f"\n{Fore.RED}╭{'─' * 73}╮")
+        emit(f"{Fore.RED}│ {Fore.YELLOW}[!] Instagram requires authentication{' ' * 36}{Fore.RED}│")
+        emit(f"{Fore.RED}│ {Fore.YELLOW}[i] Some data may be restricted without login{' ' * 27}{Fore.RED}│")
+        emit(f"{Fore.RED}╰{'─' * 73}╯{Style.RESET_ALL}")
+    else:
+        emit(f"\n{Fore.RED}╭{'─' * 73}╮")
+        emit(f"{Fore.RED}│ {Fore.YELLOW}[!] Error: {error_msg[:60]}{' ' * (62 - len(error_msg[:60]))}{Fore.RED}│")
+        emit(f"{Fore.RED}╰{'─' * 73}╯{Style.RESET_ALL}")
+    return out.getvalue()
+
+def render_report(investigation_data, color=True):
+    """Render investigation_data as the boxed terminal report, in one string"""
+    Fore, Style = palette(color)
+    out = io.StringIO()
+    emit = functools.partial(print, file=out)
+    data = investigation_data
+    
+    emit(f"\n{Fore.CYAN}{Style.BRIGHT}╔{'═' * 73}╗")
+    emit(f"║{' ' * 18}{Fore.YELLOW}📷 INSTAGRAM OSINT INVESTIGATION{Fore.CYAN}{' ' * 22} ║")
+    emit(f"╚{'═' * 73}╝{Style.RESET_ALL}\n")
+    
+    if "source_post" in data:
+        out.write(render_post(data["source_post"], color))
+        emit(f"\n{Fore.CYAN}[i] Investigating post owner: @{data['username']}{Style.RESET_ALL}")
+    elif data.get("post") and not data.get("username"):
+        emit(f"{Fore.RED}[!] Instagram is blocking post access. Trying to extract owner...{Style.RESET_ALL}")
+        return out.getvalue()
+    
+    username = data.get("username")
+    if not username:
+        emit(f"{Fore.RED}[!] Could not extract username from URL{Style.RESET_ALL}")
+        return out.getvalue()
+    
+    emit(f"{Fore.YELLOW}┌{'─' * 73}┐")
+    emit(f"│ {Fore.CYAN}{Style.BRIGHT}🎯 TARGET INFORMATION{Style.RESET_ALL}{Fore.YELLOW}{' ' * 51}│")
+    emit(f"└{'─' * 73}┘{Style.RESET_ALL}")
+    emit(f"{Fore.WHITE}  ➤ Username    : {Fore.YELLOW}{Style.BRIGHT}@{username}{Style.RESET_ALL}")
+    if data.get("timestamp"):
+        emit(f"{Fore.WHITE}  ➤ Timestamp   : {Fore.CYAN}{datetime.fromisoformat(data['timestamp']).strftime('%Y-%m-%d %H:%M:%S')}{Style.RESET_ALL}")
+    emit()
+    
+    if data.get("error"):
+        out.write(render_error(username, str(data["error"]), color))
+        return out.getvalue()
+    
+    profile = data["profile"]
+    statistics = data["statistics"]
+    emit(f"\n{Fore.GREEN}{Style.BRIGHT}╔{'═' * 73}╗")
+    emit(f"║{' ' * 24}{Fore.YELLOW}✓ PROFILE FOUND{Fore.GREEN}{' ' * 34}║")
+    emit(f"╚{'═' * 73}╝{Style.RESET_ALL}")
+    
+    emit(f"\n{Fore.YELLOW}┌{'─' * 73}┐")
+    emit(f"│ {Fore.CYAN}{Style.BRIGHT}👤 BASIC INFORMATION{Style.RESET_ALL}{Fore.YELLOW}{' '*52}│")
+    emit(f"└{'─' * 73}┘{Style.RESET_ALL}")
+    emit(f"{Fore.WHITE}  ➤ Username    : {Fore.CYAN}{Style.BRIGHT}@{profile['username']}{Style.RESET_ALL}")
+    emit(f"{Fore.WHITE}  ➤ Full Name   : {Fore.YELLOW}{profile['full_name'] if profile['full_name'] else 'N/A'}{Style.RESET_ALL}")
+    emit(f"{Fore.WHITE}  ➤ User ID     : {Fore.MAGENTA}{profile['user_id']}{Style.RESET_ALL}")
+    
+    if "biography" in data:
+        emit(f"\n{Fore.YELLOW}┌{'─' * 73}┐")
+        emit(f"│ {Fore.CYAN}{Style.BRIGHT}📄 BIOGRAPHY{Style.RESET_ALL}{Fore.YELLOW}{' '*60}│")
+        emit(f"└{'─' * 73}┘{Style.RESET_ALL}")
+        for line in data["biography"].split('\n'):
+            emit(f"{Fore.CYAN}  {line}{Style.RESET_ALL}")
+    
+    emit(f"\n{Fore.YELLOW}┌{'─' * 73}┐")
+    emit(f"│ {Fore.CYAN}{Style.BRIGHT}📊 ACCOUNT STATISTICS{Style.RESET_ALL}{Fore.YELLOW}{' '*51}│")
+    emit(f"└{'─' * 73}┘{Style.RESET_ALL}")
+    emit(f"{Fore.WHITE}  ➤ Followers   : {Fore.GREEN}{Style.BRIGHT}{statistics['followers']:,}{Style.RESET_ALL}")
+    emit(f"{Fore.WHITE}  ➤ Following   : {Fore.YELLOW}{Style.BRIGHT}{statistics['following']:,}{Style.RESET_ALL}")
+    emit(f"{Fore.WHITE}  ➤ Posts       : {Fore.CYAN}{Style.BRIGHT}{statistics['posts']:,}{Style.RESET_ALL}")
+    
+    if "follow_ratio" in statistics:
+        ratio = statistics["follow_ratio"]
+        emit(f"{Fore.WHITE}Follow Ratio: {Fore.CYAN}{ratio:.3f} {Fore.WHITE}(Following/Followers)")
+        
+        if ratio > 2:
+            emit(f"{Fore.WHITE}  ➤ Analysis    : {Fore.YELLOW}⚠ High follow ratio - possible engagement farming{Style.RESET_ALL}")
+        elif ratio < 0.5 and statistics['followers'] > 1000:
+            emit(f"{Fore.WHITE}  ➤ Analysis    : {Fore.GREEN}✓ Low follow ratio - strong audience{Style.RESET_ALL}")
+    
+    changes = data.get("changes")
+    if changes:
+        emit(f"\n{Fore.YELLOW}┌{'─' * 73}┐")
+        emit(f"│ {Fore.CYAN}{Style.BRIGHT}🔄 CHANGES SINCE LAST RUN{Style.RESET_ALL}{Fore.YELLOW}{' '*47}│")
+        emit(f"└{'─' * 73}┘{Style.RESET_ALL}")
+        if changes.get("since"):
+            emit(f"{Fore.WHITE}  ➤ Last Run    : {Fore.CYAN}{datetime.fromisoformat(changes['since']).strftime('%Y-%m-%d %H:%M:%S')}{Style.RESET_ALL}")
+        for key, label in (("followers", "Followers   "), ("following", "Following   ")):
+            if key in changes:
+                change = changes[key]
+                emit(f"{Fore.WHITE}  ➤ {label}: {Fore.CYAN}{change['old']:,} → {Style.BRIGHT}{change['new']:,} "
+                     f"{Fore.GREEN if change['change'] > 0 else Fore.RED}({change['change']:+,}){Style.RESET_ALL}")
+        if "biography" in changes:
+            emit(f"{Fore.WHITE}  ➤ Biography   : {Fore.YELLOW}changed{Style.RESET_ALL}")
+        for url in changes.get("external_urls", {}).get("added", []):
+            emit(f"{Fore.WHITE}  ➤ URL Added   : {Fore.GREEN}{url}{Style.RESET_ALL}")
+        for url in changes.get("external_urls", {}).get("removed", []):
+            emit(f"{Fore.WHITE}  ➤ URL Removed : {Fore.RED}{url}{Style.RESET_ALL}")
+        if "new_posts" in changes:
+            new_posts = changes["new_posts"]
+            emit(f"{Fore.WHITE}  ➤ New Posts   : {Fore.GREEN}{Style.BRIGHT}{len(new_posts)}{Style.RESET_ALL} {Fore.WHITE}({', '.join(new_posts[:5])}{', ...' if len(new_posts) > 5 else ''}){Style.RESET_ALL}")
+        if set(changes) == {"since"}:
+            emit(f"{Fore.WHITE}  ➤ No changes{Style.RESET_ALL}")
+    
+    emit(f"\n{Fore.YELLOW}┌{'─' * 73}┐")
+    emit(f"│ {Fore.CYAN}{Style.BRIGHT}🏷️  ACCOUNT TYPE & STATUS{Style.RESET_ALL}{Fore.YELLOW}{' '*48}│")
+    emit(f"└{'─' * 73}┘{Style.RESET_ALL}")
+    emit(f"{Fore.WHITE}  ➤ Private     : {Fore.RED if profile['is_private'] else Fore.GREEN}{Style.BRIGHT}{'Yes' if profile['is_private'] else 'No'}{Style.RESET_ALL}")
+    emit(f"{Fore.WHITE}  ➤ Verified    : {Fore.GREEN if profile['is_verified'] else Fore.YELLOW}{Style.BRIGHT}{'Yes' if profile['is_verified'] else 'No'}{Style.RESET_ALL}")
+    emit(f"{Fore.WHITE}  ➤ Business    : {Fore.CYAN if profile['is_business'] else Fore.YELLOW}{Style.BRIGHT}{'Yes' if profile['is_business'] else 'No'}{Style.RESET_ALL}")
+    
+    extended_data = data.get("extended_data", {})
+    for key, label in (("category", "Category    "), ("business_email", "Biz Email   "),
+                       ("business_phone", "Biz Phone   "), ("public_email", "Public Email"),
+                       ("public_phone", "Public Phone")):
+        if key in extended_data:
+            emit(f"{Fore.WHITE}  ➤ {label}: {Fore.CYAN if key == 'category' else Fore.YELLOW}{extended_data[key]}{Style.RESET_ALL}")
+    if "reels" in extended_data:
+        emit(f"{Fore.WHITE}  ➤ Reels       : {Fore.CYAN}{extended_data['reels']}{Style.RESET_ALL}")
+    if "highlights" in extended_data:
+        emit(f"{Fore.WHITE}  ➤ Highlights  : {Fore.CYAN}{extended_data['highlights']}{Style.RESET_ALL}")
+    
+    emit(f"\n{Fore.YELLOW}┌{'─' * 73}┐")
+    emit(f"│ {Fore.CYAN}{Style.BRIGHT}🔍 API LOOKUP{Style.RESET_ALL}{Fore.YELLOW}{' ' * 59}│")
+    emit(f"└{'─' * 73}┘{Style.RESET_ALL}")
+    api_data = data.get("api_data", {})
+    if "obfuscated_email" in api_data:
+        emit(f"{Fore.WHITE}  ➤ Email       : {Fore.YELLOW}{api_data['obfuscated_email']}{Style.RESET_ALL}")
+    if "obfuscated_phone" in api_data:
+        emit(f"{Fore.WHITE}  ➤ Phone       : {Fore.YELLOW}{api_data['obfuscated_phone']}{Style.RESET_ALL}")
+    
+    mentions = data.get("bio_mentions")
+    if mentions:
+        emit(f"\n{Fore.YELLOW}┌{'─' * 73}┐")
+        emit(f"│ {Fore.CYAN}{Style.BRIGHT}👥 TAGGED ACCOUNTS IN BIO ({len(mentions)}){Style.RESET_ALL}{Fore.YELLOW}{' ' * (45 - len(str(len(mentions))))}│")
+        emit(f"└{'─' * 73}┘{Style.RESET_ALL}")
+        for mention in mentions:
+            emit(f"{Fore.WHITE}  ➤ @{Fore.YELLOW}{Style.BRIGHT}{mention}{Style.RESET_ALL}")
+    
+    social_links = data.get("social_links")
+    if social_links:
+        emit(f"\n{Fore.YELLOW}┌{'─' * 73}┐")
+        emit(f"│ {Fore.CYAN}{Style.BRIGHT}🌐 CONNECTED SOCIAL MEDIA{Style.RESET_ALL}{Fore.YELLOW}{' '*48} │")
+        emit(f"└{'─' * 73}┘{Style.RESET_ALL}")
+        for platform, usernames in social_links.items():
+            for user in usernames:
+                emit(f"{Fore.WHITE}  ➤ {platform:<12}: {Fore.CYAN}{Style.BRIGHT}{user}{Style.RESET_ALL}")
+    
+    all_links = data.get("external_urls")
+    if all_links:
+        emit(f"\n{Fore.YELLOW}┌{'─' * 73}┐")
+        emit(f"│ {Fore.CYAN}{Style.BRIGHT}🔗 EXTERNAL URLS ({len(all_links)}){Style.RESET_ALL}{Fore.YELLOW}{' ' * (53 - len(str(len(all_links))))}│")
+        emit(f"└{'─' * 73}┘{Style.RESET_ALL}")
+        for i, link in enumerate(all_links, 1):
+            emit(f"{Fore.WHITE}  ➤ {Fore.MAGENTA}{i}. {Fore.CYAN}{link}{Style.RESET_ALL}")
+    
+    emit(f"\n{Fore.YELLOW}┌{'─' * 73}┐")
+    emit(f"│ {Fore.CYAN}{Style.BRIGHT}🖼️  MEDIA{Style.RESET_ALL}{Fore.YELLOW}{' '*64}│")
+    emit(f"└{'─' * 73}┘{Style.RESET_ALL}")
+    if color:
+        emit(f"{Fore.WHITE}  ➤ Profile Picture: {Fore.CYAN}{Style.BRIGHT}[\033]8;;{data['profile_pic_url']}\033\\{Fore.GREEN}Click Here{Fore.CYAN}\033]8;;\033\\]{Style.RESET_ALL}")
+    else:
+        emit(f"  ➤ Profile Picture: {data['profile_pic_url']}")
+    
+    content_types = data.get("content_types")
+    if content_types:
+        total = sum(content_types.values())
+        emit(f"\n{Fore.YELLOW}┌{'─' * 73}┐")
+        emit(f"│ {Fore.CYAN}{Style.BRIGHT}📈 CONTENT TYPE DISTRIBUTION{Style.RESET_ALL}{Fore.YELLOW}{' '*44}│")
+        emit(f"└{'─' * 73}┘{Style.RESET_ALL}")
+        for ctype, count in content_types.items():
+            percentage = (count / total) * 100
+            bar = '█' * int(percentage / 2)
+            emit(f"{Fore.WHITE}  ➤ {ctype:<15}: {Fore.CYAN}{Style.BRIGHT}{count:>3} {Fore.GREEN}{bar} {Fore.WHITE}({percentage:.1f}%){Style.RESET_ALL}")
+    
+    engagement_data = data.get("engagement")
+    if engagement_data:
+        emit(f"\n{Fore.YELLOW}┌{'─' * 73}┐")
+        emit(f"│ {Fore.CYAN}{Style.BRIGHT}💬 ENGAGEMENT METRICS{Style.RESET_ALL}{Fore.YELLOW}{' '*52}│")
+        emit(f"└{'─' * 73}┘{Style.RESET_ALL}")
+        emit(f"{Fore.WHITE}  ➤ Avg Likes       : {Fore.GREEN}{Style.BRIGHT}{engagement_data['avg_likes']:>8.0f}{Style.RESET_ALL}")
+        emit(f"{Fore.WHITE}  ➤ Avg Comments    : {Fore.YELLOW}{Style.BRIGHT}{engagement_data['avg_comments']:>8.0f}{Style.RESET_ALL}")
+        emit(f"{Fore.WHITE}  ➤ Engagement Rate : {Fore.CYAN}{Style.BRIGHT}{engagement_data['engagement_rate']:>7.2f}%{Style.RESET_ALL}")
+        
+        if engagement_data['engagement_rate'] > 5:
+            emit(f"{Fore.GREEN}     ✓ Excellent engagement rate{Style.RESET_ALL}")
+        elif engagement_data['engagement_rate'] > 2:
+            emit(f"{Fore.YELLOW}     • Good engagement rate{Style.RESET_ALL}")
+        else:
+            emit(f"{Fore.RED}     ⚠ Low engagement rate{Style.RESET_ALL}")
+    
+    posting_patterns = data.get("posting_patterns")
+    if posting_patterns:
+        emit(f"\n{Fore.YELLOW}┌{'─' * 73}┐")
+        emit(f"│ {Fore.CYAN}{Style.BRIGHT}⏰ POSTING PATTERNS{Style.RESET_ALL}{Fore.YELLOW}{' '*55}│")
+        emit(f"└{'─' * 73}┘{Style.RESET_ALL}")
+        if posting_patterns["most_active_hour"]:
+            hour, count = posting_patterns["most_active_hour"]
+            emit(f"{Fore.WHITE}  ➤ Most Active Hour: {Fore.YELLOW}{Style.BRIGHT}{hour}:00 {Fore.WHITE}({count} posts){Style.RESET_ALL}")
+        if posting_patterns["most_active_day"]:
+            day, count = posting_patterns["most_active_day"]
+            emit(f"{Fore.WHITE}  ➤ Most Active Day : {Fore.YELLOW}{Style.BRIGHT}{day} {Fore.WHITE}({count} posts){Style.RESET_ALL}")
+        
+        emit(f"\n{Fore.WHITE}  Top Active Hours:{Style.RESET_ALL}")
+        for hour, count in posting_patterns["hour_distribution"].items():
+            bar = '█' * min(count * 2, 30)
+            emit(f"{Fore.WHITE}    {hour:02d}:00 {Fore.CYAN}{bar} {Fore.WHITE}{count}{Style.RESET_ALL}")
+    
+    locations = data.get("locations")
+    if locations:
+        emit(f"\n{Fore.YELLOW}┌{'─' * 73}┐")
+        emit(f"│ {Fore.CYAN}{Style.BRIGHT}📍 LOCATIONS ({len(locations)}){Style.RESET_ALL}{Fore.YELLOW}{' ' * (57 - len(str(len(locations))))}│")
+        emit(f"└{'─' * 73}┘{Style.RESET_ALL}")
+        for i, loc in enumerate(locations[:10], 1):
+            emit(f"{Fore.WHITE}  ➤ {Fore.MAGENTA}{i:>2}. {Fore.YELLOW}{loc}{Style.RESET_ALL}")
+
+    source_posts = data.get("source_posts")
+    if source_posts:
+        emit(f"\n{Fore.YELLOW}┌{'─' * 73}┐")
+        emit(f"│ {Fore.CYAN}{Style.BRIGHT}🔗 REQUESTED POSTS ({len(source_posts)}){Style.RESET_ALL}{Fore.YELLOW}{' ' * (51 - len(str(len(source_posts))))}│")
+        emit(f"└{'─' * 73}┘{Style.RESET_ALL}")
+        for post_info in source_posts:
+            line = f"{Fore.WHITE}  ➤ {Fore.YELLOW}{post_info['shortcode']:<14} {Fore.CYAN}{post_info['date'][:10]}  {Fore.WHITE}❤️  {Fore.GREEN}{post_info['likes']:>9,}  {Fore.WHITE}💬 {Fore.YELLOW}{post_info['comments']:>7,}"
+            if "engagement_rate" in post_info:
+                line += f"  {Fore.CYAN}{post_info['engagement_rate']:>6.2f}%"
+            if "vs_average" in post_info:
+                line += f"  {Fore.MAGENTA}{post_info['vs_average']:.1f}x avg"
+            emit(line + Style.RESET_ALL)
+
+    lookalikes = data.get("lookalikes")
+    if lookalikes:
+        emit(f"\n{Fore.YELLOW}┌{'─' * 73}┐")
+        emit(f"│ {Fore.CYAN}{Style.BRIGHT}👥 LOOKALIKE ACCOUNTS ({len(lookalikes)}){Style.RESET_ALL}{Fore.YELLOW}{' ' * (48 - len(str(len(lookalikes))))}│")
+        emit(f"└{'─' * 73}┘{Style.RESET_ALL}")
+        for match in lookalikes:
+            emit(render_lookalike(match, Fore, Style))
+
+    if "recent_posts" in data:
+        recent_posts = data["recent_posts"]
+        emit(f"\n{Fore.CYAN}{Style.BRIGHT}╭{'─' * 73}╮")
+        emit(f"{Fore.CYAN}│ {Fore.YELLOW}{Style.BRIGHT}📸  RECENT POSTS ANALYSIS ({len(recent_posts)} posts){' ' * (44 - len(str(len(recent_posts))))}{Fore.CYAN}│")
+        emit(f"{Fore.CYAN}╰{'─' * 73}╯{Style.RESET_ALL}")
+        
+        for i, post_info in enumerate(recent_posts, 1):
+            emit(f"\n{Fore.YELLOW}Post #{i}:{Style.RESET_ALL}")
+            emit(f"{Fore.WHITE}  📅 Date: {Fore.CYAN}{post_info['date']}")
+            emit(f"{Fore.WHITE}  ❤️  Likes: {Fore.GREEN}{post_info['likes']:,}")
+            emit(f"{Fore.WHITE}  💬 Comments: {Fore.YELLOW}{post_info['comments']:,}")
+            emit(f"{Fore.WHITE}  📹 Type: {Fore.CYAN}{post_info['type']}")
             
-            locations = extract_locations(posts)
-            if locations:
-                print(f"\n{Fore.YELLOW}┌{'─' * 73}┐")
-                print(f"│ {Fore.CYAN}{Style.BRIGHT}📍 LOCATIONS ({len(locations)}){Style.RESET_ALL}{Fore.YELLOW}{' ' * (57 - len(str(len(locations))))}│")
-                print(f"└{'─' * 73}┘{Style.RESET_ALL}")
-                for i, loc in enumerate(locations[:10], 1):
-                    print(f"{Fore.WHITE}  ➤ {Fore.MAGENTA}{i:>2}. {Fore.YELLOW}{loc}{Style.RESET_ALL}")
-                investigation_data["locations"] = locations
+            if "location" in post_info:
+                emit(f"{Fore.WHITE}  📍 Location: {Fore.MAGENTA}{post_info['location']}")
             
-            try:
-                recent_posts = posts[:10]
-                print(f"\n{Fore.CYAN}{Style.BRIGHT}╭{'─' * 73}╮")
-                print(f"{Fore.CYAN}│ {Fore.YELLOW}{Style.BRIGHT}📸  RECENT POSTS ANALYSIS ({len(recent_posts)} posts){' ' * (44 - len(str(len(recent_posts))))}{Fore.CYAN}│")
-                print(f"{Fore.CYAN}╰{'─' * 73}╯{Style.RESET_ALL}")
-                
-                all_hashtags = []
-                all_mentions = []
-                posts_data = []
-                
-                for i, post in enumerate(recent_posts, 1):
-                    post_info = {
-                        "date": post.date_local.strftime('%Y-%m-%d %H:%M'),
-                        "likes": post.likes,
-                        "comments": post.comments,
-                        "type": post.typename
-                    }
-                    
-                    print(f"\n{Fore.YELLOW}Post #{i}:{Style.RESET_ALL}")
-                    print(f"{Fore.WHITE}  📅 Date: {Fore.CYAN}{post.date_local.strftime('%Y-%m-%d %H:%M')}")
-                    print(f"{Fore.WHITE}  ❤️  Likes: {Fore.GREEN}{post.likes:,}")
-                    print(f"{Fore.WHITE}  💬 Comments: {Fore.YELLOW}{post.comments:,}")
-                    print(f"{Fore.WHITE}  📹 Type: {Fore.CYAN}{post.typename}")
-                    
-                    if hasattr(post, 'location') and post.location:
-                        loc = post.location.name if hasattr(post.location, 'name') else str(post.location)
-                        print(f"{Fore.WHITE}  📍 Location: {Fore.MAGENTA}{loc}")
-                        post_info["location"] = loc
-                    
-                    if post.caption:
-                        caption = post.caption[:100] + '...' if len(post.caption) > 100 else post.caption
-                        print(f"{Fore.WHITE}  📝 Caption: {Fore.WHITE}{caption}")
-                        post_info["caption"] = post.caption
-                        
-                        hashtags = re.findall(r'#(\w+)', post.caption)
-                        mentions = re.findall(r'@([a-zA-Z0-9._]+)', post.caption)
-                        all_hashtags.extend(hashtags)
-                        all_mentions.extend(mentions)
-                        
-                        if hashtags:
-                            post_info["hashtags"] = hashtags
-                        if mentions:
-                            post_info["mentions"] = mentions
-                    
-                    posts_data.append(post_info)
-                
-                investigation_data["recent_posts"] = posts_data
-                
-                if all_hashtags:
-                    top_hashtags = Counter(all_hashtags).most_common(15)
-                    print(f"\n{Fore.GREEN}{Style.BRIGHT}╭{'─' * 73}╮")
-                    print(f"{Fore.GREEN}│ {Fore.YELLOW}{Style.BRIGHT}#️⃣  TOP HASHTAGS{' ' * 58}{Fore.GREEN}│")
-                    print(f"{Fore.GREEN}├{'─' * 73}┤{Style.RESET_ALL}")
-                    for tag, count in top_hashtags:
-                        bar = '█' * min(count * 3, 30)
-                        tag_text = f"#{tag:<20} {bar} ({count}x)"
-                        print(f"{Fore.GREEN}│ {Fore.WHITE}#{Fore.YELLOW}{tag:<20} {Fore.CYAN}{bar} {Fore.WHITE}({count}x){' ' * (48 - len(tag) - len(bar) - len(str(count)))}{Fore.GREEN}│{Style.RESET_ALL}")
-                    print(f"{Fore.GREEN}╰{'─' * 73}╯{Style.RESET_ALL}")
-                    investigation_data["top_hashtags"] = dict(top_hashtags)
-                
-                if all_mentions:
-                    top_mentions = Counter(all_mentions).most_common(10)
-                    print(f"\n{Fore.MAGENTA}{Style.BRIGHT}╭{'─' * 73}╮")
-                    print(f"{Fore.MAGENTA}│ {Fore.YELLOW}{Style.BRIGHT}👤  FREQUENTLY TAGGED ACCOUNTS{' ' * 44}{Fore.MAGENTA}│")
-                    print(f"{Fore.MAGENTA}├{'─' * 73}┤{Style.RESET_ALL}")
-                    for mention, count in top_mentions:
-                        print(f"{Fore.MAGENTA}│ {Fore.WHITE}@{Fore.YELLOW}{mention:<25} {Fore.WHITE}({Fore.CYAN}{count}x{Fore.WHITE}){' ' * (43 - len(mention) - len(str(count)))}{Fore.MAGENTA}│{Style.RESET_ALL}")
-                    print(f"{Fore.MAGENTA}╰{'─' * 73}╯{Style.RESET_ALL}")
-                    investigation_data["top_mentions"] = dict(top_mentions)
-                
-                if len(posts) > 0:
-                    latest_post = posts[0].date_local
-                    oldest_post = min(posts, key=lambda p: p.date_local)
-                    days_since = (datetime.now() - latest_post.replace(tzinfo=None)).days
-                    
-                    print(f"\n{Fore.YELLOW}{Style.BRIGHT}╭{'─' * 73}╮")
-                    print(f"{Fore.YELLOW}│ {Fore.CYAN}{Style.BRIGHT}📊  ACTIVITY TIMELINE{' ' * 53}{Fore.YELLOW}│")
-                    print(f"{Fore.YELLOW}├{'─' * 73}┤{Style.RESET_ALL}")
-                    print(f"{Fore.YELLOW}│ {Fore.WHITE}Latest Post    : {Fore.YELLOW}{latest_post.strftime('%Y-%m-%d')} {Fore.WHITE}({Fore.CYAN}{days_since} days ago{Fore.WHITE}){' ' * (35 - len(str(days_since)))}{Fore.YELLOW}│")
-                    print(f"{Fore.YELLOW}│ {Fore.WHITE}Oldest Fetched : {Fore.YELLOW}{oldest_post.date_local.strftime('%Y-%m-%d')}{' ' * 44}{Fore.YELLOW}│{Style.RESET_ALL}")
-                    
-                    if profile.mediacount > 0 and len(posts) > 1:
-                        total_days = (latest_post.replace(tzinfo=None) - oldest_post.date_local.replace(tzinfo=None)).days
-                        if total_days > 0:
-                            avg_posts_month = profile.mediacount / (total_days / 30)
-                            avg_posts_week = profile.mediacount / (total_days / 7)
-                            print(f"{Fore.YELLOW}│ {Fore.WHITE}Avg Posts      : {Fore.CYAN}{avg_posts_month:.1f} per month {Fore.WHITE}/ {Fore.CYAN}{avg_posts_week:.1f} per week{' ' * (30 - len(f'{avg_posts_month:.1f}') - len(f'{avg_posts_week:.1f}'))}{Fore.YELLOW}│{Style.RESET_ALL}")
-                    
-                    print(f"{Fore.YELLOW}│{' ' * 73}{Fore.YELLOW}│")
-                    if days_since == 0:
-                        print(f"{Fore.YELLOW}│ {Fore.GREEN}✓ Very active (posted today){' ' * 46}{Fore.YELLOW}│{Style.RESET_ALL}")
-                    elif days_since <= 7:
-                        print(f"{Fore.YELLOW}│ {Fore.GREEN}✓ Active account{' ' * 58}{Fore.YELLOW}│{Style.RESET_ALL}")
-                    elif days_since <= 30:
-                        print(f"{Fore.YELLOW}│ {Fore.YELLOW}• Moderately active{' ' * 54}{Fore.YELLOW}│{Style.RESET_ALL}")
-                    else:
-                        print(f"{Fore.YELLOW}│ {Fore.RED}⚠ Inactive account{' ' * 56}{Fore.YELLOW}│{Style.RESET_ALL}")
-                    
-                    print(f"{Fore.YELLOW}╰{'─' * 73}╯{Style.RESET_ALL}")
+            if "caption" in post_info:
+                caption = post_info["caption"]
+                caption = caption[:100] + '...' if len(caption) > 100 else caption
+                emit(f"{Fore.WHITE}  📝 Caption: {Fore.WHITE}{caption}")
+        
+        top_hashtags = data.get("top_hashtags")
+        if top_hashtags:
+            emit(f"\n{Fore.GREEN}{Style.BRIGHT}╭{'─' * 73}╮")
+            emit(f"{Fore.GREEN}│ {Fore.YELLOW}{Style.BRIGHT}#️⃣  TOP HASHTAGS{' ' * 58}{Fore.GREEN}│")
+            emit(f"{Fore.GREEN}├{'─' * 73}┤{Style.RESET_ALL}")
+            for tag, count in top_hashtags.items():
+                bar = '█' * min(count * 3, 30)
+                emit(f"{Fore.GREEN}│ {Fore.WHITE}#{Fore.YELLOW}{tag:<20} {Fore.CYAN}{bar} {Fore.WHITE}({count}x){' ' * (48 - len(tag) - len(bar) - len(str(count)))}{Fore.GREEN}│{Style.RESET_ALL}")
+            emit(f"{Fore.GREEN}╰{'─' * 73}╯{Style.RESET_ALL}")
+        
+        top_mentions = data.get("top_mentions")
+        if top_mentions:
+            emit(f"\n{Fore.MAGENTA}{Style.BRIGHT}╭{'─' * 73}╮")
+            emit(f"{Fore.MAGENTA}│ {Fore.YELLOW}{Style.BRIGHT}👤  FREQUENTLY TAGGED ACCOUNTS{' ' * 44}{Fore.MAGENTA}│")
+            emit(f"{Fore.MAGENTA}├{'─' * 73}┤{Style.RESET_ALL}")
+            for mention, count in top_mentions.items():
+                emit(f"{Fore.MAGENTA}│ {Fore.WHITE}@{Fore.YELLOW}{mention:<25} {Fore.WHITE}({Fore.CYAN}{count}x{Fore.WHITE}){' ' * (43 - len(mention) - len(str(count)))}{Fore.MAGENTA}│{Style.RESET_ALL}")
+            emit(f"{Fore.MAGENTA}╰{'─' * 73}╯{Style.RESET_ALL}")
+        
+        activity = data.get("activity")
+        if activity:
+            days_since = activity["days_since_last_post"]
+            emit(f"\n{Fore.YELLOW}{Style.BRIGHT}╭{'─' * 73}╮")
+            emit(f"{Fore.YELLOW}│ {Fore.CYAN}{Style.BRIGHT}📊  ACTIVITY TIMELINE{' ' * 53}{Fore.YELLOW}│")
+            emit(f"{Fore.YELLOW}├{'─' * 73}┤{Style.RESET_ALL}")
+            emit(f"{Fore.YELLOW}│ {Fore.WHITE}Latest Post    : {Fore.YELLOW}{activity['latest_post'][:10]} {Fore.WHITE}({Fore.CYAN}{days_since} days ago{Fore.WHITE}){' ' * (35 - len(str(days_since)))}{Fore.YELLOW}│")
+            emit(f"{Fore.YELLOW}│ {Fore.WHITE}Oldest Fetched : {Fore.YELLOW}{activity['oldest_post'][:10]}{' ' * 44}{Fore.YELLOW}│{Style.RESET_ALL}")
             
-            except Exception as e:
-                print(f"{Fore.RED}[!] Error analyzing posts: {str(e)}")
-        
-        elif profile.is_private:
-            print(f"\n{Fore.YELLOW}╭{'─' * 73}╮")
-            print(f"{Fore.YELLOW}│ {Fore.YELLOW}⚠ Account is private - post analysis unavailable{' ' * 27}{Fore.YELLOW}│")
-            print(f"{Fore.YELLOW}╰{'─' * 73}╯{Style.RESET_ALL}")
-        
-        show_progress(100, "Complete", "Investigation finished!")
-        print()
-        elapsed = time.time() - start_time
-        print(f"{Fore.GREEN}✓{Style.RESET_ALL} {Fore.WHITE}Investigation completed in {Fore.CYAN}{Style.BRIGHT}{elapsed:.2f}s{Style.RESET_ALL}\n")
-        
-        print(f"\n{Fore.GREEN}{Style.BRIGHT}╭{'─' * 73}╮")
-        print(f"{Fore.GREEN}│{' ' * 22}{Fore.YELLOW}{Style.BRIGHT}✓ INVESTIGATION COMPLETE{' ' * 27}{Fore.GREEN}│")
-        print(f"{Fore.GREEN}╰{'─' * 73}╯{Style.RESET_ALL}")
-        
-        if export_json:
-            print(f"\n{Fore.CYAN}[●] {Fore.WHITE}Exporting data to JSON...{Style.RESET_ALL}")
-            filename = export_to_json(investigation_data, username)
-            if filename:
-                print(f"{Fore.GREEN}[✓] {Fore.WHITE}Data exported to: {Fore.CYAN}{Style.BRIGHT}{filename}{Style.RESET_ALL}")
+            if "avg_posts_per_month" in activity:
+                avg_posts_month = activity["avg_posts_per_month"]
+                avg_posts_week = activity["avg_posts_per_week"]
+                emit(f"{Fore.YELLOW}│ {Fore.WHITE}Avg Posts      : {Fore.CYAN}{avg_posts_month:.1f} per month {Fore.WHITE}/ {Fore.CYAN}{avg_posts_week:.1f} per week{' ' * (30 - len(f'{avg_posts_month:.1f}') - len(f'{avg_posts_week:.1f}'))}{Fore.YELLOW}│{Style.RESET_ALL}")
+            
+            emit(f"{Fore.YELLOW}│{' ' * 73}{Fore.YELLOW}│")
+            if days_since == 0:
+                emit(f"{Fore.YELLOW}│ {Fore.GREEN}✓ Very active (posted today){' ' * 46}{Fore.YELLOW}│{Style.RESET_ALL}")
+            elif days_since <= 7:
+                emit(f"{Fore.YELLOW}│ {Fore.GREEN}✓ Active account{' ' * 58}{Fore.YELLOW}│{Style.RESET_ALL}")
+            elif days_since <= 30:
+                emit(f"{Fore.YELLOW}│ {Fore.YELLOW}• Moderately active{' ' * 54}{Fore.YELLOW}│{Style.RESET_ALL}")
             else:
-                print(f"{Fore.RED}[!] Failed to export data{Style.RESET_ALL}")
+                emit(f"{Fore.YELLOW}│ {Fore.RED}⚠ Inactive account{' ' * 56}{Fore.YELLOW}│{Style.RESET_ALL}")
+            
+            emit(f"{Fore.YELLOW}╰{'─' * 73}╯{Style.RESET_ALL}")
         
-    except ImportError as e:
-        print(f"\r{Fore.RED}[!] Failed to install instaloader: {str(e)}{Style.RESET_ALL}")
-    except Exception as e:
-        error_msg = str(e)
-        print(f"\r{Fore.RED}{Style.BRIGHT}\n{'╔' + '═' * 73 + '╗'}")
-        print(f"║{' '*22}{Fore.YELLOW}INVESTIGATION RESULTS{Fore.RED}{' '*30}║")
-        print(f"{'╚' + '═' * 73 + '╝'}{Style.RESET_ALL}")
-        
-        if "does not exist" in error_msg.lower() or "not exist" in error_msg.lower():
-            print(f"\n{Fore.RED}{Style.BRIGHT}╭{'─' * 73}╮")
-            print(f"{Fore.RED}│ {Fore.YELLOW}{Style.BRIGHT}✗ PROFILE NOT FOUND{' ' * 54}{Fore.RED}│")
-            print(f"{Fore.RED}├{'─' * 73}┤{Style.RESET_ALL}")
-            print(f"{Fore.RED}│ {Fore.YELLOW}➤ Username @{username} does not exist on Instagram{' ' * (45 - len(username))}{Fore.RED}│{Style.RESET_ALL}")
-            print(f"{Fore.RED}╰{'─' * 73}╯{Style.RESET_ALL}")
-        elif "connection" in error_msg.lower() or "timeout" in error_msg.lower():
-            print(f"\n{Fore.RED}╭{'─' * 73}╮")
-            print(f"{Fore.RED}│ {Fore.YELLOW}[!] Connection error. Instagram may be blocking requests.{' ' * 15}{Fore.RED}│")
-            print(f"{Fore.RED}│ {Fore.YELLOW}[i] Try again later or check your internet connection{' ' * 19}{Fore.RED}│")
-            print(f"{Fore.RED}╰{'─' * 73}╯{Style.RESET_ALL}")
-        elif "login" in error_msg.lower() or "challenge" in error_msg.lower():
-            print(f"\n{Fore.RED}╭{'─' * 73}╮")
-            print(f"{Fore.RED}│ {Fore.YELLOW}[!] Instagram requires authentication{' ' * 36}{Fore.RED}│")
-            print(f"{Fore.RED}│ {Fore.YELLOW}[i] Some data may be restricted without login{' ' * 27}{Fore.RED}│")
-            print(f"{Fore.RED}╰{'─' * 73}╯{Style.RESET_ALL}")
+        history = data.get("history")
+        if history:
+            def row(label, value):
+                emit(f"{Fore.BLUE}│ {Fore.WHITE}{label:<15}: {Fore.CYAN}{value}{' ' * (55 - len(value))}{Fore.BLUE}│{Style.RESET_ALL}")
+            
+            unit = "%" if history["metric"] == "engagement_rate" else ""
+            rolling, cadence, gaps, slot = history["rolling"], history["cadence"], history["gaps"], history["peak_slot"]
+            title = f"📈  HISTORY ANALYTICS ({history['posts']} posts)"
+            emit(f"\n{Fore.BLUE}{Style.BRIGHT}╭{'─' * 73}╮")
+            emit(f"{Fore.BLUE}│ {Fore.YELLOW}{Style.BRIGHT}{title}{' ' * (71 - len(title))}{Fore.BLUE}│")
+            emit(f"{Fore.BLUE}├{'─' * 73}┤{Style.RESET_ALL}")
+            if "posts_per_week" in cadence:
+                row("Cadence", f"{cadence['posts_per_week']:.1f}/week overall, {cadence['recent_posts_per_week']:.1f}/week recently")
+            row("Active Weeks", f"{cadence['active_weeks']:.0%} with at least one post")
+            row("Gaps", f"median {gaps['median_days']:.1f} days, 90% under {gaps['p90_days']:.1f} days")
+            if gaps["longest"]:
+                longest = gaps["longest"][0]
+                row("Longest Silence", f"{longest['days']:.0f} days ({longest['from']} to {longest['to']})")
+            row(f"Rolling ({rolling['window']})", f"latest {rolling['latest']:,.2f}{unit}, overall {rolling['overall']:,.2f}{unit}")
+            row("Peak", f"{rolling['peak']:,.2f}{unit} around {rolling['peak_date']}")
+            row("Busiest Slot", f"{slot['day']} {slot['hour']:02d}:00 ({slot['posts']} posts)")
+            for outlier in history["outliers"][:3]:
+                row("Outlier", f"{outlier['shortcode'][:20]} {outlier['date']} {outlier['kind']} ({outlier['score']:+.1f})")
+            emit(f"{Fore.BLUE}╰{'─' * 73}╯{Style.RESET_ALL}")
+    
+    elif profile["is_private"]:
+        emit(f"\n{Fore.YELLOW}╭{'─' * 73}╮")
+        emit(f"{Fore.YELLOW}│ {Fore.YELLOW}⚠ Account is private - post analysis unavailable{' ' * 27}{Fore.YELLOW}│")
+        emit(f"{Fore.YELLOW}╰{'─' * 73}╯{Style.RESET_ALL}")
+    
+    media = data.get("media")
+    if media:
+        emit(f"\n{Fore.CYAN}[●] {Fore.WHITE}Media: {Fore.GREEN}{media['downloaded']} downloaded{Fore.WHITE}, "
+             f"{Fore.CYAN}{media['skipped']} already stored{Fore.WHITE}, {Fore.RED if media['failed'] else Fore.GREEN}"
+             f"{media['failed']} failed {Fore.WHITE}({media['bytes'] / 1e6:.1f} MB) in {Fore.CYAN}{media['directory']}{Style.RESET_ALL}")
+    
+    if color:
+        emit(format_progress(100, "Complete", "Investigation finished!"))
+    else:
+        emit("✓ Complete")
+    emit(f"{Fore.GREEN}✓{Style.RESET_ALL} {Fore.WHITE}Investigation completed in {Fore.CYAN}{Style.BRIGHT}{data['elapsed']:.2f}s{Style.RESET_ALL}\n")
+    
+    emit(f"\n{Fore.GREEN}{Style.BRIGHT}╭{'─' * 73}╮")
+    emit(f"{Fore.GREEN}│{' ' * 22}{Fore.YELLOW}{Style.BRIGHT}✓ INVESTIGATION COMPLETE{' ' * 27}{Fore.GREEN}│")
+    emit(f"{Fore.GREEN}╰{'─' * 73}╯{Style.RESET_ALL}")
+    return out.getvalue()
+
+def render_lookalike(match, Fore, Style):
+    """Render one lookalike account as one line"""
+    line = f"{Fore.WHITE}  ➤ @{Fore.YELLOW}{match['username']:<30} {Fore.CYAN}{match['similarity']:.2f} similar  {Fore.MAGENTA}score {match['score']:.2f}"
+    if match["same_skeleton"]:
+        line += f"  {Fore.RED}{Style.BRIGHT}same letters{Style.NORMAL}"
+    if match["matched"] == "full_name" and match["full_name"]:
+        line += f"  {Fore.WHITE}name: {match['full_name']}"
+    return line + Style.RESET_ALL
+
+def render_similar(name, matches, color=True):
+    """Render the answer to a --similar query"""
+    Fore, Style = palette(color)
+    out = io.StringIO()
+    emit = functools.partial(print, file=out)
+    title = f"👥 ACCOUNTS SIMILAR TO @{name}"[:70]
+    
+    emit(f"\n{Fore.CYAN}{Style.BRIGHT}╭{'─' * 73}╮")
+    emit(f"{Fore.CYAN}│ {Fore.YELLOW}{Style.BRIGHT}{title}{' ' * (71 - len(title))}{Fore.CYAN}│")
+    emit(f"{Fore.CYAN}╰{'─' * 73}╯{Style.RESET_ALL}")
+    if not matches:
+        emit(f"{Fore.WHITE}  ➤ {Fore.YELLOW}No lookalikes among the investigated accounts{Style.RESET_ALL}")
+    for match in matches:
+        emit(render_lookalike(match, Fore, Style))
+        if match["differences"]:
+            emit(f"{Fore.WHITE}      differs in: {Fore.CYAN}{', '.join(match['differences'])}{Style.RESET_ALL}")
+    return out.getvalue()
+
+def similar_accounts(name, limit=LOOKALIKE_LIMIT, output="box", sink=None):
+    """Answer "which investigated accounts look like name" from the lookalike index"""
+    name = name.strip().lstrip('@')
+    index = get_lookalike_index()
+    if index is None:
+        raise RuntimeError(f"the lookalike index in {DATA_DIR} cannot be opened")
+    matches = index.similar(name, limit)
+    if output != "silent":
+        write_report(render_similar(name, matches, color=output == "box"))
+    if sink is not None:
+        sink.write({"query": name, "lookalikes": matches})
+    return matches
+
+def render_export(filename, color=True):
+    """Render the outcome of a JSON export"""
+    Fore, Style = palette(color)
+    report = f"\n{Fore.CYAN}[●] {Fore.WHITE}Exporting data to JSON...{Style.RESET_ALL}\n"
+    if filename:
+        return report + f"{Fore.GREEN}[✓] {Fore.WHITE}Data exported to: {Fore.CYAN}{Style.BRIGHT}{filename}{Style.RESET_ALL}\n"
+    return report + f"{Fore.RED}[!] Failed to export data{Style.RESET_ALL}\n"
+
+RENDERERS = {
+    "box": functools.partial(render_report, color=True),
+    "plain": functools.partial(render_report, color=False),
+    "silent": lambda investigation_data: ''
+}
+
+def write_report(text):
+    """Write a rendered report to stdout in one piece"""
+    if text:
+        with _output_lock:
+            sys.stdout.write(text)
+            sys.stdout.flush()
+
+def instagram_investigation(username, export_json=False, max_posts=None, since=None, output="box", sink=None):
+    """Investigate a target, render the report with the chosen renderer and optionally export it"""
+    progress = show_progress if output == "box" else None
+    with tracing() as trace:
+        investigation_data = collect_investigation(username, max_posts=max_posts, since=since, progress=progress)
+        if progress:
+            print(f"\r{' ' * 150}\r", end='', flush=True)
+        
+        with span("render"):
+            report = RENDERERS[output](investigation_data)
+    investigation_data["timings"] = trace.as_dict()
+    if export_json and not investigation_data.get("error"):
+        filename = export_to_json(investigation_data, investigation_data["username"])
+        if output != "silent":
+            report += render_export(filename, color=output == "box")
+    if sink is not None:
+        sink.write(investigation_data)
+    write_report(report)
+    return investigation_data
+
+def read_targets(source):
+    """Read usernames/URLs, one per line, from a file path or '-' for stdin"""
+    if source == '-':
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(source, encoding='utf-8') as f:
+            lines = f.read().splitlines()
+    return [line.strip() for line in lines if line.strip() and not line.strip().startswith('#')]
+
+def batch_investigation(targets, workers=4, export_json=False, max_posts=None, since=None, output="box", sink=None):
+    """Investigate many targets concurrently with a bounded worker pool
+
+    Post and reel URLs are fetched first and grouped by owner: each distinct account is
+    investigated once, with its posts and their metrics attached as source_posts.
+    With a sink, every record is streamed out as it completes and only the errors are kept for the summary.
+    """
+    workers = max(1, workers)
+    start_time = time.time()
+    
+    def run(target, owner=None):
+        try:
+            return collect_investigation(target, max_posts=max_posts, since=since, owner=owner)
+        except Exception as e:
+            return {"username": target, "timestamp": datetime.now().isoformat(), "error": str(e)}
+    
+    # Workers only collect; finished reports are rendered and written whole, so they never interleave
+    results = []
+    
+    def finish(target, data):
+        filename = None
+        if export_json and not data.get("error"):
+            filename = export_to_json(data, data["username"])
+        with span("render"):
+            try:
+                report = RENDERERS[output](data)
+            except Exception as e:
+                # One unrenderable record must not take the rest of the batch down
+                report = render_error(data.get("username") or target, f"could not render the report: {e}", output == "box")
+        if export_json and not data.get("error") and output != "silent":
+            report += render_export(filename, color=output == "box")
+        if sink is not None:
+            sink.write(data)
+            data = {"error": data["error"]} if data.get("error") else {}
+        write_report(report)
+        results.append((target, data))
+    
+    profiles = []
+    shortcodes = {}
+    for target in targets:
+        kind, value = clean_instagram_url(target)
+        if kind == 'post':
+            shortcodes.setdefault(value, target)
+        else:
+            profiles.append((value.lower() or target, target))
+    
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        investigations = {}
+        source_posts = {}
+        
+        def investigate(key, target, owner=None):
+            if key not in investigations:
+                investigations[key] = (target, pool.submit(run, target, owner))
+        
+        for key, target in profiles:
+            investigate(key, target)
+        
+        post_futures = {pool.submit(fetch_post, shortcode): (index, shortcode, target)
+                        for index, (shortcode, target) in enumerate(shortcodes.items())}
+        for future in as_completed(post_futures):
+            index, shortcode, target = post_futures[future]
+            post, owner = future.result()
+            if post is None:
+                finish(target, {"username": None, "post": shortcode, "error": "post not accessible"})
+                continue
+            key = post["owner"].lower()
+            source_posts.setdefault(key, []).append((index, post))
+            investigate(key, post["owner"], owner)
+        
+        owners = {future: key for key, (target, future) in investigations.items()}
+        for future in as_completed(owners):
+            key = owners[future]
+            data = future.result()
+            if key in source_posts:
+                posts = [post for index, post in sorted(source_posts[key], key=lambda item: item[0])]
+                data["source_posts"] = [post_metrics(post, data) for post in posts]
+            finish(investigations[key][0], data)
+    
+    elapsed = time.time() - start_time
+    if output != "silent":
+        write_report(render_batch_summary(results, workers, elapsed, color=output == "box"))
+    return results
+
+def render_batch_summary(results, workers, elapsed, color=True):
+    """Render the closing summary of a batch run"""
+    Fore, Style = palette(color)
+    out = io.StringIO()
+    emit = functools.partial(print, file=out)
+    failed = [(target, data) for target, data in results if data.get("error")]
+    succeeded = len(results) - len(failed)
+    rate = len(results) / elapsed * 60 if elapsed > 0 else 0
+    
+    emit(f"\n{Fore.CYAN}{Style.BRIGHT}╭{'─' * 73}╮")
+    emit(f"{Fore.CYAN}│ {Fore.YELLOW}{Style.BRIGHT}📋  BATCH SUMMARY{' ' * 57}{Fore.CYAN}│")
+    emit(f"{Fore.CYAN}╰{'─' * 73}╯{Style.RESET_ALL}")
+    emit(f"{Fore.WHITE}  ➤ Accounts    : {Fore.CYAN}{Style.BRIGHT}{len(results)}{Style.RESET_ALL}")
+    emit(f"{Fore.WHITE}  ➤ Succeeded   : {Fore.GREEN}{Style.BRIGHT}{succeeded}{Style.RESET_ALL}")
+    emit(f"{Fore.WHITE}  ➤ Failed      : {Fore.RED if failed else Fore.GREEN}{Style.BRIGHT}{len(failed)}{Style.RESET_ALL}")
+    emit(f"{Fore.WHITE}  ➤ Workers     : {Fore.CYAN}{workers}{Style.RESET_ALL}")
+    emit(f"{Fore.WHITE}  ➤ Elapsed     : {Fore.CYAN}{elapsed:.2f}s {Fore.WHITE}({Fore.CYAN}{rate:.1f} accounts/min{Fore.WHITE}){Style.RESET_ALL}")
+    for target, data in failed:
+        emit(f"{Fore.RED}  ✗ {target}: {Fore.YELLOW}{str(data['error'])[:60]}{Style.RESET_ALL}")
+    return out.getvalue()
+
+WATCH_BUDGET = 300
+WATCH_MIN_INTERVAL = 15 * 60
+WATCH_MAX_INTERVAL = 7 * 24 * 3600
+WATCH_TARGET_PROBABILITY = 0.5
+WATCH_PRIOR_HOURS = 7 * 24
+WATCH_MIN_RATE = 1 / (30 * 24)
+WATCH_DEFAULT_COST = 5.0
+
+def activity_rate(investigation_data):
+    """Changes per hour to expect from an account's posting activity alone"""
+    activity = investigation_data.get("activity") or {}
+    rate = (activity.get("avg_posts_per_week") or 0) / 168
+    days_since = activity.get("days_since_last_post")
+    # Silent for more than twice its usual gap: the account is slowing down, go by the silence
+    if days_since and (not rate or days_since * 24 > 2 / rate):
+        rate = 1 / (24 * days_since)
+    return max(rate, WATCH_MIN_RATE)
+
+class WatchEntry:
+    """Polling history of one watched account"""
+    
+    def __init__(self, target, user_id=None, last_polled=None, observed_hours=0.0, polls=0, changes=0,
+                 cost=WATCH_DEFAULT_COST, prior_rate=WATCH_MIN_RATE, last_error=None):
+        self.target = target
+        self.user_id = user_id
+        self.last_polled = last_polled
+        self.observed_hours = observed_hours
+        self.polls = polls
+        self.changes = changes
+        self.cost = cost
+        self.prior_rate = prior_rate
+        self.last_error = last_error
+    
+    def change_rate(self):
+        """Changes per hour: the observed rate, starting from the activity-based prior"""
+        return (self.changes + self.prior_rate * WATCH_PRIOR_HOURS) / (self.observed_hours + WATCH_PRIOR_HOURS)
+    
+    def interval(self):
+        """Seconds after which a change has become WATCH_TARGET_PROBABILITY likely"""
+        hours = -math.log(1 - WATCH_TARGET_PROBABILITY) / self.change_rate()
+        return min(WATCH_MAX_INTERVAL, max(WATCH_MIN_INTERVAL, hours * 3600))
+    
+    def due_at(self):
+        return 0.0 if self.last_polled is None else self.last_polled + self.interval()
+    
+    def priority(self, now):
+        """Expected changes caught per request if the account is polled now"""
+        if self.last_polled is None:
+            return float('inf')
+        hours = (now - self.last_polled) / 3600
+        return (1 - math.exp(-self.change_rate() * hours)) / max(self.cost, 1.0)
+
+class WatchScheduler:
+    """Persistent priority scheduler: the due account with the most expected changes per request goes first"""
+    
+    COLUMNS = ("target", "user_id", "last_polled", "observed_hours", "polls", "changes", "cost", "prior_rate", "last_error")
+    
+    def __init__(self, path, targets):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        import sqlite3
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""CREATE TABLE IF NOT EXISTS watch (
+            target TEXT PRIMARY KEY, user_id TEXT, last_polled REAL, observed_hours REAL NOT NULL,
+            polls INTEGER NOT NULL, changes INTEGER NOT NULL, cost REAL NOT NULL, prior_rate REAL NOT NULL,
+            last_error TEXT)""")
+        stored = {row[0]: WatchEntry(*row) for row in self._db.execute(f"SELECT {', '.join(self.COLUMNS)} FROM watch")}
+        self.entries = {target: stored.get(target) or WatchEntry(target) for target in targets}
+        self.in_flight = set()
+    
+    def next_target(self, now):
+        """Return (target, None) for the best due account, or (None, seconds until one is due)"""
+        best, best_priority, next_due = None, -1.0, float('inf')
+        for target, entry in self.entries.items():
+            if target in self.in_flight:
+                continue
+            due_at = entry.due_at()
+            if due_at > now:
+                next_due = min(next_due, due_at)
+                continue
+            priority = entry.priority(now)
+            if priority > best_priority:
+                best, best_priority = target, priority
+        if best is not None:
+            return best, None
+        return None, next_due - now
+    
+    def record(self, target, investigation_data, cost, now):
+        """Fold a finished poll into the account's history; return its changes, if it found any"""
+        entry = self.entries[target]
+        changes = {key: value for key, value in (investigation_data.get("changes") or {}).items() if key != "since"}
+        if entry.last_polled is not None:
+            entry.observed_hours += (now - entry.last_polled) / 3600
+        entry.last_polled = now
+        entry.polls += 1
+        entry.changes += bool(changes)
+        entry.cost = cost if entry.polls == 1 else 0.7 * entry.cost + 0.3 * cost
+        entry.last_error = investigation_data.get("error")
+        if not entry.last_error:
+            entry.prior_rate = activity_rate(investigation_data)
+            entry.user_id = str((investigation_data.get("profile") or {}).get("user_id") or entry.user_id or '') or None
+        self._db.execute(f"INSERT OR REPLACE INTO watch VALUES ({', '.join('?' * len(self.COLUMNS))})",
+                         tuple(getattr(entry, column) for column in self.COLUMNS))
+        return changes
+    
+    def close(self):
+        self._db.close()
+
+class RequestBudget:
+    """Sliding one-hour window of the HTTP requests spent on polls"""
+    
+    def __init__(self, per_hour):
+        self.per_hour = per_hour
+        self._spent = deque()
+        self.reserved = 0.0
+    
+    def _expire(self, now):
+        while self._spent and now - self._spent[0][0] >= 3600:
+            self._spent.popleft()
+    
+    def wait_time(self, cost, now):
+        """Seconds until cost more requests fit in the window"""
+        self._expire(now)
+        used = sum(spent for _, spent in self._spent) + self.reserved
+        if used + cost <= self.per_hour or not (self._spent or self.reserved):
+            return 0.0
+        # Free the oldest spending until the poll fits
+        for at, spent in self._spent:
+            used -= spent
+            if used + cost <= self.per_hour:
+                return at + 3600 - now
+        return 60.0
+    
+    def spend(self, cost, now):
+        self._spent.append((now, cost))
+
+def render_change_event(event, color=True):
+    """Render a change event as one line"""
+    Fore, Style = palette(color)
+    changes = event["changes"]
+    parts = []
+    for key in ("followers", "following"):
+        if key in changes:
+            parts.append(f"{key} {changes[key]['change']:+,} ({changes[key]['new']:,})")
+    if "biography" in changes:
+        parts.append("bio changed")
+    if "external_urls" in changes:
+        parts.append(f"links +{len(changes['external_urls']['added'])} -{len(changes['external_urls']['removed'])}")
+    if "new_posts" in changes:
+        parts.append(f"{len(changes['new_posts'])} new post(s)")
+    timestamp = datetime.fromisoformat(event["timestamp"]).strftime('%H:%M:%S')
+    return (f"{Fore.CYAN}[{timestamp}] {Fore.YELLOW}{Style.BRIGHT}@{event['username']}{Style.RESET_ALL}"
+            f"{Fore.WHITE}  {', '.join(parts)}{Style.RESET_ALL}\n")
+
+def watch(targets, budget=WATCH_BUDGET, workers=4, output="box", sink=None, max_polls=None):
+    """Keep polling accounts, each as often as its activity and change history warrant, within a budget
+
+    Polls go through collect_investigation, so changes are found by comparing with the stored
+    snapshot. Every poll that changed something yields a change event, written to the sink and
+    rendered unless output is silent. The budget counts HTTP requests per hour.
+    """
+    usernames = []
+    for target in targets:
+        kind, value = clean_instagram_url(target)
+        if kind == 'profile' and value and value.lower() not in usernames:
+            usernames.append(value.lower())
+    if not usernames:
+        return 0
+    scheduler = WatchScheduler(os.path.join(DATA_DIR, 'watch.db'), usernames)
+    requests_budget = RequestBudget(budget)
+    color = output == "box"
+    if output != "silent":
+        Fore, Style = palette(color)
+        write_report(f"{Fore.CYAN}[●] {Fore.WHITE}Watching {Fore.CYAN}{len(usernames)}{Fore.WHITE} accounts "
+                     f"within {Fore.CYAN}{budget}{Fore.WHITE} requests/hour{Style.RESET_ALL}\n")
+    
+    def poll(target):
+        data = collect_investigation(target)
+        return data, data.get("timings", {}).get("counters", {}).get("http_requests", 0)
+    
+    polls = 0
+    running = {}
+    pool = ThreadPoolExecutor(max_workers=max(1, workers))
+    try:
+        while max_polls is None or polls < max_polls or running:
+            now = time.time()
+            delay = 1.0
+            if len(running) < max(1, workers) and (max_polls is None or polls + len(running) < max_polls):
+                target, delay = scheduler.next_target(now)
+                if target is not None:
+                    cost = scheduler.entries[target].cost
+                    delay = requests_budget.wait_time(cost, now)
+                    if not delay:
+                        requests_budget.reserved += cost
+                        scheduler.in_flight.add(target)
+                        running[pool.submit(poll, target)] = (target, cost)
+                        continue
+            if running:
+                done, _ = wait(running, timeout=min(delay, 60.0), return_when=FIRST_COMPLETED)
+            else:
+                time.sleep(min(delay, 60.0))
+                done = ()
+            for future in done:
+                target, reserved = running.pop(future)
+                data, cost = future.result()
+                now = time.time()
+                requests_budget.reserved -= reserved
+                requests_budget.spend(cost, now)
+                scheduler.in_flight.discard(target)
+                polls += 1
+                changes = scheduler.record(target, data, cost, now)
+                if changes:
+                    event = {"event": "change", "username": data["username"],
+                             "user_id": data.get("profile", {}).get("user_id"),
+                             "timestamp": datetime.now().isoformat(), "since": data["changes"].get("since"),
+                             "changes": changes}
+                    if sink is not None:
+                        sink.write(event)
+                    if output != "silent":
+                        write_report(render_change_event(event, color))
+                elif data.get("error") and output != "silent":
+                    Fore, Style = palette(color)
+                    write_report(f"{Fore.RED}[!] @{target}: {Fore.YELLOW}{str(data['error'])[:60]}{Style.RESET_ALL}\n")
+    finally:
+        # Queued polls/visits are dropped; shutdown(cancel_futures=True) would need Python 3.9
+        for future in running:
+            future.cancel()
+        pool.shutdown(wait=False)
+        scheduler.close()
+    return polls
+
+CRAWL_DEPTH = 2
+CRAWL_BUDGET = 1000
+CRAWL_FANOUT = 25
+
+def mention_edges(investigation_data):
+    """Accounts an investigated profile mentions, as {username: {"bio": 1, "caption": count}}"""
+    own = (investigation_data.get("username") or "").lower()
+    edges = {}
+    sources = [("bio", dict.fromkeys(investigation_data.get("bio_mentions", []), 1)),
+               ("caption", investigation_data.get("top_mentions", {}))]
+    for kind, mentions in sources:
+        for mention, count in mentions.items():
+            # The mention pattern also takes a sentence's closing dot; usernames never end with one
+            target = mention.rstrip('.').lower()
+            if target and target != own:
+                edges.setdefault(target, {})[kind] = edges.get(target, {}).get(kind, 0) + count
+    return edges
+
+class EdgeWriter:
+    """Stream mention edges as tab-separated `source target kind weight` lines, or collect an adjacency JSON"""
+    
+    def __init__(self, path):
+        self.path = path
+        self.adjacency = path.endswith('.json')
+        self.nodes = {}
+        self._file = None if self.adjacency else open(path, 'w', encoding='utf-8')
+    
+    def write(self, source, node):
+        if self.adjacency:
+            self.nodes[source] = node
+            return
+        for target, kinds in node["mentions"].items():
+            for kind, weight in kinds.items():
+                self._file.write(f"{source}\t{target}\t{kind}\t{weight}\n")
+        self._file.flush()
+    
+    def close(self):
+        if self.adjacency:
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump(self.nodes, f, indent=2, ensure_ascii=False)
         else:
-            print(f"\n{Fore.RED}╭{'─' * 73}╮")
-            print(f"{Fore.RED}│ {Fore.YELLOW}[!] Error: {error_msg[:60]}{' ' * (62 - len(error_msg[:60]))}{Fore.RED}│")
-            print(f"{Fore.RED}╰{'─' * 73}╯{Style.RESET_ALL}")
+            self._file.close()
+
+def render_crawl_node(username, node, color=True):
+    """Render one finished crawl node as one line"""
+    Fore, Style = palette(color)
+    if node.get("error"):
+        return f"{Fore.RED}[d{node['depth']}] @{username}: {Fore.YELLOW}{str(node['error'])[:60]}{Style.RESET_ALL}\n"
+    return (f"{Fore.CYAN}[d{node['depth']}] {Fore.YELLOW}{Style.BRIGHT}@{username}{Style.RESET_ALL}"
+            f"{Fore.WHITE}  {len(node['mentions'])} mentioned, {node['queued']} queued "
+            f"{Fore.CYAN}({node['requests']} requests){Style.RESET_ALL}\n")
+
+def render_crawl_summary(graph, elapsed, color=True):
+    """Render the closing summary of a crawl"""
+    Fore, Style = palette(color)
+    out = io.StringIO()
+    emit = functools.partial(print, file=out)
+    nodes = graph["nodes"]
+    failed = sum(1 for node in nodes.values() if node.get("error"))
+    
+    emit(f"\n{Fore.CYAN}{Style.BRIGHT}╭{'─' * 73}╮")
+    emit(f"{Fore.CYAN}│ {Fore.YELLOW}{Style.BRIGHT}🕸️  CRAWL SUMMARY{' ' * 56}{Fore.CYAN}│")
+    emit(f"{Fore.CYAN}╰{'─' * 73}╯{Style.RESET_ALL}")
+    emit(f"{Fore.WHITE}  ➤ Seed        : {Fore.YELLOW}{Style.BRIGHT}@{graph['seed']}{Style.RESET_ALL}")
+    emit(f"{Fore.WHITE}  ➤ Accounts    : {Fore.CYAN}{Style.BRIGHT}{len(nodes)}{Style.RESET_ALL}"
+         f"{Fore.WHITE} ({Fore.RED if failed else Fore.GREEN}{failed} failed{Fore.WHITE}){Style.RESET_ALL}")
+    emit(f"{Fore.WHITE}  ➤ Edges       : {Fore.CYAN}{graph['edges']:,}{Style.RESET_ALL}")
+    emit(f"{Fore.WHITE}  ➤ Depth       : {Fore.CYAN}{graph['depth']}{Style.RESET_ALL}")
+    emit(f"{Fore.WHITE}  ➤ Requests    : {Fore.CYAN}{graph['requests']:,} of {graph['budget']:,}{Style.RESET_ALL}")
+    if graph["unvisited"]:
+        emit(f"{Fore.WHITE}  ➤ Unvisited   : {Fore.YELLOW}{graph['unvisited']:,} (budget spent){Style.RESET_ALL}")
+    emit(f"{Fore.WHITE}  ➤ Elapsed     : {Fore.CYAN}{elapsed:.2f}s{Style.RESET_ALL}")
+    if graph["most_mentioned"]:
+        emit(f"{Fore.WHITE}  ➤ Most mentioned:{Style.RESET_ALL}")
+        for username, count in graph["most_mentioned"]:
+            emit(f"{Fore.WHITE}     @{Fore.YELLOW}{username:<30} {Fore.CYAN}{count}x{Style.RESET_ALL}")
+    return out.getvalue()
+
+def crawl(seed, depth=CRAWL_DEPTH, budget=CRAWL_BUDGET, workers=4, fanout=CRAWL_FANOUT, max_posts=None,
+          since=None, output="box", sink=None, edges_path=None):
+    """Expand from a seed account through the accounts it mentions, breadth first, up to depth hops
+
+    Every account enters the frontier at most once, so no profile is fetched twice. Each node
+    follows only its fanout most-mentioned accounts (bio mentions first), but all of its edges
+    are recorded. New nodes are started only while the spent plus in-flight HTTP requests
+    leave room in the budget; repeated crawls are cheap while the response cache holds the profiles.
+    """
+    kind, seed = clean_instagram_url(seed)
+    if kind != 'profile' or not seed:
+        raise ValueError("the crawl seed must be a username or profile URL")
+    seed = seed.lower()
+    # Mentions come from the newest captions only; there is no need to page further
+    max_posts = RECENT_POSTS_COUNT if max_posts is None and since is None else max_posts
+    workers = max(1, workers)
+    color = output == "box"
+    start_time = time.time()
+    
+    frontier = deque([(seed, 0)])
+    seen = {seed}
+    nodes = {}
+    mentioned = Counter()
+    edge_count = 0
+    spent = 0
+    reserved = 0.0
+    costs = []
+    writer = EdgeWriter(edges_path) if edges_path else None
+    
+    def visit(username):
+        data = collect_investigation(username, max_posts=max_posts, since=since)
+        return data, data.get("timings", {}).get("counters", {}).get("http_requests", 0)
+    
+    running = {}
+    pool = ThreadPoolExecutor(max_workers=workers)
+    try:
+        while frontier or running:
+            # Until a node has finished, assume the cost of a watch poll
+            estimate = sum(costs) / len(costs) if costs else WATCH_DEFAULT_COST
+            while frontier and len(running) < workers and spent + reserved + estimate <= budget:
+                username, level = frontier.popleft()
+                reserved += estimate
+                running[pool.submit(visit, username)] = (username, level, estimate)
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                username, level, estimate = running.pop(future)
+                data, cost = future.result()
+                reserved -= estimate
+                spent += cost
+                costs.append(cost)
+                node = {"depth": level, "requests": cost, "mentions": {}, "queued": 0}
+                if data.get("error"):
+                    node["error"] = data["error"]
+                else:
+                    node["followers"] = data["statistics"]["followers"]
+                    node["mentions"] = mention_edges(data)
+                    edge_count += sum(len(kinds) for kinds in node["mentions"].values())
+                    mentioned.update(node["mentions"].keys())
+                    if level < depth:
+                        ranked = sorted(node["mentions"].items(),
+                                        key=lambda item: (-item[1].get("bio", 0), -sum(item[1].values())))
+                        for target, _ in ranked[:fanout]:
+                            if target not in seen:
+                                seen.add(target)
+                                frontier.append((target, level + 1))
+                                node["queued"] += 1
+                nodes[username] = node
+                if writer is not None:
+                    writer.write(username, node)
+                if sink is not None:
+                    sink.write(data)
+                if output != "silent":
+                    write_report(render_crawl_node(username, node, color))
+    finally:
+        # Queued polls/visits are dropped; shutdown(cancel_futures=True) would need Python 3.9
+        for future in running:
+            future.cancel()
+        pool.shutdown(wait=False)
+        if writer is not None:
+            writer.close()
+    
+    graph = {
+        "seed": seed,
+        "depth": max((node["depth"] for node in nodes.values()), default=0),
+        "nodes": nodes,
+        "edges": edge_count,
+        "requests": spent,
+        "budget": budget,
+        "unvisited": len(frontier),
+        "most_mentioned": mentioned.most_common(5)
+    }
+    if output != "silent":
+        write_report(render_crawl_summary(graph, time.time() - start_time, color))
+    return graph
+
+SERVICE_QUEUE_SIZE = 16
+
+class ServiceBusy(Exception):
+    """Raised when every worker is busy and the queue is full"""
+
+class InvestigationService:
+    """Runs API jobs on a bounded worker pool with a bounded queue in front of it"""
+    
+    def __init__(self, workers=4, queue_size=SERVICE_QUEUE_SIZE):
+        self.workers = max(1, workers)
+        self.queue_size = max(0, queue_size)
+        self.started = time.time()
+        self.completed = 0
+        self.rejected = 0
+        self._pending = 0
+        self._futures = set()
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="api")
+    
+    def submit(self, func, *args):
+        """Queue a job, or raise ServiceBusy when workers and queue are all taken"""
+        with self._lock:
+            if self._pending >= self.workers + self.queue_size:
+                self.rejected += 1
+                raise ServiceBusy()
+            self._pending += 1
+        future = self._pool.submit(func, *args)
+        with self._lock:
+            self._futures.add(future)
+        future.add_done_callback(self._done)
+        return future
+    
+    def _done(self, future):
+        with self._lock:
+            self._futures.discard(future)
+            self._pending -= 1
+            self.completed += 1
+    
+    def health(self):
+        with self._lock:
+            active = min(self._pending, self.workers)
+            return {
+                "status": "ok",
+                "uptime": round(time.time() - self.started, 1),
+                "workers": self.workers,
+                "active": active,
+                "queued": self._pending - active,
+                "queue_size": self.queue_size,
+                "completed": self.completed,
+                "rejected": self.rejected
+            }
+    
+    def close(self):
+        # Drop the queued jobs by hand; shutdown(cancel_futures=True) would need Python 3.9
+        with self._lock:
+            queued = list(self._futures)
+        for future in queued:
+            future.cancel()
+        self._pool.shutdown(wait=False)
+
+def parse_address(value):
+    """Parse a [HOST:]PORT command line address (host defaults to 127.0.0.1)"""
+    host, _, port = value.rpartition(':')
+    try:
+        return host or '127.0.0.1', int(port)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid address '{value}' (expected [HOST:]PORT)")
+
+def serve(address, workers=4, queue_size=SERVICE_QUEUE_SIZE, quiet=False):
+    """Serve investigations on address (host, port) over a local HTTP/JSON API, reusing one warm loader, session and cache
+
+    GET or POST (JSON body) /investigate?target=...&max_posts=N&since=YYYY-MM-DD,
+    /post?url=... (or shortcode=...) and /similar?name=...&limit=N; GET /health and /metrics.
+    When all workers are busy and the queue is full, requests are answered with 503 and Retry-After.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    
+    service = InvestigationService(workers, queue_size)
+    encode = json_encoder()
+    
+    class APIHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+        
+        def send_body(self, status, body, content_type="application/json", headers=()):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in headers:
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def send_json(self, status, payload, headers=()):
+            self.send_body(status, encode(payload), headers=headers)
+        
+        def do_GET(self):
+            parts = urlsplit(self.path)
+            self.route(parts.path, {key: values[-1] for key, values in parse_qs(parts.query).items()})
+        
+        def do_POST(self):
+            parts = urlsplit(self.path)
+            try:
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                params = json.loads(body) if body else {}
+            except ValueError:
+                return self.send_json(400, {"error": "invalid JSON body"})
+            if not isinstance(params, dict):
+                return self.send_json(400, {"error": "expected a JSON object"})
+            self.route(parts.path, params)
+        
+        def route(self, path, params):
+            if path == "/health":
+                return self.send_json(200, service.health())
+            if path == "/metrics":
+                return self.send_body(200, render_prometheus().encode(), "text/plain; version=0.0.4")
+            if path == "/similar":
+                name = params.get("name") or params.get("target")
+                if not name:
+                    return self.send_json(400, {"error": "missing 'name'"})
+                try:
+                    limit = int(params.get("limit") or LOOKALIKE_LIMIT)
+                except ValueError as e:
+                    return self.send_json(400, {"error": str(e)})
+                # A local index query: answered right here, without taking an investigation slot
+                return self.send_json(200, {"query": name, "lookalikes": find_lookalikes(name, limit)})
+            if path == "/investigate":
+                target = params.get("target") or params.get("username")
+                if not target:
+                    return self.send_json(400, {"error": "missing 'target'"})
+                try:
+                    max_posts = int(params["max_posts"]) if params.get("max_posts") else None
+                    since = parse_date(params["since"]) if params.get("since") else None
+                except (ValueError, argparse.ArgumentTypeError) as e:
+                    return self.send_json(400, {"error": str(e)})
+                job = (collect_investigation, target, max_posts, since)
+            elif path == "/post":
+                shortcode = params.get("shortcode")
+                if not shortcode and params.get("url"):
+                    kind, value = clean_instagram_url(params["url"])
+                    shortcode = value if kind == 'post' else None
+                if not shortcode:
+                    return self.send_json(400, {"error": "missing post 'url' or 'shortcode'"})
+                job = (collect_post, shortcode)
+            else:
+                return self.send_json(404, {"error": f"unknown endpoint {path}"})
+            
+            try:
+                future = service.submit(*job)
+            except ServiceBusy:
+                return self.send_json(503, {"error": "busy, try again later"}, headers=[("Retry-After", "1")])
+            result = future.result()
+            if result is None:
+                return self.send_json(404, {"error": "post not accessible"})
+            self.send_json(200, result)
+        
+        def log_message(self, format, *args):
+            if not quiet:
+                super().log_message(format, *args)
+    
+    server = ThreadingHTTPServer(address, APIHandler)
+    server.daemon_threads = True
+    if not quiet:
+        host, port = server.server_address[:2]
+        print(f"{Fore.CYAN}[●] {Fore.WHITE}Serving on {Fore.CYAN}http://{host}:{port}{Fore.WHITE} "
+              f"({service.workers} workers, queue of {service.queue_size}){Style.RESET_ALL}")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        service.close()
 
 def print_banner():
     """Print enhanced ASCII banner"""
@@ -740,18 +3623,141 @@ def interactive_menu():
     choice = input(f"\n{Fore.GREEN}Select option (1-4): {Style.RESET_ALL}").strip()
     return choice
 
+def parse_date(value):
+    """Parse a YYYY-MM-DD command line date"""
+    try:
+        return datetime.strptime(value, '%Y-%m-%d')
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date '{value}' (expected YYYY-MM-DD)")
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Instagram OSINT Investigation Tool")
+    parser.add_argument("username", nargs="?", help="Instagram username, profile URL or post/reel URL")
+    parser.add_argument("-j", "--json", action="store_true", help="export results to JSON")
+    parser.add_argument("--max-posts", type=int, metavar="N",
+                        help=f"fetch at most N of the newest posts (default: {DEFAULT_POST_WINDOW})")
+    parser.add_argument("--all-posts", action="store_true",
+                        help="fetch the whole feed, so the history analytics cover the account's full history")
+    parser.add_argument("--since", type=parse_date, metavar="DATE",
+                        help="only fetch posts published on or after DATE (YYYY-MM-DD)")
+    parser.add_argument("--batch", metavar="FILE",
+                        help="investigate every username/URL listed in FILE ('-' reads stdin)")
+    parser.add_argument("--workers", type=int, default=4, metavar="N",
+                        help="number of concurrent investigations in batch and serve mode (default: 4)")
+    parser.add_argument("--watch", metavar="FILE",
+                        help="keep polling the accounts listed in FILE, each as often as its activity warrants, "
+                             "and report changes")
+    parser.add_argument("--budget", type=int, metavar="N",
+                        help=f"HTTP requests per hour that --watch may spend (default: {WATCH_BUDGET}), "
+                             f"or in total for --crawl (default: {CRAWL_BUDGET})")
+    parser.add_argument("--crawl", metavar="SEED",
+                        help="investigate SEED, then the accounts it mentions in its bio and captions, and so on")
+    parser.add_argument("--depth", type=int, default=CRAWL_DEPTH, metavar="N",
+                        help=f"mention hops --crawl follows from the seed (default: {CRAWL_DEPTH})")
+    parser.add_argument("--fanout", type=int, default=CRAWL_FANOUT, metavar="N",
+                        help=f"most-mentioned accounts --crawl follows per account (default: {CRAWL_FANOUT})")
+    parser.add_argument("--edges", metavar="FILE",
+                        help="write the --crawl mention graph to FILE: tab-separated edges, or an adjacency list if FILE ends in .json")
+    parser.add_argument("--similar", metavar="NAME",
+                        help="list the already investigated accounts whose username or full name looks like NAME")
+    parser.add_argument("--limit", type=int, default=LOOKALIKE_LIMIT, metavar="N",
+                        help=f"lookalikes to list with --similar (default: {LOOKALIKE_LIMIT})")
+    parser.add_argument("--serve", type=parse_address, metavar="[HOST:]PORT",
+                        help="run as a local HTTP/JSON API service instead (host defaults to 127.0.0.1)")
+    parser.add_argument("--queue-size", type=int, default=SERVICE_QUEUE_SIZE, metavar="N",
+                        help=f"requests the service queues beyond --workers before answering 503 (default: {SERVICE_QUEUE_SIZE})")
+    parser.add_argument("--pool-size", type=int, default=HTTP_POOL_SIZE, metavar="N",
+                        help=f"keep-alive connections kept per host (default: {HTTP_POOL_SIZE})")
+    parser.add_argument("--media", action="store_true",
+                        help="download the profile picture and the posts' images and videos into ~/.insta_info/media, "
+                             "each distinct file stored once")
+    parser.add_argument("--record", metavar="DIR",
+                        help="save every HTTP exchange of each investigation to a gzip cassette in DIR (bypasses cached responses)")
+    parser.add_argument("--replay", metavar="DIR",
+                        help="answer every HTTP request from the cassettes in DIR, without network access")
+    parser.add_argument("--no-cache", action="store_true", help="neither read nor write the response cache")
+    parser.add_argument("--refresh", action="store_true", help="ignore cached responses and store fresh ones")
+    parser.add_argument("--no-snapshots", action="store_true",
+                        help="do not compare with, or update, the stored result of the previous run")
+    parser.add_argument("-o", "--output", choices=sorted(RENDERERS),
+                        help="report style: box (default), plain (no colors) or silent (no report)")
+    parser.add_argument("--ndjson", metavar="FILE",
+                        help="append one compact JSON record per investigation to FILE ('-' for stdout)")
+    parser.add_argument("--gzip", action="store_true", help="gzip-compress the --ndjson stream")
+    parser.add_argument("--metrics", metavar="FILE",
+                        help="write stage timings and request counters to FILE in the Prometheus text format on exit")
+    parser.add_argument("-q", "--quiet", action="store_true",
+                        help="scripted mode: skip the banner and fail immediately on missing dependencies")
+    args = parser.parse_args(argv)
+    if args.all_posts:
+        if args.max_posts is not None or args.since is not None:
+            parser.error("--all-posts cannot be combined with --max-posts or --since")
+        args.max_posts = sys.maxsize
+    if args.record and args.replay:
+        parser.error("--record and --replay cannot be combined")
+    if args.gzip and not args.ndjson:
+        parser.error("--gzip requires --ndjson")
+    if args.crawl and clean_instagram_url(args.crawl)[0] != 'profile':
+        parser.error("--crawl needs a username or profile URL as its seed")
+    if args.edges and not args.crawl:
+        parser.error("--edges requires --crawl")
+    if args.similar and args.replay:
+        parser.error("--similar reads the local lookalike index and cannot run with --replay")
+    if args.watch and args.no_snapshots:
+        parser.error("--watch detects changes through snapshots and cannot run with --no-snapshots")
+    if args.output is None:
+        # Records on stdout must not be mixed with the report
+        args.output = "silent" if args.ndjson == '-' else "box"
+    if args.ndjson == '-':
+        args.quiet = True
+    return args
+
 if __name__ == "__main__":
+    sink = None
+    metrics_path = None
     try:
-        print_banner()
+        args = parse_args()
+        metrics_path = args.metrics
+        setup_console()
+        if not args.quiet:
+            print_banner()
+        missing = missing_dependencies()
+        if missing:
+            print(f"{Fore.RED}[!] Missing dependencies: {', '.join(missing)} (run: pip install -r requirements.txt){Style.RESET_ALL}",
+                  file=sys.stderr)
+            sys.exit(2)
+        configure_http_session(pool_size=args.pool_size)
+        # A watch poll must see the live profile and feed; lookups may still come from the cache
+        # A recording must see every request and a replay must depend on nothing but the cassettes,
+        # so neither may be answered by the cache or stop paging at posts a snapshot already holds
+        configure_cache(enabled=not args.no_cache and not args.replay, refresh=args.refresh or bool(args.record),
+                        ttls={"profile": 0, "posts": 0} if args.watch else None)
+        configure_snapshots(enabled=not args.no_snapshots and not args.replay)
+        configure_lookalikes(enabled=not args.replay)
+        if args.record or args.replay:
+            configure_cassettes("record" if args.record else "replay", args.record or args.replay)
+        configure_media(enabled=args.media)
+        if args.ndjson:
+            sink = NDJSONSink(args.ndjson, compress=args.gzip)
         
-        if len(sys.argv) > 1:
-            username = sys.argv[1]
-            export_json = '--json' in sys.argv or '-j' in sys.argv
-            
-            if username and not username.startswith('-'):
-                instagram_investigation(username, export_json=export_json)
-            else:
-                print(f"{Fore.RED}[!] Invalid username provided{Style.RESET_ALL}")
+        if args.similar:
+            similar_accounts(args.similar, limit=args.limit, output=args.output, sink=sink)
+        elif args.watch:
+            watch(read_targets(args.watch), budget=args.budget or WATCH_BUDGET, workers=args.workers,
+                  output=args.output, sink=sink)
+        elif args.crawl:
+            crawl(args.crawl, depth=args.depth, budget=args.budget or CRAWL_BUDGET, workers=args.workers,
+                  fanout=args.fanout, max_posts=args.max_posts, since=args.since, output=args.output,
+                  sink=sink, edges_path=args.edges)
+        elif args.serve:
+            serve(args.serve, workers=args.workers, queue_size=args.queue_size, quiet=args.quiet)
+        elif args.batch:
+            batch_investigation(read_targets(args.batch), workers=args.workers, export_json=args.json,
+                                max_posts=args.max_posts, since=args.since, output=args.output, sink=sink)
+        elif args.username:
+            instagram_investigation(args.username, export_json=args.json,
+                                    max_posts=args.max_posts, since=args.since, output=args.output, sink=sink)
         else:
             while True:
                 print(f"\n{Fore.CYAN}{Style.BRIGHT}{'═'*75}{Style.RESET_ALL}")
@@ -769,7 +3775,8 @@ if __name__ == "__main__":
                     print(f"{Fore.RED}[!] No username provided{Style.RESET_ALL}")
                     continue
                 
-                instagram_investigation(username, export_json=False)
+                instagram_investigation(username, export_json=False,
+                                        max_posts=args.max_posts, since=args.since, output=args.output, sink=sink)
                 
                 print(f"\n{Fore.CYAN}{'─' * 75}")
                 continue_choice = input(f"{Fore.CYAN}Investigate another account? (y/n): {Fore.GREEN}").strip().lower()
@@ -784,3 +3791,9 @@ if __name__ == "__main__":
         print(f"\n\n{Fore.YELLOW}[!] Operation cancelled by user{Style.RESET_ALL}")
         print_text_by_text(f"{Fore.CYAN}Goodbye! Thanks for using Insta Info. Stay safe! 👋{Style.RESET_ALL}\n")
         sys.exit(0)
+    finally:
+        if sink is not None:
+            sink.close()
+        close_loader()
+        if metrics_path:
+            write_metrics(metrics_path)
@@ -0,0 +1,124 @@
+"""Micro-benchmark: per-lookup latency of advanced_lookup with and without connection reuse.
+
+Runs against a local stand-in for the /api/v1/users/lookup/ endpoint, so no
+request ever reaches Instagram. "fresh" replays the old behaviour (a new
+connection for every module-level requests.post call), "pooled" goes through
+the shared keep-alive session used by advanced_lookup. The stand-in speaks plain
+HTTP, so the measured gap only covers the TCP handshake; against the real
+endpoint every fresh connection also pays a TLS handshake. The response cache
+is disabled and the lookup token bucket lifted, so every pooled lookup goes
+over the wire without being paced.
+
+    python benchmarks/bench_lookup.py --lookups 200 --threads 8
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+# Keep the user's cache out of it
+os.environ['INSTA_INFO_HOME'] = tempfile.mkdtemp(prefix='insta_info_bench_')
+
+import requests
+import Insta_Info
+
+
+class LookupHandler(BaseHTTPRequestHandler):
+    """Answers every POST like the lookup endpoint does"""
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out as separate writes; without this, Nagle plus the
+    # client's delayed ACK adds ~40ms to every request on a reused connection.
+    disable_nagle_algorithm = True
+    connections = set()
+    connections_lock = threading.Lock()
+
+    def do_POST(self):
+        with self.connections_lock:
+            self.connections.add(self.client_address)
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        body = json.dumps({"obfuscated_email": "t***@example.com", "obfuscated_phone": "", "status": "ok"}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), LookupHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def fresh_lookup(url, username):
+    """advanced_lookup as it was before the shared session: one connection per call"""
+    data = "signed_body=SIGNATURE." + json.dumps({"q": username, "skip_recovery": "1"})
+    headers = dict(Insta_Info.LOOKUP_HEADERS, **{"Content-Length": str(len(data))})
+    return requests.post(url, headers=headers, data=data, timeout=10).json()
+
+
+def pooled_lookup(url, username):
+    return Insta_Info.advanced_lookup(username)
+
+
+def measure(func, url, lookups, threads):
+    LookupHandler.connections.clear()
+    latencies = []
+
+    def timed(i):
+        start = time.perf_counter()
+        func(url, f"user{i}")
+        latencies.append(time.perf_counter() - start)
+
+    func(url, "warmup")
+    latencies.clear()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(timed, range(lookups)))
+    wall = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "lookups_per_s": lookups / wall,
+        "connections": len(LookupHandler.connections),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lookups", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=1)
+    args = parser.parse_args()
+
+    server = start_server()
+    url = f"http://127.0.0.1:{server.server_address[1]}/api/v1/users/lookup/"
+    Insta_Info.LOOKUP_URL = url
+    Insta_Info.configure_cache(enabled=False)
+    Insta_Info.RATE_LIMITS["lookup"] = (1e9, 1e9)
+    Insta_Info._rate_limiters.clear()
+    Insta_Info.configure_http_session(pool_size=max(args.threads, Insta_Info.HTTP_POOL_SIZE))
+
+    print(f"{args.lookups} lookups, {args.threads} thread(s)")
+    print(f"{'mode':<8} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'lookups/s':>10} {'conns':>6}")
+    for name, func in (("fresh", fresh_lookup), ("pooled", pooled_lookup)):
+        r = measure(func, url, args.lookups, args.threads)
+        print(f"{name:<8} {r['mean_ms']:>9.3f} {r['p50_ms']:>9.3f} {r['p95_ms']:>9.3f} "
+              f"{r['lookups_per_s']:>10.0f} {r['connections']:>6}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Benchmark the single-pass text scanner against the per-pattern extraction it replaced.
+
+Runs both over a corpus of bios and captions, checks they agree on every text and
+reports throughput. Uses a seeded synthetic corpus unless --corpus points at a
+file with one text per line (e.g. captions dumped from exported reports).
+"""
+import argparse
+import os
+import random
+import re
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Insta_Info
+
+LEGACY_PATTERNS = {
+    "Twitter/X": r'(?:twitter\.com|x\.com)/([a-zA-Z0-9_]+)',
+    "TikTok": r'tiktok\.com/@?([a-zA-Z0-9_.]+)',
+    "YouTube": r'youtube\.com/(?:c/|channel/|@)?([a-zA-Z0-9_-]+)',
+    "Facebook": r'facebook\.com/([a-zA-Z0-9.]+)',
+    "LinkedIn": r'linkedin\.com/in/([a-zA-Z0-9-]+)',
+    "Snapchat": r'snapchat\.com/add/([a-zA-Z0-9_.]+)',
+    "Telegram": r't\.me/([a-zA-Z0-9_]+)',
+    "WhatsApp": r'wa\.me/(\d+)',
+    "Discord": r'discord\.gg/([a-zA-Z0-9]+)',
+    "Threads": r'threads\.net/@([a-zA-Z0-9_.]+)'
+}
+
+SNIPPETS = [
+    '#travel', '#sunset_vibes', '@friend.one', '@shop_', 'https://x.com/abc', 'TWITTER.COM/Loud',
+    'tiktok.com/@me.too', 'youtube.com/@chan', 'youtube.com/channel/UC-1', 'wa.me/4915512345',
+    't.me/grp', 'https://linktr.ee/z', 'facebook.com/page.x', 'linkedin.com/in/jane-doe',
+    'snapchat.com/add/snap.me', 'discord.gg/AbC12', 'threads.net/@thr.eads', 'x.com/x.com/abc',
+    'https://t.me/chan#pinned', 'mail@x.com/inbox', '📸', '✨', '—', '\n'
+]
+
+def legacy_scan(text):
+    """The extraction as it was before the single-pass scanner"""
+    social_links = {}
+    for platform, pattern in LEGACY_PATTERNS.items():
+        matches = re.findall(pattern, text, re.IGNORECASE)
+        if matches:
+            social_links[platform] = list(set(matches))
+    return {
+        "social_links": social_links,
+        "hashtags": re.findall(r'#(\w+)', text),
+        "mentions": re.findall(r'@([a-zA-Z0-9._]+)', text),
+        "urls": re.findall(r'https?://[^\s\n]+', text)
+    }
+
+def synthetic_corpus(size, seed):
+    rng = random.Random(seed)
+    words = [''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(2, 9))) for _ in range(2000)]
+    corpus = []
+    for _ in range(size):
+        tokens = [
+            rng.choice(words) if rng.random() < 0.92 else rng.choice(SNIPPETS)
+            for _ in range(rng.randint(5, 80))
+        ]
+        joiner = ' ' if rng.random() < 0.8 else ''
+        corpus.append(joiner.join(tokens))
+    return corpus
+
+def normalise(result):
+    result = dict(result)
+    result["social_links"] = {k: sorted(v) for k, v in result["social_links"].items()}
+    return result
+
+def timed(func, corpus, rounds):
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for text in corpus:
+            func(text)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark social link / hashtag / mention extraction")
+    parser.add_argument('--corpus', help='File with one bio or caption per line')
+    parser.add_argument('--texts', type=int, default=50000, help='Synthetic corpus size (default: 50000)')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--rounds', type=int, default=3, help='Timing rounds, best is reported (default: 3)')
+    args = parser.parse_args()
+
+    if args.corpus:
+        with open(args.corpus, encoding='utf-8') as f:
+            corpus = [line.rstrip('\n') for line in f if line.strip()]
+    else:
+        corpus = synthetic_corpus(args.texts, args.seed)
+    megabytes = sum(len(text.encode('utf-8')) for text in corpus) / 1e6
+
+    mismatches = [text for text in corpus if normalise(legacy_scan(text)) != normalise(Insta_Info.scan_text(text))]
+    print(f"texts       : {len(corpus)} ({megabytes:.1f} MB)")
+    print(f"mismatches  : {len(mismatches)}")
+    if mismatches:
+        print(f"first       : {mismatches[0]!r}")
+
+    Insta_Info.get_scanner()
+    results = {}
+    for name, func in (("legacy", legacy_scan), ("scan_text", Insta_Info.scan_text)):
+        elapsed = timed(func, corpus, args.rounds)
+        results[name] = elapsed
+        print(f"{name:<12}: {elapsed:.3f}s  {len(corpus) / elapsed:>10.0f} texts/s  {megabytes / elapsed:6.1f} MB/s")
+    print(f"speedup     : {results['legacy'] / results['scan_text']:.2f}x")
+    return 1 if mismatches else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
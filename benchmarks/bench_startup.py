@@ -0,0 +1,85 @@
+"""Track the cold-start cost of Insta_Info against a budget.
+
+Spawns fresh interpreters with `-X importtime`, reports the median cumulative import
+time of the module, its slowest imports and the wall time of `Insta_Info.py --help`.
+Fails (exit 1) when the import exceeds --budget-ms or when a heavy dependency that
+should be loaded lazily is imported up front, so it can run as a regression check.
+"""
+import argparse
+import os
+import py_compile
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT = os.path.join(ROOT, 'Insta_Info.py')
+LAZY_MODULES = ('requests', 'urllib3', 'instaloader', 'sqlite3.dbapi2', 'numpy')
+IMPORTTIME_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+def import_profile():
+    """Import the module in a fresh interpreter and return {module: (self_us, cumulative_us)} for its import tree"""
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import Insta_Info'],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    # Nested imports are listed before their parent, so everything since the
+    # previous top-level entry belongs to Insta_Info (site and friends do not)
+    modules = {}
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        name = match.group(4)
+        modules[name] = (int(match.group(1)), int(match.group(2)))
+        if len(match.group(3)) == 1:
+            if name == 'Insta_Info':
+                return modules
+            modules = {}
+    return modules
+
+def script_wall_time():
+    start = time.perf_counter()
+    subprocess.run([sys.executable, SCRIPT, '--help'], cwd=ROOT, capture_output=True, check=True)
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Insta_Info cold start")
+    parser.add_argument('--runs', type=int, default=10, help='fresh interpreters to start (default: 10)')
+    parser.add_argument('--budget-ms', type=float, default=40.0,
+                        help='maximum median import time of Insta_Info in ms (default: 40)')
+    parser.add_argument('--top', type=int, default=8, help='slowest imports to list (default: 8)')
+    args = parser.parse_args()
+
+    # Measure with up-to-date bytecode, as an installed copy would run
+    py_compile.compile(SCRIPT)
+
+    profiles = [import_profile() for _ in range(args.runs)]
+    cumulative = [profile['Insta_Info'][1] / 1000 for profile in profiles]
+    median = statistics.median(cumulative)
+    eager = [name for name in LAZY_MODULES if name in profiles[0]]
+    walls = [script_wall_time() * 1000 for _ in range(max(1, args.runs // 2))]
+
+    print(f"import Insta_Info : {median:.1f} ms median ({min(cumulative):.1f}-{max(cumulative):.1f}) over {args.runs} runs")
+    print(f"Insta_Info --help : {statistics.median(walls):.1f} ms median wall time")
+    print(f"budget            : {args.budget_ms:.1f} ms")
+    print("slowest imports (self time):")
+    slowest = sorted(profiles[0].items(), key=lambda item: item[1][0], reverse=True)[:args.top]
+    for name, (self_us, cumulative_us) in slowest:
+        print(f"  {name:<32} {self_us / 1000:7.2f} ms  (cumulative {cumulative_us / 1000:.2f} ms)")
+
+    failed = False
+    if eager:
+        print(f"FAIL: imported at startup but expected lazily: {', '.join(eager)}")
+        failed = True
+    if median > args.budget_ms:
+        print(f"FAIL: import time {median:.1f} ms exceeds budget of {args.budget_ms:.1f} ms")
+        failed = True
+    if not failed:
+        print("OK")
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,281 @@
+"""Offline benchmark suite: end-to-end latency, stage timings, batch throughput and memory.
+
+Everything runs against the local Instagram stand-in (fake_instagram.py), started in
+a child process so its work does not share the GIL or the traced memory with the
+code being measured. Response cache and snapshots are disabled and, unless --paced
+is given, the token buckets are opened up so the numbers show Insta_Info's own cost
+plus the configured server latency rather than the deliberate pacing.
+
+Results are saved as JSON; --compare flags metrics that regressed by more than
+--tolerance against an earlier results file (exit 1), so it can gate a change:
+
+    python benchmarks/bench_suite.py --save before.json
+    python benchmarks/bench_suite.py --compare before.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import urllib.request
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT)
+# Keep the user's cache and snapshots out of it
+os.environ['INSTA_INFO_HOME'] = tempfile.mkdtemp(prefix='insta_info_bench_')
+
+import Insta_Info
+from fake_instagram import redirect_to
+
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+HIGHER_IS_BETTER = ('_per_s',)
+
+
+def start_server(args):
+    """Start the stand-in in a child process and return (process, netloc)"""
+    proc = subprocess.Popen(
+        [sys.executable, os.path.join(BENCH_DIR, 'fake_instagram.py'), '--port', '0',
+         '--latency', str(args.latency), '--page-size', str(args.page_size),
+         '--throttle-rate', str(args.throttle_rate)],
+        stdout=subprocess.PIPE, text=True
+    )
+    return proc, proc.stdout.readline().strip()
+
+
+def server_call(netloc, path, payload=None):
+    """Talk to the stand-in's control endpoints (plain urllib, so the redirect does not apply)"""
+    data = json.dumps(payload).encode() if payload is not None else None
+    with urllib.request.urlopen(f"http://{netloc}{path}", data=data, timeout=10) as resp:
+        return json.load(resp)
+
+
+def unpace():
+    """Lift the token buckets and shorten backoff so only real work is measured"""
+    for name in Insta_Info.RATE_LIMITS:
+        Insta_Info.RATE_LIMITS[name] = (1e9, 1e9)
+    Insta_Info._rate_limiters.clear()
+    Insta_Info.BACKOFF_BASE = 0.01
+
+
+def fresh_run():
+    """Start the next run like a new process would: no loader, no pooled connections"""
+    Insta_Info.close_loader()
+    Insta_Info.configure_http_session(Insta_Info.HTTP_POOL_SIZE)
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def bench_end_to_end(netloc, sizes, repeat):
+    results = {}
+    for size in sizes:
+        username = f"bench_{size}"
+        durations = []
+        for _ in range(repeat):
+            fresh_run()
+            server_call(netloc, '/__config', {})
+            elapsed, data = timed(Insta_Info.instagram_investigation, username, max_posts=size, output="silent")
+            if data.get("error"):
+                raise RuntimeError(f"{username}: {data['error']}")
+            durations.append(elapsed)
+        requests_made = server_call(netloc, '/__stats')
+        results[size] = {
+            "median_s": statistics.median(durations),
+            "min_s": min(durations),
+            "requests": sum(count for route, count in requests_made.items() if route != "bytes"),
+            "throttled": requests_made.get("429", 0),
+        }
+        print(f"  {size:>6} posts  median {results[size]['median_s'] * 1000:9.1f} ms  "
+              f"min {results[size]['min_s'] * 1000:9.1f} ms  {results[size]['requests']:>5} requests"
+              f"  {results[size]['throttled']:>3} x 429")
+    return results
+
+
+def bench_stages(sizes):
+    results = {}
+    for size in sizes:
+        username = f"bench_{size}"
+        fresh_run()
+        stages = {}
+        stages["context_s"], _ = timed(Insta_Info.get_loader)
+        stages["load_profile_s"], profile = timed(Insta_Info.load_profile, username)
+        stages["advanced_lookup_s"], _ = timed(Insta_Info.advanced_lookup, username)
+        stages["post_stats_s"], stats = timed(Insta_Info.collect_post_stats, profile, size)
+        stages["history_s"], _ = timed(Insta_Info.history_analytics, stats, profile.followers)
+        data = Insta_Info.collect_investigation(username, max_posts=size)
+        stages["render_box_s"], _ = timed(Insta_Info.render_report, data, True)
+        stages["render_plain_s"], _ = timed(Insta_Info.render_report, data, False)
+        results[size] = stages
+        print(f"  {size:>6} posts  " + "  ".join(
+            f"{name[:-2]} {value * 1000:.1f}" for name, value in stages.items()) + "  (ms)")
+    return results
+
+
+def bench_batch(levels, accounts, posts):
+    results = {}
+    targets = [f"batch{i}_{posts}" for i in range(accounts)]
+    for workers in levels:
+        fresh_run()
+        Insta_Info.configure_http_session(max(workers, Insta_Info.HTTP_POOL_SIZE))
+        elapsed, batch = timed(Insta_Info.batch_investigation, targets, workers=workers, output="silent")
+        failed = sum(1 for _, data in batch if data.get("error"))
+        results[workers] = {"elapsed_s": elapsed, "accounts_per_s": accounts / elapsed, "failed": failed}
+        print(f"  {workers:>3} workers  {elapsed:7.2f} s  {accounts / elapsed:7.2f} accounts/s  {failed} failed")
+    return results
+
+
+def bench_memory(sizes):
+    results = {}
+    for size in sizes:
+        fresh_run()
+        tracemalloc.start()
+        Insta_Info.collect_investigation(f"bench_{size}", max_posts=size)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        results[size] = {"peak_mb": peak / 1e6}
+        print(f"  {size:>6} posts  peak {peak / 1e6:8.2f} MB")
+    return results
+
+
+def flatten(results):
+    """{"e2e": {10: {"median_s": ..}}} -> {"e2e.10.median_s": ..}, numbers only"""
+    flat = {}
+    for section, rows in results.items():
+        for row, metrics in rows.items():
+            for name, value in metrics.items():
+                if isinstance(value, (int, float)):
+                    flat[f"{section}.{row}.{name}"] = value
+    return flat
+
+
+def compare(current, previous, tolerance, noise_s):
+    """Print the change of every shared metric and return the ones that regressed
+
+    Timings that moved by less than noise_s are never flagged: sub-millisecond
+    stages jitter by more than any sensible tolerance.
+    """
+    regressions = []
+    for key, value in current.items():
+        old = previous.get(key)
+        if not old or key.endswith(('.requests', '.throttled', '.failed')):
+            continue
+        change = (value - old) / old
+        worse = -change if key.endswith(HIGHER_IS_BETTER) else change
+        noise = key.endswith('_s') and abs(value - old) < noise_s
+        flag = "REGRESSION" if worse > tolerance and not noise else ""
+        print(f"  {key:<42} {old:12.4f} -> {value:12.4f}  {change:+7.1%}  {flag}")
+        if flag:
+            regressions.append(key)
+    return regressions
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def int_list(value):
+    return [int(item) for item in value.split(',') if item]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int_list, default=[10, 100, 1000, 10000],
+                        help='posts per account (default: 10,100,1000,10000)')
+    parser.add_argument('--repeat', type=int, default=3, help='end-to-end runs per size (default: 3)')
+    parser.add_argument('--workers', type=int_list, default=[1, 4, 8, 16],
+                        help='batch concurrency levels (default: 1,4,8,16)')
+    parser.add_argument('--batch-accounts', type=int, default=32, help='accounts per batch run (default: 32)')
+    parser.add_argument('--batch-posts', type=int, default=50, help='posts per batch account (default: 50)')
+    parser.add_argument('--latency', type=float, default=0.005, help='server latency in seconds (default: 0.005)')
+    parser.add_argument('--page-size', type=int, default=12, help='posts per timeline page (default: 12)')
+    parser.add_argument('--throttle-rate', type=float, default=0.0,
+                        help='fraction of API requests answered with 429 (default: 0)')
+    parser.add_argument('--paced', action='store_true',
+                        help='keep the real token-bucket limits (slow: minutes per 1000 posts)')
+    parser.add_argument('--skip', type=lambda value: set(value.split(',')), default=set(),
+                        help='sections to skip, any of e2e,stages,batch,memory')
+    parser.add_argument('--save', metavar='FILE', help='results file (default: benchmarks/results/<timestamp>.json)')
+    parser.add_argument('--compare', metavar='FILE', help='earlier results file to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.15,
+                        help='allowed relative regression before failing (default: 0.15)')
+    parser.add_argument('--noise-ms', type=float, default=2.0,
+                        help='timing changes below this are not regressions (default: 2)')
+    parser.add_argument('-v', '--verbose', action='store_true', help="show instaloader's retry messages")
+    args = parser.parse_args()
+
+    Insta_Info.configure_cache(enabled=False)
+    Insta_Info.configure_snapshots(enabled=False)
+    if not args.paced:
+        unpace()
+
+    proc, netloc = start_server(args)
+    results = {}
+    stderr = contextlib.nullcontext() if args.verbose else contextlib.redirect_stderr(io.StringIO())
+    try:
+        with redirect_to(netloc), stderr:
+            # Wrap the streams now, inside the stderr redirect, so stage threads are silenced too
+            Insta_Info.install_thread_streams()
+            sections = (
+                ("e2e", "end-to-end instagram_investigation", lambda: bench_end_to_end(netloc, args.sizes, args.repeat)),
+                ("stages", "per-stage timings", lambda: bench_stages(args.sizes)),
+                ("batch", f"batch throughput ({args.batch_accounts} accounts, {args.batch_posts} posts each)",
+                 lambda: bench_batch(args.workers, args.batch_accounts, args.batch_posts)),
+                ("memory", "peak traced memory of collect_investigation", lambda: bench_memory(args.sizes)),
+            )
+            for name, title, run in sections:
+                if name in args.skip:
+                    continue
+                print(f"{title}:")
+                results[name] = run()
+    finally:
+        Insta_Info.close_loader()
+        proc.terminate()
+        proc.wait()
+
+    report = {
+        "created": datetime.now().isoformat(timespec='seconds'),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "config": {key: sorted(value) if isinstance(value, set) else value
+                   for key, value in vars(args).items() if key not in ('save', 'compare')},
+        "results": results,
+        "metrics": flatten(results),
+    }
+    path = args.save
+    if path is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, f"{datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"results saved to {path}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            previous = json.load(f)
+        print(f"compared with {args.compare} (revision {previous.get('revision')}):")
+        regressions = compare(report["metrics"], previous.get("metrics", {}), args.tolerance, args.noise_ms / 1000)
+        if regressions:
+            print(f"FAIL: {len(regressions)} metric(s) regressed by more than {args.tolerance:.0%}")
+            return 1
+        print("OK")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
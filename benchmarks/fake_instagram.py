@@ -0,0 +1,414 @@
+"""Local stand-in for the Instagram endpoints Insta_Info talks to, for offline benchmarks.
+
+Serves what instaloader's anonymous flow expects: the profile page with the embedded
+profile query, web_profile_info with the first page of posts, the GraphQL timeline and
+post queries, the csrftoken home page and the /api/v1/users/lookup/ endpoint used by
+advanced_lookup, and the media files. Accounts are generated deterministically from the username:
+"<name>_<N>" has N posts, "private_*" is private and "missing*" does not exist.
+
+Latency, page size and injected 429s can be set on start and changed at runtime
+(POST /__config with a JSON body); GET /__stats returns per-route request counts.
+
+    python benchmarks/fake_instagram.py --port 8765 --latency 0.05 --throttle-rate 0.1
+
+In-process, redirect_to() points requests (and so instaloader) at the server.
+"""
+import argparse
+import json
+import random
+import re
+import sys
+import threading
+import time
+import zlib
+from collections import Counter
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit, urlunsplit
+
+HOSTS = ("www.instagram.com", "i.instagram.com", "instagram.com", "scontent.example")
+TIMELINE_DOC_ID = "7950326061742207"
+POST_DOC_ID = "27128499623469141"
+DEFAULT_POSTS = 50
+POST_COUNT_PATTERN = re.compile(r'_(\d+)$')
+BASE_TIMESTAMP = 1790000000
+TYPENAMES = {1: "GraphImage", 2: "GraphVideo", 8: "GraphSidecar"}
+MEDIA_SIZE = 64 * 1024
+STOCK_EVERY = 7
+
+
+def user_id(username):
+    return str(10 ** 9 + zlib.crc32(username.encode()))
+
+
+def post_count(username, default=DEFAULT_POSTS):
+    match = POST_COUNT_PATTERN.search(username)
+    return int(match.group(1)) if match else default
+
+
+def profile_fields(username, posts):
+    """The fields the profile page and web_profile_info have in common"""
+    rng = random.Random(username)
+    followers = rng.randint(100, 2000000)
+    return {
+        "username": username,
+        "full_name": username.replace('_', ' ').title(),
+        "biography": f"Benchmark account @{username}_fan\nhttps://x.com/{username} tiktok.com/@{username} #bench",
+        "external_url": f"https://linktr.ee/{username}",
+        "bio_links": [{"url": f"https://linktr.ee/{username}"}],
+        "is_private": username.startswith("private"),
+        "is_verified": rng.random() < 0.1,
+        "category_name": "Digital creator",
+        "business_email": f"{username}@example.com" if rng.random() < 0.5 else None,
+        "profile_pic_url": f"https://scontent.example/media/{username}.jpg?oe=1",
+        "_followers": followers,
+        "_following": rng.randint(0, 5000),
+        "_posts": posts,
+    }
+
+
+def page_profile(username, posts):
+    """xig_user_by_username, as embedded in the profile page"""
+    fields = profile_fields(username, posts)
+    node = {key: value for key, value in fields.items() if not key.startswith('_')}
+    node.update({
+        "pk": user_id(username),
+        "id": f"page-{username}",
+        "follower_count": fields["_followers"],
+        "following_count": fields["_following"],
+        "media_count": posts,
+        "is_business": fields["business_email"] is not None,
+    })
+    return node
+
+
+def legacy_profile(username, posts, page_size):
+    """The legacy user node returned by web_profile_info, including the first page of posts"""
+    fields = profile_fields(username, posts)
+    node = {key: value for key, value in fields.items() if not key.startswith('_')}
+    node.update({
+        "id": user_id(username),
+        "edge_followed_by": {"count": fields["_followers"]},
+        "edge_follow": {"count": fields["_following"]},
+        "is_business_account": fields["business_email"] is not None,
+        "profile_pic_url_hd": fields["profile_pic_url"],
+        "edge_felix_video_timeline": {"count": posts // 5},
+        "edge_owner_to_timeline_media": timeline_page(username, posts, 0, page_size),
+    })
+    return node
+
+
+def post_values(username, index):
+    """Deterministic values of one post; posts get older with the index"""
+    rng = random.Random(f"{username}:{index}")
+    media_type = rng.choice((1, 1, 1, 2, 8))
+    caption = f"Post {index} #{rng.choice(('travel', 'food', 'art', 'bench'))} with @{username}_fan"
+    return {
+        "shortcode": f"{username}-{index}",
+        "id": str(3 * 10 ** 18 + zlib.crc32(f"{username}:{index}".encode())),
+        "media_type": media_type,
+        "taken_at": BASE_TIMESTAMP - index * rng.randint(3600, 5 * 86400) - index * 86400,
+        "likes": rng.randint(0, 50000),
+        "comments": rng.randint(0, 800),
+        "views": rng.randint(100, 500000) if media_type == 2 else None,
+        "caption": caption,
+    }
+
+
+def timeline_node(username, index):
+    values = post_values(username, index)
+    return {
+        "__typename": TYPENAMES[values["media_type"]],
+        "id": values["id"],
+        "shortcode": values["shortcode"],
+        "taken_at_timestamp": values["taken_at"],
+        "is_video": values["media_type"] == 2,
+        "video_view_count": values["views"],
+        "display_url": f"https://scontent.example/media/{values['shortcode']}.jpg?oe=1",
+        "video_url": f"https://scontent.example/media/{values['shortcode']}.mp4?oe=1" if values["media_type"] == 2 else None,
+        "edge_media_preview_like": {"count": values["likes"]},
+        "edge_media_to_comment": {"count": values["comments"]},
+        "edge_media_to_caption": {"edges": [{"node": {"text": values["caption"]}}]},
+        "location": None,
+        "owner": {"id": user_id(username), "username": username},
+    }
+
+
+def media_item(username, index):
+    """A post as the shortcode web_info query returns it"""
+    values = post_values(username, index)
+    item = {
+        "code": values["shortcode"],
+        "pk": values["id"],
+        "media_type": values["media_type"],
+        "taken_at": values["taken_at"],
+        "user": {"pk": user_id(username), "username": username, "full_name": username.title()},
+        "like_count": values["likes"],
+        "comment_count": values["comments"],
+        "caption": {"text": values["caption"]},
+        "location": None,
+        "image_versions2": {"candidates": [{"url": f"https://scontent.example/media/{values['shortcode']}.jpg?oe=1"}]},
+    }
+    if values["media_type"] == 2:
+        item["view_count"] = values["views"]
+        item["video_versions"] = [{"url": f"https://scontent.example/media/{values['shortcode']}.mp4?oe=1"}]
+    return item
+
+
+def media_body(name, size=MEDIA_SIZE):
+    """Deterministic file contents; every STOCK_EVERY-th post image is the same stock picture, as reposts are"""
+    index = name.rpartition('.')[0].rpartition('-')[2]
+    if name.endswith('.jpg') and index.isdigit() and int(index) % STOCK_EVERY == 0:
+        name = "stock.jpg"
+    return random.Random(name).randbytes(size)
+
+
+def timeline_page(username, posts, offset, page_size):
+    end = min(posts, offset + page_size)
+    return {
+        "count": posts,
+        "edges": [{"node": timeline_node(username, index)} for index in range(offset, end)],
+        "page_info": {"has_next_page": end < posts, "end_cursor": str(end) if end < posts else None},
+    }
+
+
+class FakeInstagramHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out as separate writes; avoid the Nagle/delayed-ACK stall
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def config(self):
+        return self.server.config
+
+    def send_body(self, status, body, content_type="application/json", headers=()):
+        if not isinstance(body, bytes):
+            body = json.dumps(body, separators=(',', ':')).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.count("bytes", len(body))
+
+    def read_form(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0))).decode()
+        return {key: values[0] for key, values in parse_qs(body).items()}
+
+    def throttled(self):
+        """Answer with a 429 when one is due, following the configured throttle rate"""
+        if not self.server.should_throttle():
+            return False
+        self.server.count("429")
+        headers = []
+        if self.config["retry_after"]:
+            headers.append(("Retry-After", str(self.config["retry_after"])))
+        self.send_body(429, {"message": "Please wait a few minutes before you try again.", "status": "fail"},
+                       headers=headers)
+        return True
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        if parts.path == "/__stats":
+            return self.send_body(200, self.server.snapshot_stats())
+        time.sleep(self.config["latency"])
+        if parts.path == "/":
+            self.server.count("home")
+            return self.send_body(200, b"<html></html>", "text/html",
+                                  headers=[("Set-Cookie", "csrftoken=benchmarkcsrftoken; Path=/")])
+        if parts.path.startswith("/media/"):
+            self.server.count("media")
+            return self.send_body(200, media_body(parts.path[len("/media/"):]), "application/octet-stream")
+        if parts.path == "/graphql/query":
+            # instaloader retries a failed doc_id query as a GET with the same parameters
+            return self.graphql({key: values[0] for key, values in parse_qs(parts.query).items()})
+        if parts.path == "/api/v1/users/web_profile_info/":
+            self.server.count("web_profile_info")
+            if self.throttled():
+                return
+            username = parse_qs(parts.query).get("username", [""])[0]
+            if username.startswith("missing"):
+                return self.send_body(404, {"message": "User not found", "status": "fail"})
+            self.server.remember(username)
+            node = legacy_profile(username, post_count(username, self.config["posts"]), self.config["page_size"])
+            return self.send_body(200, {"data": {"user": node}, "status": "ok"})
+        username = parts.path.strip('/')
+        if username and '/' not in username:
+            self.server.count("profile_page")
+            if username.startswith("missing"):
+                return self.send_body(404, b"<html>Page Not Found</html>", "text/html")
+            self.server.remember(username)
+            node = page_profile(username, post_count(username, self.config["posts"]))
+            embedded = {"require": [{"__bbox": {"result": {"data": {"xig_user_by_username": node}}}}]}
+            html = f'<html><script type="application/json">{json.dumps(embedded)}</script></html>'
+            return self.send_body(200, html.encode(), "text/html")
+        self.send_body(404, {"message": "not found", "status": "fail"})
+
+    def do_POST(self):
+        parts = urlsplit(self.path)
+        if parts.path == "/__config":
+            body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            self.server.configure(**json.loads(body or b'{}'))
+            return self.send_body(200, self.config)
+        form = self.read_form()
+        time.sleep(self.config["latency"])
+        if parts.path == "/graphql/query":
+            return self.graphql(form)
+        if parts.path == "/api/v1/users/lookup/":
+            self.server.count("lookup")
+            if self.throttled():
+                return
+            query = json.loads(form.get("signed_body", "SIGNATURE.{}").split('.', 1)[1])
+            username = query.get("q", "")
+            if username.startswith("missing"):
+                return self.send_body(200, {"message": "No users found", "status": "fail"})
+            return self.send_body(200, {
+                "obfuscated_email": f"{username[0]}***@example.com",
+                "obfuscated_phone": "+** *** *** **42",
+                "user": {"username": username, "pk": user_id(username)},
+                "status": "ok",
+            })
+        self.send_body(404, {"message": "not found", "status": "fail"})
+
+    def graphql(self, form):
+        variables = json.loads(form.get("variables", "{}"))
+        doc_id = form.get("doc_id")
+        if doc_id == TIMELINE_DOC_ID:
+            self.server.count("timeline_page")
+            if self.throttled():
+                return
+            username = self.server.username_for(str(variables.get("id")))
+            if username is None:
+                return self.send_body(200, {"data": {"user": None}, "status": "ok"})
+            page = timeline_page(username, post_count(username, self.config["posts"]),
+                                 int(variables.get("after") or 0), self.config["page_size"])
+            return self.send_body(200, {"data": {"user": {"edge_owner_to_timeline_media": page}}, "status": "ok"})
+        if doc_id == POST_DOC_ID:
+            self.server.count("post")
+            if self.throttled():
+                return
+            username, _, index = variables.get("shortcode", "").rpartition('-')
+            if not username or not index.isdigit() or int(index) >= post_count(username, self.config["posts"]):
+                items = []
+            else:
+                items = [media_item(username, int(index))]
+            return self.send_body(200, {"data": {"xdt_api__v1__media__shortcode__web_info": {"items": items}},
+                                        "status": "ok"})
+        self.send_body(200, {"data": None, "status": "ok"})
+
+
+class FakeInstagram(ThreadingHTTPServer):
+    """Threaded stand-in server; configure() adjusts its behaviour while it runs"""
+    daemon_threads = True
+
+    def __init__(self, port=0, latency=0.0, page_size=12, throttle_rate=0.0, retry_after=0, posts=DEFAULT_POSTS):
+        super().__init__(("127.0.0.1", port), FakeInstagramHandler)
+        self.config = {}
+        self.stats = Counter()
+        self.users = {}
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._throttled = 0
+        self.configure(latency=latency, page_size=page_size, throttle_rate=throttle_rate,
+                       retry_after=retry_after, posts=posts)
+
+    @property
+    def netloc(self):
+        return f"127.0.0.1:{self.server_address[1]}"
+
+    def configure(self, **config):
+        with self._lock:
+            self.config.update(config)
+            self._requests = self._throttled = 0
+            self.stats.clear()
+
+    def count(self, key, amount=1):
+        with self._lock:
+            self.stats[key] += amount
+
+    def snapshot_stats(self):
+        with self._lock:
+            return dict(self.stats)
+
+    def should_throttle(self):
+        # Error diffusion rather than a coin flip, so a rate of 0.1 is exactly every 10th request
+        with self._lock:
+            self._requests += 1
+            due = int(self._requests * self.config["throttle_rate"]) > self._throttled
+            if due:
+                self._throttled += 1
+            return due
+
+    def remember(self, username):
+        with self._lock:
+            self.users[user_id(username)] = username
+
+    def username_for(self, uid):
+        with self._lock:
+            return self.users.get(uid)
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+@contextmanager
+def redirect_to(netloc):
+    """Send every request for an Instagram host to the stand-in at netloc, over plain HTTP
+
+    instaloader copies its session for each query, so the rewrite happens in the
+    transport adapter that all sessions share. The original request is left untouched
+    so cookies are still stored for the Instagram domain. Hooks installed on the
+    adapter inside the block (Insta_Info's counters and cassettes) wrap the rewrite
+    and stay in place on exit; the rewrite itself then passes requests through.
+    """
+    from requests.adapters import HTTPAdapter
+    original = HTTPAdapter.send
+    active = True
+
+    def send(adapter, request, **kwargs):
+        parts = urlsplit(request.url)
+        if active and parts.hostname in HOSTS:
+            request = request.copy()
+            request.url = urlunsplit(("http", netloc, parts.path, parts.query, ""))
+        return original(adapter, request, **kwargs)
+
+    HTTPAdapter.send = send
+    try:
+        yield
+    finally:
+        active = False
+        # Only take out our own wrapper; anything installed on top of it keeps working
+        if HTTPAdapter.send is send:
+            HTTPAdapter.send = original
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--port', type=int, default=8765, help='port to listen on, 0 for any (default: 8765)')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every request (default: 0)')
+    parser.add_argument('--page-size', type=int, default=12, help='posts per timeline page (default: 12)')
+    parser.add_argument('--throttle-rate', type=float, default=0.0,
+                        help='fraction of API requests answered with 429 (default: 0)')
+    parser.add_argument('--retry-after', type=int, default=0, help='Retry-After seconds sent with a 429 (default: none)')
+    parser.add_argument('--posts', type=int, default=DEFAULT_POSTS,
+                        help=f'posts of accounts without a _<N> suffix (default: {DEFAULT_POSTS})')
+    args = parser.parse_args()
+
+    server = FakeInstagram(args.port, args.latency, args.page_size, args.throttle_rate, args.retry_after, args.posts)
+    # The first line tells a parent process where to connect
+    print(server.netloc, flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())